@@ -1,8 +1,22 @@
+from datetime import date
 from flask import Flask, render_template, request
+import banco
+from estaticos import instalar_estaticos
 
 app = Flask(__name__)
+app.teardown_appcontext(banco.fechar_conexao)
+# static/ com hash no nome e cache longo (veja estaticos.py)
+instalar_estaticos(app)
 
-tarefas = []
+# Tarefas por página na lista (as seguintes vêm pelo link "Próximas tarefas")
+TAREFAS_POR_PAGINA = 50
+
+def data_valida(texto):
+    try:
+        date.fromisoformat(texto)
+        return True
+    except ValueError:
+        return False
 
 @app.route("/", methods = ["POST", "GET"])
 def index():
@@ -10,11 +24,23 @@ def index():
         tarefa = request.form["tarefa"]
         data_limite = request.form["data_limite"]
     
-        if tarefa and data_limite:
-            tarefas.append({'tarefa': tarefa, 'data_limite': data_limite})
+        if tarefa and data_valida(data_limite):
+            banco.adicionar_tarefa(tarefa, data_limite)
             return render_template('sucesso.html', nome_tarefa=tarefa)
     
-    return render_template("index.html", tarefas=tarefas)
+    # Cursor da página: a última tarefa da página anterior (?data=...&id=...)
+    depois_de = None
+    if data_valida(request.args.get('data', '')) and request.args.get('id', type=int) is not None:
+        depois_de = (request.args['data'], request.args.get('id', type=int))
+
+    # Um resultado a mais só para saber se existe uma próxima página
+    tarefas = banco.listar_tarefas(depois_de, limite=TAREFAS_POR_PAGINA + 1)
+    proxima = None
+    if len(tarefas) > TAREFAS_POR_PAGINA:
+        tarefas = tarefas[:TAREFAS_POR_PAGINA]
+        proxima = {'data': tarefas[-1]['data_limite'], 'id': tarefas[-1]['id']}
+    return render_template("index.html", tarefas=tarefas, proxima=proxima, continuando=depois_de is not None,
+                           hoje=date.today().isoformat())
 
 @app.route("/sucesso")
 def sucesso():
@@ -22,4 +48,4 @@ def sucesso():
     return render_template("sucesso.html", nome_tarefa=nome_tarefa)
 
 if __name__ == "__main__":
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True)
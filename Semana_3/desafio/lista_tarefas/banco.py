@@ -0,0 +1,82 @@
+import os
+import sqlite3
+from flask import g
+
+# As tarefas ficam em um arquivo SQLite ao lado do app. Assim elas sobrevivem a
+# reinicializações e são compartilhadas entre vários processos (ex.: gunicorn).
+CAMINHO_BANCO = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'tarefas.db')
+
+
+def conectar():
+    conexao = sqlite3.connect(CAMINHO_BANCO, timeout=10)
+    conexao.row_factory = sqlite3.Row
+    # WAL: leitores não bloqueiam o escritor e vice-versa
+    conexao.execute('PRAGMA journal_mode=WAL')
+    return conexao
+
+
+# A tabela é criada na primeira conexão de cada processo, e não ao importar o
+# módulo: importar o app (ex.: nos testes ou no 'flask routes') não cria o arquivo
+_tabela_criada = False
+
+
+def obter_conexao():
+    # Uma conexão por requisição, guardada em 'g' e fechada no final
+    global _tabela_criada
+    if 'conexao' not in g:
+        g.conexao = conectar()
+        if not _tabela_criada:
+            criar_tabela(g.conexao)
+            _tabela_criada = True
+    return g.conexao
+
+
+def fechar_conexao(erro=None):
+    conexao = g.pop('conexao', None)
+    if conexao is not None:
+        conexao.close()
+
+
+def criar_tabela(conexao):
+    with conexao:
+        conexao.execute(
+            'CREATE TABLE IF NOT EXISTS tarefas ('
+            ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+            ' tarefa TEXT NOT NULL,'
+            ' data_limite TEXT NOT NULL)'
+        )
+        # Índice pela data limite: a página inicial lê as tarefas já na ordem,
+        # sem precisar ordenar a tabela inteira a cada requisição
+        conexao.execute(
+            'CREATE INDEX IF NOT EXISTS idx_tarefas_data_limite ON tarefas (data_limite, id)'
+        )
+
+
+def adicionar_tarefa(tarefa, data_limite):
+    conexao = obter_conexao()
+    # 'with conexao' abre uma transação e faz commit no final;
+    # o SQLite garante que dois POSTs ao mesmo tempo não se atropelem
+    with conexao:
+        conexao.execute(
+            'INSERT INTO tarefas (tarefa, data_limite) VALUES (?, ?)',
+            (tarefa, data_limite)
+        )
+
+
+def listar_tarefas(depois_de=None, limite=50):
+    """Uma página de tarefas na ordem (data_limite, id), atrasadas primeiro.
+
+    'depois_de' é o par (data_limite, id) da última tarefa da página anterior:
+    a consulta continua dali pelo índice, sem OFFSET.
+    """
+    conexao = obter_conexao()
+    if depois_de is None:
+        return conexao.execute(
+            'SELECT id, tarefa, data_limite FROM tarefas ORDER BY data_limite, id LIMIT ?',
+            (limite,)
+        ).fetchall()
+    return conexao.execute(
+        'SELECT id, tarefa, data_limite FROM tarefas'
+        ' WHERE (data_limite, id) > (?, ?) ORDER BY data_limite, id LIMIT ?',
+        (*depois_de, limite)
+    ).fetchall()
@@ -1,6 +1,9 @@
 from flask import Flask, render_template, request
+from estaticos import instalar_estaticos
 
 app = Flask(__name__)
+# static/ com hash no nome e cache longo (veja estaticos.py)
+instalar_estaticos(app)
 
 @app.route("/", methods = ["GET", "POST"])
 def index():
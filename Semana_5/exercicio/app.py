@@ -1,10 +1,26 @@
 import os
-from flask import Flask, render_template, request, redirect, url_for, flash
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
 
 from forms import ReceitaForm
+from fila_mensagens import FilaMensagens, FilaCheia
+from estaticos import instalar_estaticos
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.urandom(24);
+# static/ com hash no nome e cache longo (veja estaticos.py)
+instalar_estaticos(app)
+
+
+def registrar_receitas(lote):
+    # Roda nas threads da fila (veja fila_mensagens.py), fora da requisição
+    for mensagem in lote:
+        receita = mensagem['dados']
+        print(f'Receita: {receita["nome_receita"]}')
+        print(f'Ingredientes: {receita["ingredientes"]}')
+        print(f'Modo de Preparo: {receita["modo_preparo"]}')
+
+
+fila = FilaMensagens(app, ao_processar=registrar_receitas)
 
 @app.route('/')
 def index():
@@ -18,9 +34,11 @@ def receita():
         ingredientes = form.ingredientes.data
         modo_preparo = form.modo_preparo.data
         
-        print(f'Receita: {nome_receita}')
-        print(f'Ingredientes: {ingredientes}')
-        print(f'Modo de Preparo: {modo_preparo}')
+        try:
+            fila.enfileirar('receita', {'nome_receita': nome_receita, 'ingredientes': ingredientes, 'modo_preparo': modo_preparo})
+        except FilaCheia:
+            flash('Muitas receitas sendo enviadas agora. Tente novamente em instantes.', 'danger')
+            return render_template('receita.html', form=form), 503
         
         flash('Receita cadastrada com sucesso!', 'success')
         return redirect(url_for('receita_criada', nome_receita=nome_receita, ingredientes=ingredientes, modo_preparo=modo_preparo))
@@ -34,5 +52,9 @@ def receita_criada():
     modo_preparo = request.args.get('modo_preparo', '')
     return render_template('receita_criada.html', nome_receita=nome_receita, ingredientes=ingredientes, modo_preparo=modo_preparo)   
 
+@app.route('/fila/metricas')
+def metricas_fila():
+    return jsonify(fila.metricas())
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
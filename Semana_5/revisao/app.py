@@ -1,52 +1,39 @@
 # Importa as classes e funções necessárias do Flask.
-from flask import Flask, render_template, request, redirect, url_for, flash
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
 # Importa o formulário que acabamos de criar.
 from forms import ContactForm
+# Perfilador por amostragem (veja perfilador.py).
+from perfilador import instalar_perfilador
+# Cache em disco dos templates compilados (veja templates_compilados.py).
+from templates_compilados import configurar_templates, aquecer_se_pedido
+# Conteúdo de cada semana de revisão (veja conteudo.py).
+from conteudo import SEMANAS
+# Páginas renderizadas uma vez e servidas da memória (veja paginas_estaticas.py).
+from paginas_estaticas import pagina_pre_renderizada, registrar_exportacao
+# Fila que grava as mensagens de contato em segundo plano (veja fila_mensagens.py).
+from fila_mensagens import FilaMensagens, FilaCheia
+# Arquivos da pasta static com hash no nome e cache longo (veja estaticos.py).
+from estaticos import instalar_estaticos
 
 # Cria uma instância da aplicação.
 app = Flask(__name__)
+# Liga o cache de templates compilados (precisa vir antes de qualquer renderização).
+configurar_templates(app)
+# url_for('static', ...) passa a devolver o nome com hash (depois de 'flask construir-estaticos').
+instalar_estaticos(app)
 # Configura uma chave secreta para usar com flash messages e Flask-WTF (obrigatório).
 app.config['SECRET_KEY'] = 'uma-chave-secreta-para-revisao-com-wtf'
 
-# ---- Conteúdo da Revisão (dados para os templates) ----
-
-# Dados para a Semana 2 (templates e laços de repetição).
-conteudo_semana_2 = {
-    'titulo': 'Semana 2: Templates com Jinja2',
-    'conceitos': [
-        'Separação de Lógica e Apresentação (Python vs. HTML)',
-        'O que é um Template Engine (Jinja2)',
-        'Sintaxe de Expressões ({{ }}): Exibir variáveis',
-        'Sintaxe de Estruturas de Controle ({% %}): Laços (for), Condicionais (if)',
-        'Herança de Templates (extends, block): O princípio DRY'
-    ],
-    'desafio': 'Crie um template que herde de base.html e exiba uma lista de hobbies com um laço for.'
-}
-
-# Dados para a Semana 3 (arquivos estáticos e formulários).
-conteudo_semana_3 = {
-    'titulo': 'Semana 3: Conteúdo Estático e Formulários',
-    'conceitos': [
-        'Servindo Arquivos Estáticos (a pasta "static")',
-        "A função url_for('static', filename='...')",
-        'Fundamentos de Formulários HTML (<form>, <input>, <label>)',
-        'Métodos HTTP: GET vs. POST (visível vs. invisível)',
-        'Recebendo dados no Flask (o objeto request)'
-    ],
-    'desafio': 'Crie um formulário de feedback que envie os dados usando o método POST para uma nova rota.'
-}
-
-# Dados para a Semana 4 (validação de formulários).
-conteudo_semana_4 = {
-    'titulo': 'Semana 4: Validação de Formulários',
-    'conceitos': [
-        'A necessidade de validação no lado do servidor',
-        'Uso de Flask-WTF (simplifica a criação e validação)',
-        'Validações básicas (dados obrigatórios, formatos, etc.)',
-        'Tratamento de erros e exibição de mensagens ao usuário (flash)'
-    ],
-    'desafio': 'Adicione validação para que os campos de um formulário de contato não fiquem em branco.'
-}
+
+def registrar_contatos(lote):
+    """Chamada pelas threads da fila, fora da requisição, para cada lote de mensagens."""
+    for mensagem in lote:
+        contato = mensagem['dados']
+        print(f"Novo contato recebido de {contato['nome']} ({contato['email']}): {contato['mensagem']}")
+
+
+# A rota só enfileira a mensagem; gravar e imprimir fica para a fila.
+fila = FilaMensagens(app, ao_processar=registrar_contatos)
 
 # ---- Rotas (URLs) da Aplicação ----
 
@@ -54,38 +41,23 @@ conteudo_semana_4 = {
 @app.route('/')
 def index():
     """Renderiza a página inicial com links para as revisões."""
-    return render_template('index.html')
+    return pagina_pre_renderizada('index', lambda: render_template('index.html', semanas=SEMANAS))
 
 # Rota genérica para as páginas de revisão.
 # Recebe o nome da semana como um parâmetro de rota.
 @app.route('/revisao/<semana_id>')
 def revisao(semana_id):
     """
-    Renderiza a página de revisão para a semana especificada.
-    Trata dinamicamente o conteúdo de cada semana.
+    Exibe a página de revisão da semana especificada.
+    O conteúdo vem do registro SEMANAS (conteudo.py) e cada página é
+    renderizada uma única vez (veja paginas_estaticas.py).
     """
-    if semana_id == 'semana1':
-        titulo = 'Semana 1: Introdução ao Desenvolvimento Web e Flask'
-        conceitos = [
-            'O Modelo Cliente-Servidor (HTTP)',
-            'O que é um Framework Web (Flask)',
-            'Ambientes Virtuais (venv)',
-            'Criação de Rotas com @app.route()'
-        ]
-        desafio = 'Adicione novas rotas para suas páginas favoritas.'
-        return render_template('revisao.html', titulo=titulo, conceitos=conceitos, desafio=desafio)
-    
-    elif semana_id == 'semana2':
-        return render_template('revisao.html', **conteudo_semana_2)
-
-    elif semana_id == 'semana3':
-        return render_template('revisao.html', **conteudo_semana_3)
-
-    elif semana_id == 'semana4':
-        return render_template('revisao.html', **conteudo_semana_4)
-
+    conteudo = SEMANAS.get(semana_id)
     # Redireciona para a página inicial caso a semana não exista.
-    return redirect(url_for('index'))
+    if conteudo is None:
+        return redirect(url_for('index'))
+    return pagina_pre_renderizada(
+        ('revisao', semana_id), lambda: render_template('revisao.html', **conteudo))
 
 # Rota para o formulário de contato (versão HTML tradicional).
 @app.route('/contato', methods=['GET', 'POST'])
@@ -105,7 +77,11 @@ def contato():
             flash('Por favor, preencha todos os campos!', 'danger')
             return render_template('contato.html')
         
-        print(f"Novo contato recebido de {nome} ({email}): {mensagem}")
+        try:
+            fila.enfileirar('contato', {'nome': nome, 'email': email, 'mensagem': mensagem})
+        except FilaCheia:
+            flash('Muitas mensagens no momento. Tente novamente em instantes.', 'danger')
+            return render_template('contato.html'), 503
         
         flash('Sua mensagem foi enviada com sucesso!', 'success')
         return redirect(url_for('contato'))
@@ -127,7 +103,11 @@ def contato_wtf():
         email = form.email.data
         mensagem = form.mensagem.data
         
-        print(f"Novo contato recebido de {nome} ({email}): {mensagem}")
+        try:
+            fila.enfileirar('contato', {'nome': nome, 'email': email, 'mensagem': mensagem})
+        except FilaCheia:
+            flash('Muitas mensagens no momento. Tente novamente em instantes.', 'danger')
+            return render_template('contato-wtf.html', form=form), 503
         
         flash('Sua mensagem foi enviada com sucesso!', 'success')
         # Redireciona para evitar reenvio do formulário.
@@ -137,6 +117,20 @@ def contato_wtf():
     # renderiza o template com o formulário.
     return render_template('contato-wtf.html', form=form)
 
+# Profundidade da fila, mensagens processadas/rejeitadas e taxa de escoamento.
+@app.route('/fila/metricas')
+def metricas_fila():
+    return jsonify(fila.metricas())
+
+
+# Instala o perfilador, se a variável de ambiente PERFILADOR_AMOSTRA estiver definida.
+instalar_perfilador(app)
+
+# Comando 'flask exportar-paginas': grava a página inicial e as revisões como HTML estático.
+registrar_exportacao(app, lambda: [url_for('index')] + [url_for('revisao', semana_id=semana_id) for semana_id in SEMANAS])
+
+# Com AQUECER_TEMPLATES=1, renderiza cada template uma vez antes de atender requisições.
+aquecer_se_pedido(app)
 
 # ---- Executa a aplicação ----
 if __name__ == '__main__':
@@ -0,0 +1,63 @@
+# ---- Conteúdo da Revisão (dados para os templates) ----
+# Este conteúdo não muda enquanto a aplicação está rodando. Cada semana é
+# registrada em SEMANAS (no final do arquivo); para criar uma nova página de
+# revisão basta acrescentar um dicionário aqui e uma entrada no registro.
+
+# Dados para a Semana 1 (introdução ao Flask).
+conteudo_semana_1 = {
+    'titulo': 'Semana 1: Introdução ao Desenvolvimento Web e Flask',
+    'conceitos': [
+        'O Modelo Cliente-Servidor (HTTP)',
+        'O que é um Framework Web (Flask)',
+        'Ambientes Virtuais (venv)',
+        'Criação de Rotas com @app.route()'
+    ],
+    'desafio': 'Adicione novas rotas para suas páginas favoritas.'
+}
+
+# Dados para a Semana 2 (templates e laços de repetição).
+conteudo_semana_2 = {
+    'titulo': 'Semana 2: Templates com Jinja2',
+    'conceitos': [
+        'Separação de Lógica e Apresentação (Python vs. HTML)',
+        'O que é um Template Engine (Jinja2)',
+        'Sintaxe de Expressões ({{ }}): Exibir variáveis',
+        'Sintaxe de Estruturas de Controle ({% %}): Laços (for), Condicionais (if)',
+        'Herança de Templates (extends, block): O princípio DRY'
+    ],
+    'desafio': 'Crie um template que herde de base.html e exiba uma lista de hobbies com um laço for.'
+}
+
+# Dados para a Semana 3 (arquivos estáticos e formulários).
+conteudo_semana_3 = {
+    'titulo': 'Semana 3: Conteúdo Estático e Formulários',
+    'conceitos': [
+        'Servindo Arquivos Estáticos (a pasta "static")',
+        "A função url_for('static', filename='...')",
+        'Fundamentos de Formulários HTML (<form>, <input>, <label>)',
+        'Métodos HTTP: GET vs. POST (visível vs. invisível)',
+        'Recebendo dados no Flask (o objeto request)'
+    ],
+    'desafio': 'Crie um formulário de feedback que envie os dados usando o método POST para uma nova rota.'
+}
+
+# Dados para a Semana 4 (validação de formulários).
+conteudo_semana_4 = {
+    'titulo': 'Semana 4: Validação de Formulários',
+    'conceitos': [
+        'A necessidade de validação no lado do servidor',
+        'Uso de Flask-WTF (simplifica a criação e validação)',
+        'Validações básicas (dados obrigatórios, formatos, etc.)',
+        'Tratamento de erros e exibição de mensagens ao usuário (flash)'
+    ],
+    'desafio': 'Adicione validação para que os campos de um formulário de contato não fiquem em branco.'
+}
+
+# Registro das páginas de revisão: o identificador usado na URL
+# (/revisao/<semana_id>) aponta para o conteúdo da semana.
+SEMANAS = {
+    'semana1': conteudo_semana_1,
+    'semana2': conteudo_semana_2,
+    'semana3': conteudo_semana_3,
+    'semana4': conteudo_semana_4,
+}
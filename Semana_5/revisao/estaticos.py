@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import click
+from flask import request
+
+# -----------------------------------------------------------------------------
+# ARQUIVOS ESTÁTICOS COM HASH NO NOME (fingerprint)
+# -----------------------------------------------------------------------------
+# 1. Passo de build, offline (depois de mudar templates ou CSS):
+#        flask --app app construir-estaticos
+#    Monta os pacotes de CSS do app, se houver (ex.: app.css, nos apps que
+#    têm estilos.py), e copia cada arquivo de static/ para static/dist/ com o hash do conteúdo no
+#    nome: style.css -> dist/style.3f9a1c2b.css. O arquivo
+#    static/dist/manifesto.json guarda o nome com hash de cada arquivo.
+#    Com --verificar, só confere se o que está em static/ está atualizado.
+# 2. url_for('static', filename='style.css') devolve o nome com hash.
+# 3. Um arquivo com hash nunca muda (uma versão nova tem outro nome), então
+#    ele é servido com 'Cache-Control: public, max-age=31536000, immutable':
+#    numa visita repetida o navegador usa a cópia dele sem perguntar nada.
+#
+# Sem o manifesto (o build nunca rodou) os nomes originais continuam valendo.
+
+PASTA_DIST = 'dist'
+MANIFESTO = 'manifesto.json'
+UM_ANO = 365 * 24 * 3600
+
+
+def _hash(dados):
+    return hashlib.sha256(dados).hexdigest()[:10]
+
+
+def ler_manifesto(app):
+    caminho = os.path.join(app.static_folder, PASTA_DIST, MANIFESTO)
+    if not os.path.exists(caminho):
+        return {}
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+def montar_pacotes(app, pacotes):
+    """{nome: conteúdo} de cada pacote; cada fonte é um arquivo de static/ ou uma função(app)."""
+    montados = {}
+    for nome, fontes in pacotes.items():
+        partes = []
+        for fonte in fontes:
+            if callable(fonte):
+                partes.append(fonte(app))
+            else:
+                with open(os.path.join(app.static_folder, fonte), encoding='utf-8') as arquivo:
+                    partes.append(arquivo.read())
+        montados[nome] = '\n'.join(partes).encode('utf-8')
+    return montados
+
+
+def arquivos_estaticos(app, montados):
+    """{caminho relativo em static/: bytes} de tudo o que vai para dist/."""
+    arquivos = {}
+    for raiz, pastas, nomes in os.walk(app.static_folder):
+        if os.path.abspath(raiz) == os.path.abspath(app.static_folder):
+            pastas[:] = [pasta for pasta in pastas if pasta != PASTA_DIST]
+        for nome in nomes:
+            caminho = os.path.join(raiz, nome)
+            relativo = os.path.relpath(caminho, app.static_folder).replace(os.sep, '/')
+            with open(caminho, 'rb') as arquivo:
+                arquivos[relativo] = arquivo.read()
+    arquivos.update(montados)
+    return arquivos
+
+
+def nome_com_hash(relativo, dados):
+    base, extensao = os.path.splitext(relativo)
+    return f'{PASTA_DIST}/{base}.{_hash(dados)}{extensao}'
+
+
+def _conteudo(caminho):
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, 'rb') as arquivo:
+        return arquivo.read()
+
+
+def construir(app, pacotes, verificar=False):
+    montados = montar_pacotes(app, pacotes)
+    arquivos = arquivos_estaticos(app, montados)
+    manifesto = {relativo: nome_com_hash(relativo, dados) for relativo, dados in sorted(arquivos.items())}
+
+    if verificar:
+        desatualizados = [nome for nome, dados in montados.items()
+                          if _conteudo(os.path.join(app.static_folder, nome)) != dados]
+        if manifesto != ler_manifesto(app):
+            desatualizados.append(f'{PASTA_DIST}/{MANIFESTO}')
+        return desatualizados
+
+    # Os pacotes também ficam em static/ com o nome original (sem build, sem hash)
+    for nome, dados in montados.items():
+        with open(os.path.join(app.static_folder, nome), 'wb') as arquivo:
+            arquivo.write(dados)
+
+    # dist/ é refeita do zero: versões antigas não se acumulam
+    pasta = os.path.join(app.static_folder, PASTA_DIST)
+    shutil.rmtree(pasta, ignore_errors=True)
+    for relativo, destino in manifesto.items():
+        caminho = os.path.join(app.static_folder, destino)
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        with open(caminho, 'wb') as arquivo:
+            arquivo.write(arquivos[relativo])
+    with open(os.path.join(pasta, MANIFESTO), 'w', encoding='utf-8') as arquivo:
+        json.dump(manifesto, arquivo, indent=2, sort_keys=True)
+        arquivo.write('\n')
+    return manifesto
+
+
+def instalar_estaticos(app, pacotes=None):
+    pacotes = pacotes or {}
+    manifesto = ler_manifesto(app)
+    com_hash = set(manifesto.values())
+
+    @app.url_defaults
+    def trocar_pelo_nome_com_hash(endpoint, valores):
+        if endpoint == 'static' and valores.get('filename') in manifesto:
+            valores['filename'] = manifesto[valores['filename']]
+
+    @app.after_request
+    def cache_imutavel(resposta):
+        if request.endpoint == 'static' and request.view_args.get('filename') in com_hash:
+            resposta.cache_control.public = True
+            resposta.cache_control.max_age = UM_ANO
+            resposta.cache_control.immutable = True
+            resposta.cache_control.no_cache = None
+        return resposta
+
+    @app.cli.command('construir-estaticos')
+    @click.option('--verificar', is_flag=True, help='Só confere se static/ está atualizado.')
+    def construir_estaticos_comando(verificar):
+        """Monta os pacotes de CSS e copia static/ para static/dist/ com hash no nome."""
+        if verificar:
+            desatualizados = construir(app, pacotes, verificar=True)
+            if desatualizados:
+                click.echo('Desatualizados (rode flask construir-estaticos): ' + ', '.join(desatualizados))
+                sys.exit(1)
+            click.echo('static/ está atualizado')
+            return
+        manifesto = construir(app, pacotes)
+        click.echo(f'{len(manifesto)} arquivos em {os.path.join(app.static_folder, PASTA_DIST)}')
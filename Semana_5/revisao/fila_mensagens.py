@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+
+# -----------------------------------------------------------------------------
+# FILA DE MENSAGENS EM SEGUNDO PLANO
+# -----------------------------------------------------------------------------
+# A rota só grava o formulário já validado em uma fila (um arquivo SQLite, o
+# "spool") e responde na hora. Um grupo de threads trabalhadoras esvazia a fila
+# em lotes:
+#   1. reserva até FILA_LOTE mensagens da tabela 'fila' (elas continuam lá, mas
+#      nenhum outro trabalhador as pega por FILA_RESERVA_S segundos);
+#   2. entrega o lote para a função 'ao_processar' do app (ex.: imprimir,
+#      mandar e-mail);
+#   3. só se 'ao_processar' terminar sem erro, move o lote para a tabela
+#      'mensagens' em uma única transação.
+# Se 'ao_processar' falhar, o lote volta para a fila e é tentado de novo depois
+# de FILA_ESPERA_ERRO_S segundos. Se o processo cair no meio, a reserva vence e
+# outro trabalhador pega o lote. Nenhuma mensagem se perde; em caso de queda
+# uma mensagem pode ser entregue duas vezes ("pelo menos uma vez").
+#
+# Contrapressão: com FILA_LIMITE mensagens esperando, 'enfileirar' levanta
+# FilaCheia e a rota pede para o usuário tentar de novo, em vez de a fila
+# crescer sem limite.
+#
+# Configurações:
+#   FILA_BANCO           arquivo do spool (padrão: fila_mensagens.db ao lado do app)
+#   FILA_LIMITE          máximo de mensagens esperando (padrão 1000)
+#   FILA_TRABALHADORES   threads trabalhadoras (padrão 2)
+#   FILA_LOTE            mensagens por lote (padrão 100)
+#   FILA_RESERVA_S       tempo máximo para processar um lote (padrão 300)
+#   FILA_ESPERA_ERRO_S   espera antes de tentar de novo um lote que falhou (padrão 30)
+
+
+class FilaCheia(Exception):
+    pass
+
+
+class FilaMensagens:
+    # Janela (em segundos) usada para calcular a taxa de escoamento
+    JANELA_TAXA = 60
+
+    def __init__(self, app=None, ao_processar=None):
+        self.ao_processar = ao_processar
+        self._local = threading.local()
+        self._acordar = threading.Event()
+        self._parar = threading.Event()
+        self._trava = threading.Lock()
+        self._trabalhadores = []
+        self._processados = deque()
+        self.enfileiradas = 0
+        self.processadas = 0
+        self.rejeitadas = 0
+        self.erros = 0
+        self.pendentes = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('FILA_BANCO', os.path.join(app.root_path, 'fila_mensagens.db'))
+        app.config.setdefault('FILA_LIMITE', 1000)
+        app.config.setdefault('FILA_TRABALHADORES', 2)
+        app.config.setdefault('FILA_LOTE', 100)
+        app.config.setdefault('FILA_RESERVA_S', 300)
+        app.config.setdefault('FILA_ESPERA_ERRO_S', 30)
+        self.app = app
+        self.caminho = app.config['FILA_BANCO']
+        self.limite = app.config['FILA_LIMITE']
+        self.lote = app.config['FILA_LOTE']
+        self.reserva = app.config['FILA_RESERVA_S']
+        self.espera_erro = app.config['FILA_ESPERA_ERRO_S']
+
+        conexao = self._conexao()
+        with conexao:
+            conexao.execute(
+                'CREATE TABLE IF NOT EXISTS fila ('
+                ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+                ' tipo TEXT NOT NULL,'
+                ' dados TEXT NOT NULL,'
+                ' criado_em REAL NOT NULL,'
+                ' disponivel_em REAL NOT NULL DEFAULT 0)'
+            )
+            # Spools criados antes da reserva de lotes não têm a coluna
+            colunas = {linha[1] for linha in conexao.execute('PRAGMA table_info(fila)')}
+            if 'disponivel_em' not in colunas:
+                conexao.execute('ALTER TABLE fila ADD COLUMN disponivel_em REAL NOT NULL DEFAULT 0')
+            conexao.execute(
+                'CREATE TABLE IF NOT EXISTS mensagens ('
+                ' id INTEGER PRIMARY KEY,'
+                ' tipo TEXT NOT NULL,'
+                ' dados TEXT NOT NULL,'
+                ' criado_em REAL NOT NULL,'
+                ' processado_em REAL NOT NULL)'
+            )
+        self._atualizar_pendentes()
+
+        # As threads só começam na primeira requisição: assim comandos como
+        # 'flask routes' ou o processo vigia do modo debug não as iniciam
+        app.before_request(self._iniciar_trabalhadores)
+        atexit.register(self.encerrar)
+
+    def _conexao(self):
+        # Uma conexão por thread (o sqlite3 não compartilha conexões entre threads)
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.caminho, timeout=10)
+            # WAL + synchronous=NORMAL: gravar na fila custa um append no log, sem fsync
+            conexao.execute('PRAGMA journal_mode=WAL')
+            conexao.execute('PRAGMA synchronous=NORMAL')
+            self._local.conexao = conexao
+        return conexao
+
+    def _atualizar_pendentes(self):
+        # Vários processos (ex.: gunicorn -w 4) podem usar o mesmo spool,
+        # então o número real de pendentes é relido do banco de tempos em tempos
+        self.pendentes = self._conexao().execute('SELECT COUNT(*) FROM fila').fetchone()[0]
+
+    # ---- Lado da requisição ----
+
+    def enfileirar(self, tipo, dados):
+        """Grava 'dados' (um dict serializável em JSON) na fila e retorna na hora."""
+        with self._trava:
+            if self.pendentes >= self.limite:
+                self.rejeitadas += 1
+                raise FilaCheia(f'{self.pendentes} mensagens esperando (limite: {self.limite})')
+            self.pendentes += 1
+            self.enfileiradas += 1
+        conexao = self._conexao()
+        with conexao:
+            conexao.execute(
+                'INSERT INTO fila (tipo, dados, criado_em) VALUES (?, ?, ?)',
+                (tipo, json.dumps(dados, ensure_ascii=False), time.time())
+            )
+        self._acordar.set()
+
+    def metricas(self):
+        agora = time.time()
+        with self._trava:
+            while self._processados and self._processados[0][0] < agora - self.JANELA_TAXA:
+                self._processados.popleft()
+            escoadas = sum(quantidade for _, quantidade in self._processados)
+            return {
+                'profundidade': self.pendentes,
+                'limite': self.limite,
+                'enfileiradas': self.enfileiradas,
+                'processadas': self.processadas,
+                'rejeitadas': self.rejeitadas,
+                'erros': self.erros,
+                'taxa_escoamento_por_s': round(escoadas / self.JANELA_TAXA, 2),
+                'trabalhadores': sum(t.is_alive() for t in self._trabalhadores),
+            }
+
+    # ---- Trabalhadores ----
+
+    def _iniciar_trabalhadores(self):
+        if self._trabalhadores:
+            return
+        with self._trava:
+            if self._trabalhadores:
+                return
+            for n in range(self.app.config['FILA_TRABALHADORES']):
+                trabalhador = threading.Thread(target=self._trabalhar, name=f'fila-{n}', daemon=True)
+                trabalhador.start()
+                self._trabalhadores.append(trabalhador)
+
+    def _trabalhar(self):
+        while not self._parar.is_set():
+            try:
+                quantidade = self.processar_lote()
+            except Exception:
+                with self._trava:
+                    self.erros += 1
+                self.app.logger.exception('Erro ao processar a fila de mensagens')
+                quantidade = 0
+            if not quantidade:
+                # Fila vazia: dorme até a próxima mensagem (ou 1 s, para ver
+                # mensagens gravadas por outros processos)
+                self._acordar.wait(1)
+                self._acordar.clear()
+
+    def _adiar(self, conexao, ids, disponivel_em):
+        conexao.executemany('UPDATE fila SET disponivel_em = ? WHERE id = ?', [(disponivel_em, id) for id in ids])
+
+    def processar_lote(self):
+        """Reserva um lote, chama 'ao_processar' e só então o tira da fila. Retorna o tamanho do lote."""
+        conexao = self._conexao()
+        # BEGIN IMMEDIATE reserva a escrita antes de ler: dois trabalhadores
+        # (ou dois processos) nunca reservam as mesmas mensagens
+        conexao.execute('BEGIN IMMEDIATE')
+        try:
+            agora = time.time()
+            linhas = conexao.execute(
+                'SELECT id, tipo, dados, criado_em FROM fila WHERE disponivel_em <= ? ORDER BY id LIMIT ?',
+                (agora, self.lote)
+            ).fetchall()
+            ids = [linha[0] for linha in linhas]
+            self._adiar(conexao, ids, agora + self.reserva)
+            conexao.commit()
+        except Exception:
+            conexao.rollback()
+            raise
+        if not linhas:
+            with self._trava:
+                self._atualizar_pendentes()
+            return 0
+
+        try:
+            if self.ao_processar is not None:
+                self.ao_processar([
+                    {'id': id, 'tipo': tipo, 'dados': json.loads(dados), 'criado_em': criado_em}
+                    for id, tipo, dados, criado_em in linhas
+                ])
+        except Exception:
+            # O lote continua na fila e volta a ficar disponível daqui a pouco
+            with conexao:
+                self._adiar(conexao, ids, time.time() + self.espera_erro)
+            raise
+
+        with conexao:
+            agora = time.time()
+            conexao.executemany(
+                'INSERT OR IGNORE INTO mensagens (id, tipo, dados, criado_em, processado_em) VALUES (?, ?, ?, ?, ?)',
+                [linha + (agora,) for linha in linhas]
+            )
+            conexao.executemany('DELETE FROM fila WHERE id = ?', [(id,) for id in ids])
+
+        with self._trava:
+            self._atualizar_pendentes()
+            self.processadas += len(linhas)
+            self._processados.append((time.time(), len(linhas)))
+        return len(linhas)
+
+    def encerrar(self, tempo_limite=5):
+        """Para os trabalhadores; o que ainda estiver na fila continua salvo no spool."""
+        self._parar.set()
+        self._acordar.set()
+        for trabalhador in self._trabalhadores:
+            trabalhador.join(tempo_limite)
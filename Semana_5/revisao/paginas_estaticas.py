@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import os
+import shutil
+import threading
+import click
+from flask import make_response, request, session
+
+# -----------------------------------------------------------------------------
+# PÁGINAS PRÉ-RENDERIZADAS
+# -----------------------------------------------------------------------------
+# O conteúdo das páginas de revisão (conteudo.py) nunca muda com o app rodando,
+# então cada página é renderizada uma única vez por processo e o HTML fica
+# guardado na memória. As próximas requisições recebem os mesmos bytes, com um
+# ETag forte (hash do HTML); se o navegador mandar o mesmo ETag em
+# If-None-Match, a resposta é um 304 sem corpo.
+#
+# Exceção: se a sessão tiver mensagens flash pendentes, a página é renderizada
+# normalmente, para que as mensagens apareçam (e sejam consumidas) como antes.
+#
+# As mesmas páginas também podem ser exportadas como arquivos HTML, para serem
+# servidas direto por um nginx ou CDN:
+#     flask --app app exportar-paginas site_estatico
+# (no nginx: try_files $uri $uri.html $uri/index.html =404;)
+
+# Tempo que o navegador pode reutilizar a página sem revalidar (em segundos)
+MAX_AGE = 300
+
+_paginas = {}
+_trava = threading.Lock()
+
+
+def _renderizar_uma_vez(chave, renderizar):
+    pagina = _paginas.get(chave)
+    if pagina is None:
+        with _trava:
+            pagina = _paginas.get(chave)
+            if pagina is None:
+                html = renderizar().encode('utf-8')
+                pagina = _paginas[chave] = (html, hashlib.sha256(html).hexdigest()[:32])
+    return pagina
+
+
+def pagina_pre_renderizada(chave, renderizar):
+    """Resposta com o HTML de 'renderizar()', gerado só na primeira chamada para 'chave'."""
+    if session.get('_flashes'):
+        return renderizar()
+
+    html, etag = _renderizar_uma_vez(chave, renderizar)
+    resposta = make_response(html)
+    resposta.set_etag(etag)
+    resposta.cache_control.public = True
+    resposta.cache_control.max_age = MAX_AGE
+    # make_conditional troca a resposta por um 304 quando o ETag confere
+    return resposta.make_conditional(request)
+
+
+def registrar_exportacao(app, listar_urls):
+    """Cria o comando 'flask exportar-paginas', que grava as URLs de 'listar_urls()' em HTML."""
+
+    @app.cli.command('exportar-paginas')
+    @click.argument('pasta', default='site_estatico')
+    def exportar_paginas(pasta):
+        """Grava as páginas pré-renderizadas (e a pasta static) em PASTA."""
+        cliente = app.test_client()
+        with app.test_request_context():
+            urls = listar_urls()
+        for url in urls:
+            resposta = cliente.get(url)
+            if resposta.status_code != 200:
+                raise click.ClickException(f'{url} respondeu {resposta.status_code}')
+            caminho = url.strip('/') or 'index'
+            destino = os.path.join(pasta, caminho + '.html')
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            with open(destino, 'wb') as arquivo:
+                arquivo.write(resposta.get_data())
+            click.echo(f'{url} -> {destino}')
+
+        if app.static_folder and os.path.isdir(app.static_folder):
+            shutil.copytree(app.static_folder, os.path.join(pasta, 'static'), dirs_exist_ok=True)
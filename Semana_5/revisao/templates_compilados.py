@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+import os
+import click
+from flask import render_template
+from jinja2 import FileSystemBytecodeCache, UndefinedError
+
+# -----------------------------------------------------------------------------
+# TEMPLATES PRÉ-COMPILADOS
+# -----------------------------------------------------------------------------
+# Por padrão o Jinja lê e compila cada template na primeira vez que ele é
+# usado, em cada processo. Aqui o código compilado de cada template é guardado
+# em disco (bytecode cache), então um worker novo só precisa carregá-lo.
+#
+# 1. Passo de build (depois de cada deploy):
+#        flask --app app compilar-templates
+# 2. Todo worker lê o cache da pasta TEMPLATES_CACHE (padrão: templates_compilados/)
+# 3. Com AQUECER_TEMPLATES=1, o worker carrega e renderiza cada template uma vez
+#    ao iniciar, antes de atender a primeira requisição (veja 'aquecer_se_pedido',
+#    chamado no fim do app.py, depois que todas as rotas já existem).
+#
+# Se um template mudar, o Jinja percebe (compara o conteúdo) e recompila só ele.
+
+
+def configurar_templates(app):
+    """Chamar logo depois de criar o app, antes de qualquer uso de app.jinja_env."""
+    pasta = app.config.get('TEMPLATES_CACHE') or os.environ.get(
+        'TEMPLATES_CACHE', os.path.join(app.root_path, 'templates_compilados'))
+    os.makedirs(pasta, exist_ok=True)
+    app.jinja_options = {**app.jinja_options, 'bytecode_cache': FileSystemBytecodeCache(pasta)}
+
+    @app.cli.command('compilar-templates')
+    def compilar_templates_comando():
+        """Compila todos os templates para o cache em disco."""
+        nomes = compilar_templates(app)
+        click.echo(f'{len(nomes)} templates compilados em {pasta}')
+
+
+def compilar_templates(app):
+    # get_template() compila o template e grava o resultado no bytecode cache
+    nomes = app.jinja_env.list_templates(extensions=['html'])
+    for nome in nomes:
+        app.jinja_env.get_template(nome)
+    return nomes
+
+
+def aquecer_templates(app):
+    """Carrega todos os templates e tenta renderizar cada um uma vez."""
+    for nome in compilar_templates(app):
+        with app.test_request_context():
+            try:
+                render_template(nome)
+            except UndefinedError:
+                # Alguns templates precisam de variáveis da rota (ex.: 'form');
+                # para eles basta já estarem compilados e carregados na memória
+                pass
+            except Exception:
+                # Qualquer outro erro é um problema de verdade no template (ou
+                # no que ele chama): fica no log, sem impedir o worker de subir
+                app.logger.exception('Erro ao aquecer o template %s', nome)
+
+
+def aquecer_se_pedido(app):
+    if app.config.get('AQUECER_TEMPLATES') or os.environ.get('AQUECER_TEMPLATES') == '1':
+        aquecer_templates(app)
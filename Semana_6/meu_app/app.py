@@ -1,18 +1,29 @@
 # -*- coding: utf-8 -*-
 
 # Passo 1: Importações e Configuração
+import os
+import sys
 from datetime import datetime
 from flask import Flask, render_template, request, redirect, url_for
 from flask_sqlalchemy import SQLAlchemy
-# Inicializa a aplicação Flask
-app = Flask(__name__)
-app.config['SECRET_KEY'] = 'Sua-Segurança-Mora-Aqui'
+from sqlalchemy import event
+from paginacao import paginar
+# Módulos compartilhados entre os apps (pasta compartilhado/ na raiz do repositório)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir))
+from compartilhado.cache_http import CacheHTTP
 
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///meuapp.db'
+# Configurações padrão; create_app(config) pode sobrescrever qualquer uma delas
+CONFIG_PADRAO = {
+    'SECRET_KEY': 'Sua-Segurança-Mora-Aqui',
+    'SQLALCHEMY_DATABASE_URI': 'sqlite:///meuapp.db',
+    'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+}
 
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Criado sem aplicação e ligado a ela em create_app(), com init_app()
+db = SQLAlchemy()
 
-db = SQLAlchemy(app)
+# ETag e GET condicional de /postagem (veja compartilhado/cache_http.py)
+http = CacheHTTP(('postagem',))
 
 class Usuario(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -26,48 +37,72 @@ class Postagem(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     titulo = db.Column(db.String(120), nullable=False)
     conteudo = db.Column(db.Text, nullable=False)
-    data_publicacao = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    data_publicacao = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
     
     def __repr__(self):
         return f'<Postagem {self.titulo}>'
     
     def __repr__(self):
         return f'<Postagem {self.conteudo}>'
+
+# create_all() só cria tabelas que não existem: um meuapp.db antigo já tem a
+# tabela 'postagem' e nunca receberia o índice de 'data_publicacao' (usado pela
+# paginação de /postagem). Criamos o índice aqui, se ainda não existir.
+@event.listens_for(db.metadata, 'after_create')
+def criar_indice_data_publicacao(metadata, conexao, **kwargs):
+    conexao.exec_driver_sql(
+        'CREATE INDEX IF NOT EXISTS ix_postagem_data_publicacao ON postagem (data_publicacao)'
+    )
+
 # --- Rotas da Aplicação ---
 
-# Rota principal que exibe o formulário e a lista de usuários
-@app.route('/')
-def index():
-    usuarios = Usuario.query.all()
-    return render_template('index.html', usuarios=usuarios)
+# Fábrica da aplicação: nada do Flask é criado no momento do 'import'
+def create_app(config=None):
+    app = Flask(__name__)
+    app.config.update(CONFIG_PADRAO)
+    if config:
+        app.config.update(config)
+    db.init_app(app)
+    http.init_app(app, db)
+
+    # Rota principal que exibe o formulário e a lista de usuários
+    @app.route('/')
+    def index():
+        usuarios = Usuario.query.all()
+        return render_template('index.html', usuarios=usuarios)
+
+    # Rota para adicionar um novo usuário
+    @app.route('/adicionar', methods=['POST'])
+    def adicionar_usuario():
+        nome = request.form['nome']
+        email = request.form['email']
+        novo_usuario = Usuario(nome=nome, email=email)
+        db.session.add(novo_usuario)
+        db.session.commit()
+        return redirect(url_for('index'))
+
+    @app.route('/postagem', methods=['GET'])
+    @http.condicional('postagem')
+    def postagem():
+        # Ordena pela data de publicação; o id desempata postagens com a mesma data
+        pagina = paginar(Postagem.query, Postagem.data_publicacao, Postagem.id)
+        return render_template('postagem.html', postagens=pagina.itens, pagina=pagina)
+    # Rota para adicionar uma nova postagem
+    @app.route('/postagem', methods=['POST'])
+    def adicionar_postagem():
+        titulo = request.form['titulo']
+        conteudo = request.form['conteudo']
+        data_publicacao = datetime.utcnow()
+        nova_postagem = Postagem(titulo=titulo, conteudo=conteudo, data_publicacao=data_publicacao)
+        db.session.add(nova_postagem)
+        db.session.commit()
+        return redirect(url_for('postagem'))
 
-# Rota para adicionar um novo usuário
-@app.route('/adicionar', methods=['POST'])
-def adicionar_usuario():
-    nome = request.form['nome']
-    email = request.form['email']
-    novo_usuario = Usuario(nome=nome, email=email)
-    db.session.add(novo_usuario)
-    db.session.commit()
-    return redirect(url_for('index'))
+    return app
 
-@app.route('/postagem', methods=['GET'])
-def postagem():
-    postagens = Postagem.query.all()
-    return render_template('postagem.html', postagens=postagens)
-# Rota para adicionar uma nova postagem
-@app.route('/postagem', methods=['POST'])
-def adicionar_postagem():
-    titulo = request.form['titulo']
-    conteudo = request.form['conteudo']
-    data_publicacao = datetime.utcnow()
-    nova_postagem = Postagem(titulo=titulo, conteudo=conteudo, data_publicacao=data_publicacao)
-    db.session.add(nova_postagem)
-    db.session.commit()
-    return redirect(url_for('postagem'))
- 
 # Passo 3: Criando o Banco de Dados Físico
 if __name__ == '__main__':
+    app = create_app()
     with app.app_context():
         db.create_all()
     
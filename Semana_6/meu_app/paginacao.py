@@ -0,0 +1,75 @@
+from datetime import datetime
+from flask import abort, request
+from sqlalchemy import tuple_
+
+# -----------------------------------------------------------------------------
+# PAGINAÇÃO POR CURSOR (KEYSET)
+# -----------------------------------------------------------------------------
+# Em vez de carregar a tabela inteira com .all() (ou de usar OFFSET, que obriga o
+# banco a percorrer todas as linhas anteriores), pedimos apenas as linhas que
+# vêm DEPOIS da última linha mostrada. Com um índice nas colunas de ordenação,
+# o custo de cada página depende só do tamanho da página.
+#
+# Parâmetros lidos da URL:
+#   ?limit=20            quantas linhas por página (máximo LIMITE_MAXIMO)
+#   ?after=<cursor>      cursor devolvido pela página anterior
+
+LIMITE_PADRAO = 20
+LIMITE_MAXIMO = 100
+
+
+class Pagina:
+    """Uma página de resultados e o cursor para buscar a próxima (ou None)."""
+
+    def __init__(self, itens, proximo, limite):
+        self.itens = itens
+        self.proximo = proximo
+        self.limite = limite
+
+
+def _escrever_cursor(item, colunas):
+    valores = []
+    for coluna in colunas:
+        valor = getattr(item, coluna.key)
+        valores.append(valor.isoformat() if isinstance(valor, datetime) else str(valor))
+    return '_'.join(valores)
+
+
+def _ler_cursor(cursor, colunas):
+    partes = cursor.split('_')
+    if len(partes) != len(colunas):
+        abort(400)
+    valores = []
+    try:
+        for parte, coluna in zip(partes, colunas):
+            tipo = coluna.type.python_type
+            valores.append(datetime.fromisoformat(parte) if tipo is datetime else tipo(parte))
+    except ValueError:
+        abort(400)
+    return valores
+
+
+def paginar(query, *colunas):
+    """
+    Pagina 'query' em ordem crescente pelas colunas informadas.
+    A última coluna precisa ser única (normalmente o id) para desempatar,
+    por exemplo: paginar(Postagem.query, Postagem.data_publicacao, Postagem.id)
+    """
+    limite = request.args.get('limit', LIMITE_PADRAO, type=int)
+    limite = max(1, min(limite, LIMITE_MAXIMO))
+
+    cursor = request.args.get('after')
+    if cursor:
+        valores = _ler_cursor(cursor, colunas)
+        if len(colunas) == 1:
+            query = query.filter(colunas[0] > valores[0])
+        else:
+            query = query.filter(tuple_(*colunas) > tuple_(*valores))
+
+    # Buscamos uma linha a mais só para saber se existe uma próxima página
+    itens = query.order_by(*colunas).limit(limite + 1).all()
+    proximo = None
+    if len(itens) > limite:
+        itens = itens[:limite]
+        proximo = _escrever_cursor(itens[-1], colunas)
+    return Pagina(itens, proximo, limite)
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+# Os formulários ficam em um módulo separado porque wtforms e flask_wtf são
+# importações pesadas. O app.py só importa este arquivo dentro das rotas que
+# usam formulários, e não na inicialização do processo.
+from flask_wtf import FlaskForm
+from wtforms import IntegerField, SelectField, StringField, SubmitField, ValidationError
+from wtforms.validators import DataRequired
+from models import db, Autor
+from versoes import CacheVersionado
+
+# --- Cache da lista de autores para o formulário de livros ---
+# Guardamos apenas os pares (id, nome), e não objetos Autor completos.
+# A lista é montada uma vez e refeita quando a versão da tabela 'autor' muda
+# (veja versoes.py). A versão é mantida por gatilhos do SQLite, então um autor
+# criado por outro worker ou pelo 'flask importar' também renova a lista.
+_cache_autores = CacheVersionado('autor', lambda: [
+    (autor_id, nome)
+    for autor_id, nome in db.session.execute(db.select(Autor.id, Autor.nome).order_by(Autor.nome))
+])
+
+def escolhas_autores():
+    return _cache_autores()
+
+class AutorField(SelectField):
+    """
+    Campo de seleção de autor que trabalha só com o id.
+    A validação é uma única busca pela chave primária, em vez de procurar o
+    autor dentro da lista inteira. As opções (do cache acima) são preenchidas
+    pela rota, só quando o formulário vai ser mostrado, e antes do
+    render_template: durante a renderização a conexão já voltou ao pool
+    (veja sessoes_banco.py) e nada pode consultar o banco.
+    """
+    def __init__(self, label=None, validators=None, **kwargs):
+        super().__init__(label, validators, coerce=int, choices=[],
+                         validate_choice=False, **kwargs)
+
+    def pre_validate(self, form):
+        if self.data is None or db.session.get(Autor, self.data) is None:
+            raise ValidationError('Autor não encontrado.')
+
+class AutorForm(FlaskForm):
+    nome = StringField('Nome do Autor', validators=[DataRequired()])
+    submit = SubmitField('Adicionar Autor')
+
+class LivroForm(FlaskForm):
+    titulo = StringField('Título do Livro', validators=[DataRequired()])
+    ano_publicacao = IntegerField('Ano de Publicação', validators=[DataRequired()])
+    
+    autor = AutorField('Autor', validators=[DataRequired()])
+    
+    submit = SubmitField('Adicionar Livro')
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+
+import csv
+import itertools
+import json
+import os
+import time
+import click
+from sqlalchemy import Column, Integer, MetaData, String, Table, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from models import db, Usuario, Autor, Livro
+
+# -----------------------------------------------------------------------------
+# IMPORTAÇÃO EM MASSA (CSV ou JSONL)
+# -----------------------------------------------------------------------------
+#     flask --app app importar usuarios usuarios.csv
+#     flask --app app importar autores autores.jsonl --ignorar-duplicados
+#     flask --app app importar livros livros.csv --lote 20000
+#
+# O arquivo é lido aos poucos (nunca inteiro na memória) e gravado em lotes:
+# cada lote é um único INSERT com executemany do SQLAlchemy Core, dentro da sua
+# própria transação. Nenhum objeto do ORM é criado.
+#
+# Colunas esperadas (cabeçalho do CSV ou chaves do JSON):
+#   usuarios: nome, email
+#   autores:  nome
+#   livros:   titulo, ano_publicacao, autor (nome) ou autor_id
+# Para livros, os nomes dos autores viram ids por um dicionário em memória;
+# autores que ainda não existem são criados no mesmo lote.
+#
+# Ponto de controle: junto com cada lote é gravado, NA MESMA TRANSAÇÃO, quantas
+# linhas do arquivo já foram importadas (tabela 'importacao_progresso'). Se a
+# importação falhar no meio, rodar o mesmo comando de novo continua do último
+# lote gravado, sem duplicar nem perder linhas. Use --recomecar para ignorar o
+# ponto de controle e importar desde o início.
+#
+# Obs.: o formulário de livros guarda a lista de autores em cache (forms.py).
+# Os gatilhos de versoes.py marcam a tabela 'autor' como alterada, então os
+# servidores que já estão no ar veem os autores novos na próxima requisição.
+
+TABELAS = {
+    'usuarios': (Usuario.__table__, ('nome', 'email')),
+    'autores': (Autor.__table__, ('nome',)),
+    'livros': (Livro.__table__, ('titulo', 'ano_publicacao', 'autor_id')),
+}
+
+# Fica fora de db.metadata: não faz parte dos modelos do app
+_metadados = MetaData()
+progresso = Table(
+    'importacao_progresso', _metadados,
+    Column('chave', String(500), primary_key=True),
+    Column('linhas', Integer, nullable=False),
+)
+
+
+def ler_registros(arquivo, formato):
+    """Gera um dict por linha do arquivo, sem carregá-lo inteiro."""
+    with open(arquivo, encoding='utf-8', newline='') as entrada:
+        if formato == 'csv':
+            yield from csv.DictReader(entrada)
+        else:
+            for linha in entrada:
+                if linha.strip():
+                    yield json.loads(linha)
+
+
+class MapaAutores:
+    """Dicionário nome -> id dos autores, carregado com uma única consulta."""
+
+    def __init__(self, conexao):
+        self.conexao = conexao
+        self.ids = dict(conexao.execute(select(Autor.nome, Autor.id)).all())
+
+    def resolver(self, nomes):
+        faltando = {nome for nome in nomes if nome not in self.ids}
+        if faltando:
+            tabela = Autor.__table__
+            self.conexao.execute(
+                sqlite_insert(tabela).on_conflict_do_nothing(index_elements=['nome']),
+                [{'nome': nome} for nome in faltando]
+            )
+            self.ids.update(self.conexao.execute(
+                select(tabela.c.nome, tabela.c.id).where(tabela.c.nome.in_(faltando))
+            ).all())
+
+
+def _preparar(nome_tabela, colunas, registros, autores):
+    linhas = []
+    for numero, registro in registros:
+        try:
+            if nome_tabela == 'livros':
+                autor_id = registro.get('autor_id')
+                linha = {
+                    'titulo': registro['titulo'],
+                    'ano_publicacao': int(registro['ano_publicacao']),
+                    'autor_id': int(autor_id) if autor_id not in (None, '') else registro['autor'].strip(),
+                }
+            else:
+                linha = {coluna: registro[coluna] for coluna in colunas}
+        except (KeyError, ValueError, AttributeError) as erro:
+            raise click.ClickException(f'Linha {numero}: registro inválido ({erro!r})')
+        linhas.append(linha)
+
+    if nome_tabela == 'livros':
+        nomes = [linha['autor_id'] for linha in linhas if isinstance(linha['autor_id'], str)]
+        autores.resolver(nomes)
+        for linha in linhas:
+            if isinstance(linha['autor_id'], str):
+                linha['autor_id'] = autores.ids[linha['autor_id']]
+    return linhas
+
+
+def importar(nome_tabela, arquivo, formato=None, lote=10000, ignorar_duplicados=False,
+             recomecar=False, relatar=click.echo):
+    """Importa 'arquivo' para a tabela. Retorna o número de linhas gravadas nesta execução."""
+    tabela, colunas = TABELAS[nome_tabela]
+    formato = formato or ('csv' if arquivo.lower().endswith('.csv') else 'jsonl')
+    chave = f'{nome_tabela}:{os.path.abspath(arquivo)}'
+
+    comando = insert(tabela)
+    if ignorar_duplicados:
+        comando = sqlite_insert(tabela).on_conflict_do_nothing()
+
+    engine = db.engine
+    _metadados.create_all(engine)
+    with engine.begin() as conexao:
+        if recomecar:
+            conexao.execute(progresso.delete().where(progresso.c.chave == chave))
+        ja_importadas = conexao.execute(
+            select(progresso.c.linhas).where(progresso.c.chave == chave)
+        ).scalar() or 0
+    if ja_importadas:
+        relatar(f'Continuando a partir da linha {ja_importadas + 1} (ponto de controle)')
+
+    # Números de linha começam em 1; as já importadas são puladas sem gravar nada
+    registros = itertools.islice(enumerate(ler_registros(arquivo, formato), start=1), ja_importadas, None)
+    gravadas = 0
+    inicio = time.perf_counter()
+    with engine.connect() as conexao:
+        autores = MapaAutores(conexao) if nome_tabela == 'livros' else None
+        conexao.commit()
+        while True:
+            pedaco = list(itertools.islice(registros, lote))
+            if not pedaco:
+                break
+            with conexao.begin():
+                conexao.execute(comando, _preparar(nome_tabela, colunas, pedaco, autores))
+                # O ponto de controle é gravado junto com o lote: ou os dois
+                # ficam no banco, ou nenhum dos dois
+                conexao.execute(
+                    sqlite_insert(progresso)
+                    .values(chave=chave, linhas=pedaco[-1][0])
+                    .on_conflict_do_update(index_elements=['chave'], set_={'linhas': pedaco[-1][0]})
+                )
+            gravadas += len(pedaco)
+            decorrido = time.perf_counter() - inicio
+            relatar(f'{ja_importadas + gravadas} linhas ({gravadas / decorrido:,.0f} linhas/s)')
+
+    decorrido = time.perf_counter() - inicio
+    relatar(f'Concluído: {gravadas} linhas novas em {decorrido:.1f} s '
+            f'({gravadas / decorrido if decorrido else 0:,.0f} linhas/s)')
+    return gravadas
+
+
+def registrar_comando_importacao(app):
+    @app.cli.command('importar')
+    @click.argument('tabela', type=click.Choice(list(TABELAS)))
+    @click.argument('arquivo', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--formato', type=click.Choice(['csv', 'jsonl']),
+                  help='Padrão: pela extensão do arquivo (.csv ou qualquer outra = JSONL).')
+    @click.option('--lote', default=10000, show_default=True, help='Linhas por transação.')
+    @click.option('--ignorar-duplicados', is_flag=True,
+                  help='Pula linhas que violam uma coluna única (ex.: nome repetido).')
+    @click.option('--recomecar', is_flag=True, help='Ignora o ponto de controle e importa desde o início.')
+    def importar_comando(tabela, arquivo, formato, lote, ignorar_duplicados, recomecar):
+        """Importa TABELA (usuarios, autores ou livros) de um ARQUIVO CSV ou JSONL."""
+        importar(tabela, arquivo, formato, lote, ignorar_duplicados, recomecar)
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+from flask_sqlalchemy import SQLAlchemy
+
+# A extensão é criada sem aplicação; ela é ligada ao app dentro de
+# create_app() com db.init_app(app) (veja app.py)
+db = SQLAlchemy()
+
+
+# Passo 2: Criando o Modelo (a "planta" da nossa tabela)
+class Usuario(db.Model):
+    """
+    Define a estrutura da tabela 'usuario' no banco de dados.
+    Cada atributo da classe representa uma coluna na tabela.
+    """
+    id = db.Column(db.Integer, primary_key=True)  # ID único para cada usuário
+    nome = db.Column(db.String(80), unique=True, nullable=False)  # Nome do usuário, não pode repetir e não pode ser nulo
+    email = db.Column(db.String(120), unique=True, nullable=False) # Email do usuário, também único e obrigatório
+
+    postagens = db.relationship('Postagem', backref='autor', lazy=True)
+
+    def __repr__(self):
+        """
+        Representação em string do objeto, útil para debug.
+        Corrigido de self.username para self.nome para corresponder ao modelo.
+        """
+        return f'<Usuário {self.nome}>'
+
+class Postagem(db.Model):
+    id = db.Column(db.Integer, primary_key=True)  # ID único para cada postagem
+    titulo = db.Column(db.String(80), unique=True, nullable=False)  # Título da postagem, não pode repetir e não pode ser nulo
+    descricao = db.Column(db.String(120), unique=True, nullable=False) # Descrição da postagem, também única e obrigatória
+
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False)
+
+    def __repr__(self):
+        return f'<Postagem {self.titulo}>'
+
+class Autor(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    nome = db.Column(db.String(100), unique=True, nullable=False)
+    
+    livros = db.relationship('Livro', backref='autor_rel', lazy=True)
+
+    def __repr__(self):
+        return f'<Autor {self.nome}>'
+
+class Livro(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    titulo = db.Column(db.String(200), nullable=False)
+    ano_publicacao = db.Column(db.Integer, nullable=False)
+    autor_id = db.Column(db.Integer, db.ForeignKey('autor.id'), nullable=False)
+    
+    autor = db.relationship('Autor', backref=db.backref('livros_assoc', lazy=True))
+
+    def __repr__(self):
+        return f'<Livro {self.titulo}>'
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+
+import atexit
+import hmac
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# -----------------------------------------------------------------------------
+# PERFILADOR POR AMOSTRAGEM (MIDDLEWARE WSGI)
+# -----------------------------------------------------------------------------
+# Envolve app.wsgi_app e perfila uma amostra das requisições: 1 a cada
+# PERFILADOR_AMOSTRA requisições. Durante uma requisição perfilada, uma thread
+# auxiliar copia a pilha de chamadas da thread que atende a requisição a cada
+# PERFILADOR_INTERVALO_MS milissegundos.
+#
+# As pilhas são somadas por rota (endpoint) e gravadas em PERFILADOR_PASTA:
+#   <endpoint>.folded   formato "collapsed stacks", pronto para o flamegraph.pl
+#                       ou para o speedscope.app
+#   resumo.json         requisições perfiladas e tempo estimado em cada etapa
+# Os arquivos são gravados por uma thread própria a cada PERFILADOR_GRAVAR_S
+# segundos (padrão 10) e uma última vez quando o processo termina, nunca dentro
+# de uma requisição.
+#
+# Para perfilar uma requisição específica, defina PERFILADOR_SEGREDO e mande o
+# cabeçalho "X-Perfilar: <segredo>". Sem o segredo configurado o cabeçalho é
+# ignorado: um cliente qualquer não consegue ligar o perfilador em todas as
+# requisições e deixar o servidor mais lento.
+#
+# Cada pilha começa com a etapa em que a amostra caiu: 'template' (Jinja),
+# 'formulario' (WTForms) ou 'requisicao' (todo o resto: rota, banco etc.).
+#
+# Para ativar, defina a variável de ambiente PERFILADOR_AMOSTRA (ex.: 1000).
+# Sem ela o middleware nem é instalado, então o custo é zero.
+
+
+def instalar_perfilador(app):
+    amostra = app.config.get('PERFILADOR_AMOSTRA') or os.environ.get('PERFILADOR_AMOSTRA')
+    if not amostra:
+        return
+    app.wsgi_app = PerfiladorWSGI(
+        app.wsgi_app,
+        app.url_map,
+        amostra=int(amostra),
+        pasta=app.config.get('PERFILADOR_PASTA') or os.environ.get('PERFILADOR_PASTA', 'perfis'),
+        intervalo_ms=float(os.environ.get('PERFILADOR_INTERVALO_MS', 1)),
+        segredo=app.config.get('PERFILADOR_SEGREDO') or os.environ.get('PERFILADOR_SEGREDO'),
+        gravar_a_cada=float(app.config.get('PERFILADOR_GRAVAR_S') or os.environ.get('PERFILADOR_GRAVAR_S', 10)),
+    )
+
+
+def _etapa(arquivo):
+    if os.sep + 'jinja2' + os.sep in arquivo or arquivo.endswith('templating.py'):
+        return 'template'
+    if os.sep + 'wtforms' + os.sep in arquivo:
+        return 'formulario'
+    return None
+
+
+class _Amostrador(threading.Thread):
+    def __init__(self, id_thread, intervalo):
+        super().__init__(daemon=True)
+        self.id_thread = id_thread
+        self.intervalo = intervalo
+        self.pilhas = Counter()
+        self._parar = threading.Event()
+
+    def run(self):
+        while not self._parar.wait(self.intervalo):
+            quadro = sys._current_frames().get(self.id_thread)
+            nomes = []
+            while quadro is not None:
+                codigo = quadro.f_code
+                nomes.append((codigo.co_filename, f'{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno})'))
+                quadro = quadro.f_back
+            nomes.reverse()
+            # A etapa é decidida pelo primeiro quadro (de fora para dentro) que
+            # pertence ao Jinja ou ao WTForms
+            etapa = next((e for e in (_etapa(arquivo) for arquivo, _ in nomes) if e), 'requisicao')
+            self.pilhas[';'.join([etapa] + [nome for _, nome in nomes])] += 1
+
+    def parar(self):
+        self._parar.set()
+        self.join()
+
+
+class _RespostaPerfilada:
+    """Repassa o corpo da resposta e, no close(), encerra a amostragem."""
+
+    def __init__(self, resposta, ao_fechar):
+        self.resposta = resposta
+        self.ao_fechar = ao_fechar
+
+    def __iter__(self):
+        return iter(self.resposta)
+
+    def close(self):
+        ao_fechar, self.ao_fechar = self.ao_fechar, None
+        try:
+            if hasattr(self.resposta, 'close'):
+                self.resposta.close()
+        finally:
+            if ao_fechar is not None:
+                ao_fechar()
+
+
+class PerfiladorWSGI:
+    def __init__(self, wsgi_app, url_map, amostra=1000, pasta='perfis', intervalo_ms=1,
+                 segredo=None, gravar_a_cada=10):
+        self.wsgi_app = wsgi_app
+        self.url_map = url_map
+        self.amostra = amostra
+        self.pasta = pasta
+        self.intervalo = intervalo_ms / 1000
+        self.segredo = segredo
+        self._contador = itertools.count()
+        self._trava = threading.Lock()
+        self._pilhas = {}
+        self._resumo = {}
+        self._alterados = set()
+        self._trava_gravacao = threading.Lock()
+        self._parar = threading.Event()
+        self._gravador = threading.Thread(target=self._gravar_periodicamente, args=(gravar_a_cada,),
+                                          name='perfilador-gravador', daemon=True)
+        self._gravador.start()
+        atexit.register(self.encerrar)
+
+    def _forcado(self, environ):
+        pedido = environ.get('HTTP_X_PERFILAR')
+        return bool(self.segredo and pedido) and hmac.compare_digest(pedido, self.segredo)
+
+    def __call__(self, environ, start_response):
+        forcado = self._forcado(environ)
+        if not forcado and next(self._contador) % self.amostra:
+            return self.wsgi_app(environ, start_response)
+
+        amostrador = _Amostrador(threading.get_ident(), self.intervalo)
+        inicio = time.perf_counter()
+        amostrador.start()
+
+        def encerrar():
+            amostrador.parar()
+            self._registrar(environ, amostrador.pilhas, time.perf_counter() - inicio)
+
+        try:
+            resposta = self.wsgi_app(environ, start_response)
+        except BaseException:
+            encerrar()
+            raise
+        # O corpo continua sendo produzido sob demanda, enquanto o servidor o
+        # envia (uma resposta em streaming não fica inteira na memória); a
+        # amostragem termina quando o servidor chama close()
+        return _RespostaPerfilada(resposta, encerrar)
+
+    def _endpoint(self, environ):
+        try:
+            endpoint, _ = self.url_map.bind_to_environ(environ).match()
+            return endpoint
+        except Exception:
+            return 'desconhecido'
+
+    def _registrar(self, environ, pilhas, duracao):
+        endpoint = self._endpoint(environ)
+        with self._trava:
+            total = self._pilhas.setdefault(endpoint, Counter())
+            total.update(pilhas)
+
+            resumo = self._resumo.setdefault(endpoint, {'requisicoes': 0, 'tempo_total_ms': 0.0, 'ms_por_etapa': {}})
+            resumo['requisicoes'] += 1
+            resumo['tempo_total_ms'] += duracao * 1000
+            for pilha, quantidade in pilhas.items():
+                etapa = pilha.split(';', 1)[0]
+                etapas = resumo['ms_por_etapa']
+                etapas[etapa] = etapas.get(etapa, 0) + quantidade * self.intervalo * 1000
+            self._alterados.add(endpoint)
+
+    # ---- Gravação dos arquivos (fora das requisições) ----
+
+    def _gravar_periodicamente(self, intervalo):
+        while not self._parar.wait(intervalo):
+            self.gravar()
+
+    def gravar(self):
+        """Grava os arquivos das rotas perfiladas desde a última gravação."""
+        # Uma gravação por vez; as requisições só esperam a cópia dos contadores
+        with self._trava_gravacao:
+            with self._trava:
+                if not self._alterados:
+                    return
+                pilhas = {endpoint: self._pilhas[endpoint].most_common() for endpoint in self._alterados}
+                resumo = json.dumps(self._resumo, indent=2, ensure_ascii=False)
+                self._alterados.clear()
+
+            os.makedirs(self.pasta, exist_ok=True)
+            for endpoint, linhas in pilhas.items():
+                with open(os.path.join(self.pasta, f'{endpoint}.folded'), 'w', encoding='utf-8') as arquivo:
+                    for pilha, quantidade in linhas:
+                        arquivo.write(f'{pilha} {quantidade}\n')
+            with open(os.path.join(self.pasta, 'resumo.json'), 'w', encoding='utf-8') as arquivo:
+                arquivo.write(resumo)
+
+    def encerrar(self):
+        self._parar.set()
+        self.gravar()
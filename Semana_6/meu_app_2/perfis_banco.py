@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+import os
+from sqlalchemy import event
+
+# -----------------------------------------------------------------------------
+# PERFIS DE CONFIGURAÇÃO DO SQLITE
+# -----------------------------------------------------------------------------
+# O perfil é escolhido pela chave PERFIL_BANCO da configuração (ou pela variável
+# de ambiente de mesmo nome). O padrão é 'desenvolvimento', que mantém o SQLite
+# como ele vem de fábrica. Em 'producao' cada conexão do pool recebe os PRAGMAs
+# abaixo, e o pool de conexões é dimensionado para servidores com várias threads.
+#
+#     PERFIL_BANCO=producao gunicorn -w 4 --threads 8 'app:create_app()'
+
+PRAGMAS_PRODUCAO = {
+    # WAL: leitores não bloqueiam o escritor e o escritor não bloqueia leitores
+    'journal_mode': 'WAL',
+    # Com WAL, NORMAL continua seguro contra corrupção e evita um fsync por commit
+    'synchronous': 'NORMAL',
+    # Espera até 5 s pelo lock em vez de falhar na hora com "database is locked"
+    'busy_timeout': 5000,
+    # Lê o arquivo via memória mapeada (até 256 MB)
+    'mmap_size': 256 * 1024 * 1024,
+    # Cache de páginas de 64 MB por conexão (valor negativo = em KB)
+    'cache_size': -64 * 1024,
+    # O SQLite só verifica chaves estrangeiras se isso for ligado em cada conexão
+    'foreign_keys': 'ON',
+}
+
+PERFIS = {
+    'desenvolvimento': {},
+    'producao': {
+        'SQLITE_PRAGMAS': PRAGMAS_PRODUCAO,
+        # Uma conexão por thread do servidor, com uma pequena folga
+        'SQLALCHEMY_ENGINE_OPTIONS': {
+            'pool_size': 8,
+            'max_overflow': 4,
+            'pool_timeout': 10,
+            'connect_args': {'timeout': 5},
+        },
+    },
+}
+
+
+def _banco_em_memoria(uri):
+    return uri in ('sqlite://', 'sqlite:///:memory:')
+
+
+def configurar_perfil(app):
+    """Aplica o perfil escolhido na configuração. Chamar ANTES de db.init_app(app)."""
+    nome = app.config.get('PERFIL_BANCO') or os.environ.get('PERFIL_BANCO', 'desenvolvimento')
+    if nome not in PERFIS:
+        raise ValueError(f'Perfil de banco desconhecido: {nome!r} (use {", ".join(PERFIS)})')
+    app.config['PERFIL_BANCO'] = nome
+
+    for chave, valor in PERFIS[nome].items():
+        # Um banco em memória usa um pool especial, que não aceita essas opções
+        if chave == 'SQLALCHEMY_ENGINE_OPTIONS' and _banco_em_memoria(app.config['SQLALCHEMY_DATABASE_URI']):
+            continue
+        app.config.setdefault(chave, valor)
+
+
+def ativar_pragmas(app, db):
+    """Executa os PRAGMAs do perfil em cada nova conexão. Chamar DEPOIS de db.init_app(app)."""
+    pragmas = app.config.get('SQLITE_PRAGMAS')
+    if not pragmas:
+        return
+
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, 'connect')
+    def _executar_pragmas(conexao, registro):
+        cursor = conexao.cursor()
+        for nome, valor in pragmas.items():
+            cursor.execute(f'PRAGMA {nome}={valor}')
+        cursor.close()
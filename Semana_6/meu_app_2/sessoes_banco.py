@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+
+import os
+import threading
+import time
+from flask import before_render_template
+from sqlalchemy import event
+from sqlalchemy.pool import NullPool, QueuePool, SingletonThreadPool
+
+# -----------------------------------------------------------------------------
+# POOL DE CONEXÕES E CICLO DE VIDA DA SESSÃO
+# -----------------------------------------------------------------------------
+# Atrás do gunicorn com threads (gthread), cada requisição pega uma conexão do
+# pool na primeira consulta e só a devolve no fim do app context, DEPOIS de
+# renderizar o template. Aqui o pool é configurável e a conexão é devolvida
+# antes da renderização:
+#
+#     BANCO_POOL=fila BANCO_POOL_TAMANHO=8 gunicorn -w 2 --threads 8 'app:create_app()'
+#
+# 1. configurar_pool(app), ANTES de db.init_app(app), monta as opções do engine
+#    a partir das chaves abaixo (da configuração ou de variáveis de ambiente).
+#    Só as chaves definidas entram; as outras ficam como o perfil do banco (veja
+#    perfis_banco.py) ou o SQLAlchemy deixam.
+#
+#    BANCO_POOL            'fila'       QueuePool: conexões reaproveitadas por
+#                                       qualquer thread (o padrão do SQLAlchemy
+#                                       para arquivos SQLite);
+#                          'por_thread' SingletonThreadPool: cada thread fica com
+#                                       a sua conexão (afinidade de thread).
+#                                       BANCO_POOL_TAMANHO (padrão
+#                                       TAMANHO_POR_THREAD) precisa ser maior
+#                                       que o número de threads que usam o
+#                                       banco: acima dele o pool fecha a conexão
+#                                       de outra thread, mesmo em uso;
+#                          'sem_pool'   NullPool: abre e fecha a cada uso.
+#    BANCO_POOL_TAMANHO    pool_size: conexões mantidas abertas
+#    BANCO_POOL_EXTRA      max_overflow: conexões a mais em picos ('fila')
+#    BANCO_POOL_TIMEOUT    pool_timeout: segundos esperando uma conexão livre
+#    BANCO_POOL_RECICLAR   pool_recycle: segundos até uma conexão ser reaberta
+#    BANCO_POOL_PRE_PING   pool_pre_ping: testa a conexão antes de cada uso
+#    BANCO_MESMA_THREAD    check_same_thread do sqlite3. Só pode ser True com
+#                          'sem_pool', em que a conexão abre e fecha na mesma
+#                          thread: a 'fila' passa a conexão de uma thread para
+#                          outra, e a 'por_thread' fecha conexões de outras
+#                          threads (no limite de tamanho e no dispose()).
+#
+# 2. instalar_sessoes(app, db), DEPOIS de db.init_app(app):
+#    - libera a conexão antes de renderizar o template (BANCO_LIBERAR_ANTES_DO_TEMPLATE,
+#      padrão True): se a sessão não tem nada pendente, ela é fechada e a
+#      conexão volta ao pool. Os objetos já carregados continuam legíveis, mas
+#      um relacionamento ainda não carregado dá DetachedInstanceError: as rotas
+#      carregam antes (selectinload) tudo o que o template usa;
+#    - fecha a sessão no fim de cada requisição (e não só do app context);
+#    - mede o uso do pool: app.extensions['pool_banco'].resumo().
+#
+# Bancos em memória ('sqlite://') usam o pool especial do Flask-SQLAlchemy e
+# não recebem as opções de pool.
+
+POOLS = {'fila': QueuePool, 'por_thread': SingletonThreadPool, 'sem_pool': NullPool}
+
+# Conexões do pool 'por_thread': mais do que as threads de um worker (--threads)
+TAMANHO_POR_THREAD = 64
+
+# chave da configuração -> (opção do create_engine, tipo, pools que aceitam a opção)
+OPCOES_POOL = {
+    'BANCO_POOL_TAMANHO': ('pool_size', int, ('fila', 'por_thread')),
+    'BANCO_POOL_EXTRA': ('max_overflow', int, ('fila',)),
+    'BANCO_POOL_TIMEOUT': ('pool_timeout', float, ('fila',)),
+    'BANCO_POOL_RECICLAR': ('pool_recycle', int, ('fila', 'por_thread', 'sem_pool')),
+    'BANCO_POOL_PRE_PING': ('pool_pre_ping', bool, ('fila', 'por_thread', 'sem_pool')),
+}
+
+
+def _banco_em_memoria(uri):
+    return uri in ('sqlite://', 'sqlite:///:memory:')
+
+
+def _ler(app, chave, tipo):
+    valor = app.config.get(chave)
+    if valor is None:
+        valor = os.environ.get(chave)
+    if valor is None or not isinstance(valor, str):
+        return valor
+    if tipo is bool:
+        return valor.lower() in ('1', 'true', 'sim', 'on')
+    return tipo(valor)
+
+
+def configurar_pool(app):
+    """Monta SQLALCHEMY_ENGINE_OPTIONS a partir das chaves BANCO_*. Chamar ANTES de db.init_app(app)."""
+    if _banco_em_memoria(app.config['SQLALCHEMY_DATABASE_URI']):
+        return
+    opcoes = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    connect_args = dict(opcoes.get('connect_args', {}))
+
+    nome = _ler(app, 'BANCO_POOL', str)
+    if nome is not None:
+        if nome not in POOLS:
+            raise ValueError(f'BANCO_POOL desconhecido: {nome!r} (use {", ".join(POOLS)})')
+        opcoes['poolclass'] = POOLS[nome]
+        # Opções do perfil que o pool escolhido não aceita (ex.: max_overflow fora da 'fila')
+        for opcao, _, aceitos in OPCOES_POOL.values():
+            if nome not in aceitos:
+                opcoes.pop(opcao, None)
+        # O pool_size do perfil é para a 'fila'; na 'por_thread' ele limita as threads
+        if nome == 'por_thread':
+            opcoes['pool_size'] = TAMANHO_POR_THREAD
+
+    for chave, (opcao, tipo, aceitos) in OPCOES_POOL.items():
+        valor = _ler(app, chave, tipo)
+        if valor is None:
+            continue
+        if nome is not None and nome not in aceitos:
+            raise ValueError(f'{chave} não vale para BANCO_POOL={nome!r}')
+        opcoes[opcao] = valor
+
+    mesma_thread = _ler(app, 'BANCO_MESMA_THREAD', bool)
+    if mesma_thread and nome != 'sem_pool':
+        raise ValueError('BANCO_MESMA_THREAD=True exige BANCO_POOL=sem_pool '
+                         '(nos outros pools a conexão é usada ou fechada por outra thread)')
+    if mesma_thread is not None:
+        connect_args['check_same_thread'] = mesma_thread
+
+    if connect_args:
+        opcoes['connect_args'] = connect_args
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = opcoes
+
+
+class EstatisticasPool:
+    """Contadores do pool, atualizados pelos eventos do engine."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.abertas = 0
+        self.em_uso = 0
+        self.pico_em_uso = 0
+        self.retiradas = 0
+        self.tempo_em_uso = 0.0
+        self.maior_tempo_em_uso = 0.0
+        self.liberacoes_antecipadas = 0
+        self._trava = threading.Lock()
+
+        event.listen(engine, 'connect', self._conectou)
+        event.listen(engine, 'close', self._fechou)
+        event.listen(engine, 'checkout', self._retirou)
+        event.listen(engine, 'checkin', self._devolveu)
+
+    def _conectou(self, conexao, registro):
+        with self._trava:
+            self.abertas += 1
+
+    def _fechou(self, conexao, registro):
+        with self._trava:
+            self.abertas -= 1
+
+    def _retirou(self, conexao, registro, proxy):
+        registro.info['retirada_em'] = time.perf_counter()
+        with self._trava:
+            self.retiradas += 1
+            self.em_uso += 1
+            self.pico_em_uso = max(self.pico_em_uso, self.em_uso)
+
+    def _devolveu(self, conexao, registro):
+        retirada_em = registro.info.pop('retirada_em', None)
+        if retirada_em is None:
+            return
+        duracao = time.perf_counter() - retirada_em
+        with self._trava:
+            self.em_uso -= 1
+            self.tempo_em_uso += duracao
+            self.maior_tempo_em_uso = max(self.maior_tempo_em_uso, duracao)
+
+    def contar_liberacao(self):
+        with self._trava:
+            self.liberacoes_antecipadas += 1
+
+    def resumo(self):
+        pool = self.engine.pool
+        with self._trava:
+            return {
+                'pool': type(pool).__name__,
+                'tamanho': pool.size() if isinstance(pool, QueuePool) else getattr(pool, 'size', None),
+                'abertas': self.abertas,
+                'em_uso': self.em_uso,
+                'pico_em_uso': self.pico_em_uso,
+                'retiradas': self.retiradas,
+                'tempo_medio_em_uso_ms': round(1000 * self.tempo_em_uso / max(self.retiradas - self.em_uso, 1), 3),
+                'maior_tempo_em_uso_ms': round(1000 * self.maior_tempo_em_uso, 3),
+                'liberacoes_antecipadas': self.liberacoes_antecipadas,
+                'status': pool.status(),
+            }
+
+
+def instalar_sessoes(app, db):
+    """Liberação antecipada, escopo por requisição e métricas do pool. Chamar DEPOIS de db.init_app(app)."""
+    app.config.setdefault('BANCO_LIBERAR_ANTES_DO_TEMPLATE', True)
+    with app.app_context():
+        estatisticas = app.extensions['pool_banco'] = EstatisticasPool(db.engine)
+
+    def liberar_conexao(remetente, template, context, **extra):
+        if not app.config['BANCO_LIBERAR_ANTES_DO_TEMPLATE']:
+            return
+        sessao = db.session()
+        # Com algo ainda não gravado, fechar perderia os dados: a rota decide
+        if sessao.new or sessao.dirty or sessao.deleted or not sessao.in_transaction():
+            return
+        sessao.close()
+        estatisticas.contar_liberacao()
+
+    before_render_template.connect(liberar_conexao, app, weak=False)
+
+    @app.teardown_request
+    def encerrar_sessao(erro=None):
+        # O Flask-SQLAlchemy já faz isso no fim do app context; aqui o escopo é
+        # a requisição, inclusive quando o app context foi aberto por fora
+        db.session.remove()
+
+    return estatisticas
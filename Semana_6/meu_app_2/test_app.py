@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+# Garante que a conexão do banco volte ao pool antes de renderizar o template
+# (veja sessoes_banco.py): nada no template pode consultar o banco de novo.
+# Rodar a partir desta pasta:  python -m pytest -q
+
+import os
+from flask import before_render_template, template_rendered
+from sqlalchemy import event
+from app import create_app
+from models import db, Autor, Livro
+
+
+def retiradas_durante_a_renderizacao(app, url):
+    """Quantas vezes uma conexão saiu do pool enquanto um template era renderizado."""
+    renderizando, retiradas = [False], []
+
+    def comecou(remetente, template, context, **extra):
+        renderizando[0] = True
+
+    def terminou(remetente, template, context, **extra):
+        renderizando[0] = False
+
+    def retirou(conexao, registro, proxy):
+        if renderizando[0]:
+            retiradas.append(url)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'checkout', retirou)
+    # Depois do sinal do sessoes_banco.py, que libera a conexão
+    before_render_template.connect(comecou, app)
+    template_rendered.connect(terminou, app)
+    try:
+        resposta = app.test_client().get(url)
+    finally:
+        event.remove(engine, 'checkout', retirou)
+        before_render_template.disconnect(comecou, app)
+        template_rendered.disconnect(terminou, app)
+    assert resposta.status_code == 200
+    return retiradas
+
+
+def test_livros_sem_consultas_durante_a_renderizacao(tmp_path):
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(tmp_path, 'teste.db'),
+        'TESTING': True,
+    })
+    with app.app_context():
+        db.create_all()
+        db.session.add_all(Autor(nome=f'autor {n}') for n in range(1, 4))
+        db.session.flush()
+        db.session.add_all(Livro(titulo=f'livro {n}', ano_publicacao=2000 + n, autor_id=1 + n % 3) for n in range(10))
+        db.session.commit()
+
+    # Duas vezes: com a lista de autores ainda fora do cache e já dentro dele
+    assert retiradas_durante_a_renderizacao(app, '/livros') == []
+    assert retiradas_durante_a_renderizacao(app, '/livros') == []
+    assert app.extensions['pool_banco'].resumo()['liberacoes_antecipadas'] == 2
+
+
+def test_lista_de_autores_de_cada_app(tmp_path):
+    # Dois bancos com a mesma versão da tabela 'autor' e autores diferentes:
+    # cada app precisa mostrar os seus (veja CacheVersionado em versoes.py)
+    paginas = []
+    for nome in ('Machado', 'Clarice'):
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(tmp_path, f'{nome}.db'),
+            'TESTING': True,
+        })
+        with app.app_context():
+            db.create_all()
+            db.session.add(Autor(nome=nome))
+            db.session.commit()
+        paginas.append(app.test_client().get('/livros').get_data(as_text=True))
+
+    assert 'Machado</option>' in paginas[0] and 'Clarice</option>' not in paginas[0]
+    assert 'Clarice</option>' in paginas[1] and 'Machado</option>' not in paginas[1]
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import threading
+from flask import current_app
+# Módulos compartilhados entre os apps (pasta compartilhado/ na raiz do repositório)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir))
+from compartilhado.cache_http import CacheHTTP
+
+# -----------------------------------------------------------------------------
+# VERSÃO DE CADA TABELA (compartilhada entre processos)
+# -----------------------------------------------------------------------------
+# A tabela 'versao_tabela' guarda um contador por tabela do app. Gatilhos
+# (triggers) do SQLite somam 1 a cada INSERT, UPDATE ou DELETE, venha ele deste
+# processo, de outro worker do gunicorn, do 'flask importar' (SQLAlchemy Core,
+# sem eventos do ORM) ou de alguém mexendo no banco por fora.
+#
+# Ler a versão é uma busca pela chave primária. Assim um cache em memória pode
+# conferir, a cada uso, se os dados mudaram desde que ele foi montado, e todos
+# os workers enxergam a mudança na próxima requisição.
+
+TABELAS_VERSIONADAS = ('usuario', 'postagem', 'autor', 'livro')
+
+# A tabela, os gatilhos e a leitura das versões ficam em compartilhado/cache_http.py, que as
+# usa também para as ETags de /autores e /livros. create_app() chama
+# http.init_app(app, db).
+http = CacheHTTP(TABELAS_VERSIONADAS)
+
+
+def versao(tabela):
+    return http.versao(tabela)
+
+
+class CacheVersionado:
+    """
+    Guarda o resultado de 'carregar()' enquanto a versão de 'tabela' não mudar.
+    A versão é lida ANTES de carregar: se alguém gravar no meio, o resultado
+    fica guardado com a versão antiga e é refeito no próximo uso.
+
+    O resultado fica em current_app.extensions['cache_versionado'], um por app:
+    dois apps no mesmo processo (ex.: em testes, com bancos diferentes) podem
+    ter a mesma versão e dados diferentes.
+    """
+
+    def __init__(self, tabela, carregar):
+        self.tabela = tabela
+        self.carregar = carregar
+        self._trava = threading.Lock()
+
+    def __call__(self):
+        guardados = current_app.extensions.setdefault('cache_versionado', {})
+        atual = versao(self.tabela)
+        guardado = guardados.get(self)
+        if guardado is None or guardado[0] != atual:
+            with self._trava:
+                guardado = guardados.get(self)
+                if guardado is None or guardado[0] != atual:
+                    guardado = guardados[self] = (atual, self.carregar())
+        return guardado[1]
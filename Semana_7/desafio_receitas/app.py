@@ -1,82 +1,217 @@
 import os
-from flask import Flask, request, redirect, url_for, render_template, flash
-from models import db, Chef, PerfilChef, Receita, Ingrediente
-
-app = Flask(__name__)
-app.config['SECRET_KEY'] = 'uma-chave-secreta-bem-segura'
+import sys
+from flask import Flask, request, redirect, url_for, render_template, flash, abort
+from sqlalchemy.orm import selectinload
+from paginacao import paginar
+from perfis_banco import configurar_perfil, ativar_pragmas
+from instrumentacao_sql import InstrumentacaoSQL, orcamento_consultas
+from perfilador import instalar_perfilador
+from models import db, Chef, PerfilChef, Receita, Ingrediente, receita_ingrediente, resolver_ingredientes, associar_ingredientes
+from busca import buscar_receitas
+from cache_objetos import CacheObjetos
+from compressao import instalar_compressao
+from estaticos import instalar_estaticos
+# Módulos compartilhados entre os apps (pasta compartilhado/ na raiz do repositório)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir))
+from compartilhado.cache_http import CacheHTTP
+from compartilhado.estilos import css_tailwind, css_icones
 
 basedir = os.path.abspath(os.path.dirname(__file__))
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(basedir, 'database.db')
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-db.init_app(app)
-
-@app.route('/')
-def index():
-    receitas = Receita.query.all()
-    return render_template('index.html', receitas=receitas)
-
-@app.route('/receita/nova', methods=['GET', 'POST'])
-def criar_receita():
-    chefs = Chef.query.all()
-    if request.method == 'POST':
-        titulo = request.form.get('titulo')
-        instrucoes = request.form.get('instrucoes')
-        chef_id = request.form.get('chef_id')
-        ingredientes_texto = request.form.get('ingredientes')
-
-        if titulo and instrucoes and chef_id:
-            nova_receita = Receita(titulo=titulo, instrucoes=instrucoes, chef_id=chef_id)
-
-            if ingredientes_texto:
-                nomes = [n.strip() for n in ingredientes_texto.split(',') if n.strip()]
-                for nome in nomes:
-                    ingr = Ingrediente.query.filter_by(nome=nome).first()
-                    if not ingr:
-                        ingr = Ingrediente(nome=nome)
-                        db.session.add(ingr)
-                    nova_receita.ingredientes.append(ingr)
-
-            db.session.add(nova_receita)
-            db.session.commit()
-            flash("Receita criada com sucesso!", "success")
-            return redirect(url_for('index'))
-
-    return render_template('criar_receita.html', chefs=chefs)
-
-@app.route('/chef/novo', methods=['GET', 'POST'])
-def criar_chef():
-    if request.method == 'POST':
-        nome = request.form.get('nome')
-        especialidade = request.form.get('especialidade')
-        anos_experiencia = request.form.get('anos_experiencia')
-
-        if nome and especialidade and anos_experiencia:
-            novo_chef = Chef(nome=nome)
-            perfil = PerfilChef(
-                especialidade=especialidade,
-                anos_experiencia=int(anos_experiencia),
-                chef=novo_chef
-            )
-            db.session.add(novo_chef)
-            db.session.add(perfil)
-            db.session.commit()
-            flash("Chef cadastrado com sucesso!", "success")
-            return redirect(url_for('index'))
-
-    return render_template('criar_chef.html')
-
-@app.route('/chef/<int:chef_id>')
-def detalhes_chef(chef_id):
-    chef = Chef.query.get_or_404(chef_id)
-    return render_template('detalhes_chef.html', chef=chef)
-
-@app.route('/receita/<int:receita_id>')
-def detalhes_receita(receita_id):
-    receita = Receita.query.get_or_404(receita_id)
-    return render_template('detalhes_receita.html', receita=receita)
+
+CONFIG_PADRAO = {
+    'SECRET_KEY': 'uma-chave-secreta-bem-segura',
+    'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(basedir, 'database.db'),
+    'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+}
+
+sql = InstrumentacaoSQL()
+cache = CacheObjetos()
+
+# Resultados por página em /busca (a ordem por relevância é feita no SQLite, veja busca.py)
+RESULTADOS_POR_PAGINA = 20
+
+# ETag e GET condicional da página inicial (veja compartilhado/cache_http.py)
+http = CacheHTTP(('receita', 'chef'))
+
+# --- Modelos das páginas de detalhes ---
+# Tudo o que o template usa, carregado de uma vez (selectinload) e convertido em
+# dicts simples, que podem ir para o cache e ser lidos por outros processos.
+# O Jinja lê 'chef.perfil.especialidade' tanto de objetos quanto de dicts.
+def dados_perfil(perfil):
+    if perfil is None:
+        return None
+    return {'especialidade': perfil.especialidade, 'anos_experiencia': perfil.anos_experiencia}
+
+def montar_chef(chef_id):
+    chef = db.session.execute(
+        db.select(Chef).where(Chef.id == chef_id)
+        .options(selectinload(Chef.perfil), selectinload(Chef.receitas))
+    ).scalar()
+    if chef is None:
+        return None
+    return {
+        'id': chef.id,
+        'nome': chef.nome,
+        'perfil': dados_perfil(chef.perfil),
+        'receitas': [{'id': receita.id, 'titulo': receita.titulo} for receita in chef.receitas],
+    }
+
+def montar_receita(receita_id):
+    receita = db.session.execute(
+        db.select(Receita).where(Receita.id == receita_id)
+        .options(selectinload(Receita.ingredientes), selectinload(Receita.chef).selectinload(Chef.perfil))
+    ).scalar()
+    if receita is None:
+        return None
+    return {
+        'id': receita.id,
+        'titulo': receita.titulo,
+        'instrucoes': receita.instrucoes,
+        'ingredientes': [{'id': ing.id, 'nome': ing.nome} for ing in receita.ingredientes],
+        'chef': {'id': receita.chef.id, 'nome': receita.chef.nome, 'perfil': dados_perfil(receita.chef.perfil)},
+    }
+
+# --- O que invalidar quando cada modelo muda ---
+# Cada função devolve as chaves (nome, id) dos modelos de página que mostram o
+# objeto alterado. 'conexao' é a da transação em andamento (eventos do mapper).
+def receitas_do_chef(conexao, chef_id):
+    return [('receita', id) for id in conexao.execute(
+        db.select(Receita.id).where(Receita.chef_id == chef_id)
+    ).scalars()]
+
+def chaves_receita(receita, conexao):
+    chaves = [('receita', receita.id), ('chef', receita.chef_id)]
+    # Receita trocada de chef: a página do chef antigo também muda
+    chaves += [('chef', chef_id) for chef_id in db.inspect(receita).attrs.chef_id.history.deleted or ()]
+    return chaves
+
+def chaves_chef(chef, conexao):
+    return [('chef', chef.id)] + receitas_do_chef(conexao, chef.id)
+
+def chaves_perfil(perfil, conexao):
+    return [('chef', perfil.chef_id)] + receitas_do_chef(conexao, perfil.chef_id)
+
+def chaves_ingrediente(ingrediente, conexao):
+    return [('receita', id) for id in conexao.execute(
+        db.select(receita_ingrediente.c.receita_id).where(receita_ingrediente.c.ingrediente_id == ingrediente.id)
+    ).scalars()]
+
+cache.observar(db, Receita, chaves_receita)
+cache.observar(db, Chef, chaves_chef)
+cache.observar(db, PerfilChef, chaves_perfil)
+cache.observar(db, Ingrediente, chaves_ingrediente)
+
+def create_app(config=None):
+    app = Flask(__name__)
+    app.config.update(CONFIG_PADRAO)
+    if config:
+        app.config.update(config)
+
+    instalar_compressao(app)
+
+    # CSS servido pelo próprio app, com só as classes do Tailwind e os ícones
+    # que os templates usam, e nomes com hash (veja estaticos.py e compartilhado/estilos.py)
+    instalar_estaticos(app, {'app.css': [css_tailwind, css_icones]})
+    configurar_perfil(app)
+    db.init_app(app)
+    ativar_pragmas(app, db)
+    sql.init_app(app, db)
+    cache.init_app(app)
+    http.init_app(app, db)
+
+    @app.route('/')
+    @http.condicional('receita', 'chef')
+    def index():
+        pagina = paginar(Receita.query, Receita.id)
+        return render_template('index.html', receitas=pagina.itens, pagina=pagina)
+
+    @app.route('/busca')
+    def busca():
+        q = request.args.get('q', '').strip()
+        ingredientes = [nome.strip() for nome in request.args.get('ingredientes', '').split(',') if nome.strip()]
+        pagina = max(1, request.args.get('pagina', 1, type=int))
+        resultados, proxima = None, None
+        if q or ingredientes:
+            # Um resultado a mais só para saber se existe uma próxima página
+            resultados = buscar_receitas(q, ingredientes, limite=RESULTADOS_POR_PAGINA + 1,
+                                         deslocamento=(pagina - 1) * RESULTADOS_POR_PAGINA)
+            if len(resultados) > RESULTADOS_POR_PAGINA:
+                resultados, proxima = resultados[:RESULTADOS_POR_PAGINA], pagina + 1
+        return render_template('busca.html', q=q, ingredientes=ingredientes, resultados=resultados,
+                               proxima=proxima)
+
+    @app.route('/receita/nova', methods=['GET', 'POST'])
+    def criar_receita():
+        chefs = Chef.query.all()
+        if request.method == 'POST':
+            titulo = request.form.get('titulo')
+            instrucoes = request.form.get('instrucoes')
+            chef_id = request.form.get('chef_id')
+            ingredientes_texto = request.form.get('ingredientes')
+
+            if titulo and instrucoes and chef_id:
+                nova_receita = Receita(titulo=titulo, instrucoes=instrucoes, chef_id=chef_id)
+                db.session.add(nova_receita)
+                db.session.flush()
+
+                if ingredientes_texto:
+                    ingrediente_ids = resolver_ingredientes(ingredientes_texto.split(','))
+                    associar_ingredientes(nova_receita.id, ingrediente_ids)
+
+                db.session.commit()
+                flash("Receita criada com sucesso!", "success")
+                return redirect(url_for('index'))
+
+        return render_template('criar_receita.html', chefs=chefs)
+
+    @app.route('/chef/novo', methods=['GET', 'POST'])
+    def criar_chef():
+        if request.method == 'POST':
+            nome = request.form.get('nome')
+            especialidade = request.form.get('especialidade')
+            anos_experiencia = request.form.get('anos_experiencia')
+
+            if nome and especialidade and anos_experiencia:
+                novo_chef = Chef(nome=nome)
+                perfil = PerfilChef(
+                    especialidade=especialidade,
+                    anos_experiencia=int(anos_experiencia),
+                    chef=novo_chef
+                )
+                db.session.add(novo_chef)
+                db.session.add(perfil)
+                db.session.commit()
+                flash("Chef cadastrado com sucesso!", "success")
+                return redirect(url_for('index'))
+
+        return render_template('criar_chef.html')
+
+    @app.route('/chef/<int:chef_id>')
+    def detalhes_chef(chef_id):
+        chef = cache.obter('chef', chef_id, lambda: montar_chef(chef_id))
+        if chef is None:
+            abort(404)
+        return render_template('detalhes_chef.html', chef=chef)
+
+    # Sem o cache: a receita, os ingredientes, o chef e o perfil (selectinload)
+    @app.route('/receita/<int:receita_id>')
+    @orcamento_consultas(4)
+    def detalhes_receita(receita_id):
+        receita = cache.obter('receita', receita_id, lambda: montar_receita(receita_id))
+        if receita is None:
+            abort(404)
+        return render_template('detalhes_receita.html', receita=receita)
+
+    @app.route('/cache/estatisticas')
+    def estatisticas_cache():
+        return cache.estatisticas()
+
+    instalar_perfilador(app)
+
+    return app
 
 if __name__ == '__main__':
+    app = create_app()
     with app.app_context():
         db.create_all()
     app.run(debug=True, port=5002)
\ No newline at end of file
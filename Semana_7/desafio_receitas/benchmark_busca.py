@@ -0,0 +1,93 @@
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from flask import Flask
+from models import db, Chef, Ingrediente, Receita, receita_ingrediente
+from busca import buscar_receitas
+
+# Mede a latência da busca (/busca) sobre muitas receitas sintéticas.
+# Uso: python benchmark_busca.py [--receitas 1000000]
+# O banco é criado em um arquivo temporário, então o 'database.db' do projeto
+# não é tocado. As receitas são inseridas com o Core, em lotes, e o índice FTS5
+# é preenchido pelos gatilhos (o mesmo caminho de uma receita criada pelo app).
+
+PALAVRAS = (
+    'bolo cenoura chocolate frango assado arroz feijão tomate cebola alho azeite '
+    'manteiga farinha ovo leite açúcar sal pimenta limão laranja carne moída '
+    'molho massa queijo presunto batata abóbora milho ervilha cenoura creme '
+    'forno panela frigideira misture mexa asse cozinhe refogue bata sirva '
+    'gelado quente caseiro rápido fácil vegano integral recheado gratinado'
+).split()
+
+CONSULTAS = [
+    ('termo comum', 'bolo', ()),
+    ('dois termos', 'bolo chocolate', ()),
+    ('termo médio', 'gratinado', ()),
+    ('termo raro', 'receitaúnica', ()),
+    ('comum + raro', 'bolo receitaúnica', ()),
+    ('termo + ingrediente', 'assado', ('ingrediente 3',)),
+    ('só ingredientes', '', ('ingrediente 3', 'ingrediente 7')),
+]
+
+def texto(aleatorio, palavras):
+    # Palavras do início da lista aparecem muito mais (distribuição de Zipf)
+    return ' '.join(PALAVRAS[int(len(PALAVRAS) * aleatorio.random() ** 3)] for _ in range(palavras))
+
+def preencher(total, lote=50000):
+    aleatorio = random.Random(42)
+    db.session.add(Chef(nome='Chef'))
+    db.session.execute(Ingrediente.__table__.insert(), [{'nome': f'ingrediente {n}'} for n in range(200)])
+    db.session.commit()
+    for inicio in range(0, total, lote):
+        fim = min(total, inicio + lote)
+        db.session.execute(Receita.__table__.insert(), [
+            {'id': n + 1, 'titulo': texto(aleatorio, 4), 'instrucoes': texto(aleatorio, 40), 'chef_id': 1}
+            for n in range(inicio, fim)
+        ])
+        db.session.execute(receita_ingrediente.insert(), [
+            {'receita_id': n + 1, 'ingrediente_id': ingrediente_id}
+            for n in range(inicio, fim)
+            for ingrediente_id in aleatorio.sample(range(1, 201), 5)
+        ])
+        db.session.commit()
+        print(f'  {fim} receitas', flush=True)
+    # Uma única receita com um termo raro
+    db.session.execute(db.update(Receita).where(Receita.id == total // 2).values(titulo='receitaúnica'))
+    db.session.commit()
+
+def medir(consulta, ingredientes, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultados = buscar_receitas(consulta, ingredientes)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    tempos.sort()
+    return len(resultados), tempos[len(tempos) // 2], tempos[int(len(tempos) * 0.95)]
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--receitas', type=int, default=1000000)
+    parser.add_argument('--repeticoes', type=int, default=50)
+    args = parser.parse_args()
+
+    pasta = tempfile.mkdtemp()
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(pasta, 'busca.db')
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        print(f'Criando {args.receitas} receitas...')
+        inicio = time.perf_counter()
+        preencher(args.receitas)
+        print(f'Carga + índice FTS5: {time.perf_counter() - inicio:.1f}s\n')
+
+        print(f'{"consulta":22} {"resultados":>10} {"p50 (ms)":>9} {"p95 (ms)":>9}')
+        for nome, consulta, ingredientes in CONSULTAS:
+            quantidade, p50, p95 = medir(consulta, ingredientes, args.repeticoes)
+            print(f'{nome:22} {quantidade:10} {p50:9.2f} {p95:9.2f}')
+
+    shutil.rmtree(pasta, ignore_errors=True)
@@ -0,0 +1,54 @@
+import time
+from flask import Flask
+from models import db, Chef, Receita, Ingrediente, resolver_ingredientes, associar_ingredientes
+
+# Compara o jeito antigo (uma consulta por ingrediente) com o resolver em lote.
+# Uso: python benchmark_ingredientes.py
+# O banco é criado em memória, então o 'database.db' do projeto não é tocado.
+
+RECEITAS = 200
+INGREDIENTES_POR_RECEITA = 30
+
+app = Flask(__name__)
+app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+db.init_app(app)
+
+def nomes_da_receita(i):
+    # Metade dos ingredientes se repete entre receitas, a outra metade é nova
+    return [f'ingrediente {n}' for n in range(INGREDIENTES_POR_RECEITA // 2)] + \
+           [f'ingrediente {i}-{n}' for n in range(INGREDIENTES_POR_RECEITA // 2)]
+
+def loop_por_linha(chef_id, i):
+    receita = Receita(titulo=f'Receita {i}', instrucoes='...', chef_id=chef_id)
+    for nome in nomes_da_receita(i):
+        ingr = Ingrediente.query.filter_by(nome=nome).first()
+        if not ingr:
+            ingr = Ingrediente(nome=nome)
+            db.session.add(ingr)
+        receita.ingredientes.append(ingr)
+    db.session.add(receita)
+    db.session.commit()
+
+def em_lote(chef_id, i):
+    receita = Receita(titulo=f'Receita {i}', instrucoes='...', chef_id=chef_id)
+    db.session.add(receita)
+    db.session.flush()
+    associar_ingredientes(receita.id, resolver_ingredientes(nomes_da_receita(i)))
+    db.session.commit()
+
+def medir(funcao):
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        chef = Chef(nome='Chef')
+        db.session.add(chef)
+        db.session.commit()
+        inicio = time.perf_counter()
+        for i in range(RECEITAS):
+            funcao(chef.id, i)
+        return time.perf_counter() - inicio
+
+if __name__ == '__main__':
+    for funcao in (loop_por_linha, em_lote):
+        segundos = medir(funcao)
+        print(f'{funcao.__name__:15} {segundos:.3f}s  ({segundos / RECEITAS * 1000:.2f} ms por receita)')
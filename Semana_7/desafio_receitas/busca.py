@@ -0,0 +1,138 @@
+import re
+from markupsafe import Markup, escape
+from sqlalchemy import event, text
+from models import db, Ingrediente, normalizar_ingrediente
+
+# --- Busca de texto completo (SQLite FTS5) ---
+# 'receita_fts' é um índice invertido de 'titulo' e 'instrucoes'. Ele é uma
+# tabela de "conteúdo externo": não guarda uma segunda cópia do texto, só o
+# índice, e lê o texto da própria tabela 'receita' quando precisa.
+#
+# O índice é mantido por gatilhos (triggers) do SQLite em 'receita', e não por
+# eventos do ORM: assim ele também acompanha INSERTs em lote do Core e
+# alterações feitas fora do app. 'remove_diacritics' faz "feijao" achar "feijão".
+ESTRUTURA_BUSCA = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS receita_fts USING fts5(
+           titulo, instrucoes,
+           content='receita', content_rowid='id',
+           tokenize='unicode61 remove_diacritics 2'
+       )""",
+    """CREATE TRIGGER IF NOT EXISTS trg_receita_fts_insert AFTER INSERT ON receita BEGIN
+           INSERT INTO receita_fts (rowid, titulo, instrucoes) VALUES (NEW.id, NEW.titulo, NEW.instrucoes);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_receita_fts_delete AFTER DELETE ON receita BEGIN
+           INSERT INTO receita_fts (receita_fts, rowid, titulo, instrucoes)
+           VALUES ('delete', OLD.id, OLD.titulo, OLD.instrucoes);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_receita_fts_update AFTER UPDATE OF titulo, instrucoes ON receita BEGIN
+           INSERT INTO receita_fts (receita_fts, rowid, titulo, instrucoes)
+           VALUES ('delete', OLD.id, OLD.titulo, OLD.instrucoes);
+           INSERT INTO receita_fts (rowid, titulo, instrucoes) VALUES (NEW.id, NEW.titulo, NEW.instrucoes);
+       END""",
+    # Filtro por ingrediente: as receitas de um ingrediente (a chave primária
+    # de 'receita_ingrediente' só serve para o caminho receita -> ingredientes)
+    'CREATE INDEX IF NOT EXISTS idx_receita_ingrediente_ingrediente'
+    ' ON receita_ingrediente (ingrediente_id, receita_id)',
+]
+
+@event.listens_for(db.metadata, 'after_create')
+def criar_estrutura_busca(metadata, conexao, **kwargs):
+    # Roda no fim de db.create_all(). Em um banco que já tinha receitas, o
+    # índice é preenchido uma vez com o comando 'rebuild' do FTS5.
+    ja_existia = conexao.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE name = 'receita_fts'"
+    ).first() is not None
+    for comando in ESTRUTURA_BUSCA:
+        conexao.exec_driver_sql(comando)
+    if not ja_existia:
+        conexao.exec_driver_sql("INSERT INTO receita_fts (receita_fts) VALUES ('rebuild')")
+
+# --- Como a busca é feita ---
+# Tudo acontece no SQLite, em uma consulta:
+# - o FTS5 acha as receitas que têm todas as palavras;
+# - 'ORDER BY bm25(...)' ordena por relevância (o título pesa PESO_TITULO vezes
+#   mais que as instruções), com LIMIT/OFFSET para a paginação;
+# - highlight() e snippet() devolvem o título e um trecho das instruções com as
+#   palavras encontradas entre marcadores, que viram <mark> em destacar().
+PESO_TITULO = 10.0
+PALAVRAS_NO_TRECHO = 24
+TAMANHO_RESUMO = 160
+
+_PALAVRA = re.compile(r'\w+')
+
+# O que o usuário digita vira uma consulta FTS5 segura: cada palavra entre
+# aspas, então operadores como AND, NEAR e '*' digitados não são interpretados.
+# Minúsculas e acentos ficam por conta do tokenizador.
+def consulta_fts(termos):
+    return ' '.join(f'"{termo}"' for termo in termos)
+
+# Marcadores que não aparecem em texto digitado; o texto é escapado e só
+# depois eles viram <mark>, então o HTML das receitas nunca é interpretado.
+_INICIO, _FIM = '\x02', '\x03'
+
+def destacar(trecho):
+    return Markup(str(escape(trecho)).replace(_INICIO, '<mark>').replace(_FIM, '</mark>'))
+
+def ids_ingredientes(nomes):
+    # Os ingredientes são gravados já normalizados (veja resolver_ingredientes),
+    # então a comparação direta com 'nome' usa o índice único da coluna
+    nomes = list(dict.fromkeys(normalizar_ingrediente(n) for n in nomes if n.strip()))
+    ids = db.session.execute(db.select(Ingrediente.nome, Ingrediente.id).where(Ingrediente.nome.in_(nomes))).all()
+    return list(dict(ids).values()), len(nomes)
+
+# Devolve até 'limite' receitas como dicionários (id, titulo, trecho), das mais
+# relevantes para as menos, a partir da posição 'deslocamento'. 'ingredientes'
+# filtra as receitas que usam TODOS os ingredientes da lista.
+def buscar_receitas(texto='', ingredientes=(), limite=20, deslocamento=0):
+    termos = list(dict.fromkeys(termo.lower() for termo in _PALAVRA.findall(texto)))
+    filtros, parametros = [], {'limite': limite, 'deslocamento': deslocamento}
+
+    if ingredientes:
+        ids, pedidos = ids_ingredientes(ingredientes)
+        if len(ids) < pedidos:
+            return []
+        parametros.update({f'ingrediente_{n}': ingrediente_id for n, ingrediente_id in enumerate(ids)})
+        # Um EXISTS por ingrediente: cada receita candidata é conferida pela
+        # chave primária (receita_id, ingrediente_id), sem montar a lista
+        # inteira de receitas de cada ingrediente
+        filtros = [
+            'EXISTS (SELECT 1 FROM receita_ingrediente'
+            f' WHERE receita_id = receita.id AND ingrediente_id = :ingrediente_{n})'
+            for n in range(len(ids))
+        ]
+
+    if termos:
+        parametros.update(busca=consulta_fts(termos), peso_titulo=PESO_TITULO,
+                          inicio=_INICIO, fim=_FIM, palavras=PALAVRAS_NO_TRECHO)
+        sql = (
+            'SELECT receita.id,'
+            ' highlight(receita_fts, 0, :inicio, :fim) AS titulo,'
+            " snippet(receita_fts, 1, :inicio, :fim, '…', :palavras) AS trecho"
+            ' FROM receita_fts JOIN receita ON receita.id = receita_fts.rowid'
+            ' WHERE receita_fts MATCH :busca'
+            + ''.join(f' AND {filtro}' for filtro in filtros) +
+            # Empate: a receita mais nova primeiro
+            ' ORDER BY bm25(receita_fts, :peso_titulo, 1.0), receita.id DESC'
+            ' LIMIT :limite OFFSET :deslocamento'
+        )
+    elif filtros:
+        # Só o filtro de ingredientes: as receitas mais recentes primeiro. A
+        # consulta percorre o índice (ingrediente_id, receita_id) do primeiro
+        # ingrediente, do fim para o começo, e confere os outros com EXISTS.
+        parametros['tamanho'] = TAMANHO_RESUMO
+        sql = (
+            'SELECT receita.id, receita.titulo,'
+            " substr(receita.instrucoes, 1, :tamanho)"
+            " || CASE WHEN length(receita.instrucoes) > :tamanho THEN '…' ELSE '' END AS trecho"
+            ' FROM receita_ingrediente JOIN receita ON receita.id = receita_ingrediente.receita_id'
+            ' WHERE receita_ingrediente.ingrediente_id = :ingrediente_0'
+            + ''.join(f' AND {filtro}' for filtro in filtros[1:]) +
+            ' ORDER BY receita_ingrediente.receita_id DESC LIMIT :limite OFFSET :deslocamento'
+        )
+    else:
+        return []
+
+    return [
+        {'id': receita.id, 'titulo': destacar(receita.titulo), 'trecho': destacar(receita.trecho)}
+        for receita in db.session.execute(text(sql), parametros)
+    ]
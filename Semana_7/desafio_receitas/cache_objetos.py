@@ -0,0 +1,224 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+
+# --- Cache de objetos (read-through) para as páginas de detalhes ---
+# Guarda o "modelo da página" já montado (dicts e listas simples, sem objetos
+# do ORM) de cada chef e de cada receita:
+#
+#     chef = cache.obter('chef', chef_id, lambda: montar_chef(chef_id))
+#
+# Na falta, 'carregar' consulta o banco e o resultado é guardado por
+# CACHE_OBJETOS_TTL segundos. Um resultado None (ex.: 404) não é guardado.
+#
+# Onde guardar (CACHE_OBJETOS):
+#   'memoria'  (padrão) LRU em memória com até CACHE_OBJETOS_TAMANHO itens,
+#              um por processo;
+#   'sqlite'   um arquivo SQLite local (CACHE_OBJETOS_ARQUIVO) compartilhado
+#              por todos os workers da máquina (ex.: gunicorn -w 4).
+#
+# Invalidação: 'observar' liga eventos do ORM a cada modelo e, depois do
+# commit, as chaves afetadas são apagadas. No lugar do valor fica uma "lápide"
+# com a hora da invalidação: uma requisição que começou a montar o modelo ANTES
+# dela (e, portanto, pode ter lido dados velhos) não consegue gravá-lo por cima.
+# Com 'memoria' só o processo que fez o commit fica sabendo, e nos outros o
+# valor antigo vale até o fim do TTL; com 'sqlite' todos veem a invalidação.
+
+class ArmazemMemoria:
+    """LRU com validade. Cada item é (expira_em, valor, invalidado_em)."""
+
+    def __init__(self, tamanho_maximo=1000):
+        self.tamanho_maximo = tamanho_maximo
+        self._itens = OrderedDict()
+        self._trava = threading.Lock()
+
+    def obter(self, chave):
+        with self._trava:
+            item = self._itens.get(chave)
+            if item is None or item[1] is None or item[0] <= time.time():
+                return None
+            self._itens.move_to_end(chave)
+            return item[1]
+
+    def _gravar(self, chave, item):
+        self._itens[chave] = item
+        self._itens.move_to_end(chave)
+        while len(self._itens) > self.tamanho_maximo:
+            self._itens.popitem(last=False)
+
+    def guardar(self, chave, valor, validade, inicio):
+        with self._trava:
+            item = self._itens.get(chave)
+            if item is not None and item[2] is not None and item[2] >= inicio:
+                return
+            self._gravar(chave, (time.time() + validade, valor, None))
+
+    def invalidar(self, chave, validade):
+        agora = time.time()
+        with self._trava:
+            self._gravar(chave, (agora + validade, None, agora))
+
+    def tamanho(self):
+        return len(self._itens)
+
+
+class ArmazemSQLite:
+    """O mesmo contrato de ArmazemMemoria, em um arquivo SQLite compartilhado."""
+
+    # A cada quantas gravações os itens vencidos (e o excesso) são apagados
+    LIMPAR_A_CADA = 256
+
+    def __init__(self, caminho, tamanho_maximo=10000):
+        self.caminho = caminho
+        self.tamanho_maximo = tamanho_maximo
+        self._local = threading.local()
+        self._gravacoes = 0
+        with self._conexao() as conexao:
+            conexao.execute(
+                'CREATE TABLE IF NOT EXISTS cache_objetos ('
+                ' chave TEXT PRIMARY KEY,'
+                ' valor TEXT,'
+                ' expira_em REAL NOT NULL,'
+                ' invalidado_em REAL)'
+            )
+            conexao.execute('CREATE INDEX IF NOT EXISTS idx_cache_objetos_expira ON cache_objetos (expira_em)')
+
+    def _conexao(self):
+        # Uma conexão por thread (o sqlite3 não compartilha conexões entre threads)
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.caminho, timeout=5)
+            conexao.execute('PRAGMA journal_mode=WAL')
+            conexao.execute('PRAGMA synchronous=NORMAL')
+            self._local.conexao = conexao
+        return conexao
+
+    def obter(self, chave):
+        linha = self._conexao().execute(
+            'SELECT valor FROM cache_objetos WHERE chave = ? AND expira_em > ? AND valor IS NOT NULL',
+            (chave, time.time())
+        ).fetchone()
+        return json.loads(linha[0]) if linha else None
+
+    def guardar(self, chave, valor, validade, inicio):
+        with self._conexao() as conexao:
+            # Não grava por cima de uma invalidação feita depois de 'inicio'
+            conexao.execute(
+                'INSERT INTO cache_objetos (chave, valor, expira_em, invalidado_em) VALUES (?, ?, ?, NULL)'
+                ' ON CONFLICT (chave) DO UPDATE SET'
+                '  valor = excluded.valor, expira_em = excluded.expira_em, invalidado_em = NULL'
+                ' WHERE cache_objetos.invalidado_em IS NULL OR cache_objetos.invalidado_em < ?',
+                (chave, json.dumps(valor, ensure_ascii=False), time.time() + validade, inicio)
+            )
+        self._gravacoes += 1
+        if self._gravacoes % self.LIMPAR_A_CADA == 0:
+            self._limpar()
+
+    def invalidar(self, chave, validade):
+        agora = time.time()
+        with self._conexao() as conexao:
+            conexao.execute(
+                'INSERT INTO cache_objetos (chave, valor, expira_em, invalidado_em) VALUES (?, NULL, ?, ?)'
+                ' ON CONFLICT (chave) DO UPDATE SET'
+                '  valor = NULL, expira_em = excluded.expira_em, invalidado_em = excluded.invalidado_em',
+                (chave, agora + validade, agora)
+            )
+
+    def _limpar(self):
+        with self._conexao() as conexao:
+            conexao.execute('DELETE FROM cache_objetos WHERE expira_em <= ?', (time.time(),))
+            conexao.execute(
+                'DELETE FROM cache_objetos WHERE chave IN ('
+                ' SELECT chave FROM cache_objetos ORDER BY expira_em DESC LIMIT -1 OFFSET ?)',
+                (self.tamanho_maximo,)
+            )
+
+    def tamanho(self):
+        return self._conexao().execute('SELECT COUNT(*) FROM cache_objetos').fetchone()[0]
+
+
+class CacheObjetos:
+    """Extensão do Flask: 'cache = CacheObjetos()' e depois 'cache.init_app(app)'."""
+
+    def __init__(self, app=None):
+        self.armazem = None
+        self.validade = 300
+        self.acertos = 0
+        self.falhas = 0
+        self._sessao_observada = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('CACHE_OBJETOS', 'memoria')
+        app.config.setdefault('CACHE_OBJETOS_TTL', 300)
+        app.config.setdefault('CACHE_OBJETOS_TAMANHO', 1000)
+        app.config.setdefault('CACHE_OBJETOS_ARQUIVO', os.path.join(app.root_path, 'cache_objetos.db'))
+        self.validade = app.config['CACHE_OBJETOS_TTL']
+        self.acertos = self.falhas = 0
+        tipo = app.config['CACHE_OBJETOS']
+        if tipo == 'memoria':
+            self.armazem = ArmazemMemoria(app.config['CACHE_OBJETOS_TAMANHO'])
+        elif tipo == 'sqlite':
+            self.armazem = ArmazemSQLite(app.config['CACHE_OBJETOS_ARQUIVO'], app.config['CACHE_OBJETOS_TAMANHO'])
+        else:
+            raise ValueError(f'CACHE_OBJETOS desconhecido: {tipo!r} (use memoria ou sqlite)')
+
+    @staticmethod
+    def _chave(nome, id):
+        return f'{nome}:{id}'
+
+    def obter(self, nome, id, carregar):
+        chave = self._chave(nome, id)
+        valor = self.armazem.obter(chave)
+        if valor is not None:
+            self.acertos += 1
+            return valor
+        self.falhas += 1
+        inicio = time.time()
+        valor = carregar()
+        if valor is not None:
+            self.armazem.guardar(chave, valor, self.validade, inicio)
+        return valor
+
+    def invalidar(self, nome, id):
+        self.armazem.invalidar(self._chave(nome, id), self.validade)
+
+    def estatisticas(self):
+        return {
+            'armazem': type(self.armazem).__name__,
+            'itens': self.armazem.tamanho(),
+            'acertos': self.acertos,
+            'falhas': self.falhas,
+        }
+
+    def observar(self, db, modelo, chaves):
+        """
+        Invalida as chaves afetadas quando 'modelo' é inserido, alterado ou
+        apagado. 'chaves(objeto, conexao)' devolve a lista de (nome, id); a
+        conexão serve para achar registros relacionados (ex.: as receitas de
+        um chef). A invalidação só acontece depois do commit.
+        """
+        def marcar(mapper, conexao, objeto):
+            sessao = object_session(objeto)
+            sessao.info.setdefault('objetos_alterados', set()).update(chaves(objeto, conexao))
+
+        for nome_evento in ('after_insert', 'after_update', 'after_delete'):
+            event.listen(modelo, nome_evento, marcar)
+
+        if not self._sessao_observada:
+            self._sessao_observada = True
+            event.listen(db.session, 'after_commit', self._aplicar)
+            event.listen(db.session, 'after_rollback', self._descartar)
+
+    def _aplicar(self, session):
+        for nome, id in session.info.pop('objetos_alterados', ()):
+            self.invalidar(nome, id)
+
+    def _descartar(self, session):
+        session.info.pop('objetos_alterados', None)
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+import time
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+# -----------------------------------------------------------------------------
+# INSTRUMENTAÇÃO DAS CONSULTAS SQL
+# -----------------------------------------------------------------------------
+# Conta quantas consultas cada requisição faz e quanto tempo elas levam,
+# usando os eventos do engine do SQLAlchemy. Para cada resposta:
+#   - adiciona os cabeçalhos X-DB-Queries e X-DB-Time (em ms);
+#   - registra no log as consultas mais lentas que SQL_LIMITE_LENTO_MS;
+#   - verifica o orçamento de consultas da rota (veja 'orcamento_consultas').
+#     Em testes (app.testing) estourar o orçamento gera um erro; fora deles,
+#     apenas um aviso no log.
+#
+# Configurações:
+#   SQL_LIMITE_LENTO_MS      padrão 100
+#   SQL_ORCAMENTO_PADRAO     orçamento das rotas sem decorador (padrão: nenhum)
+
+
+class OrcamentoDeConsultasExcedido(AssertionError):
+    pass
+
+
+def orcamento_consultas(maximo):
+    """Decorador que define o número máximo de consultas SQL de uma rota."""
+    def decorador(funcao):
+        funcao.orcamento_consultas = maximo
+        return funcao
+    return decorador
+
+
+class InstrumentacaoSQL:
+    def __init__(self, app=None, db=None):
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        app.config.setdefault('SQL_LIMITE_LENTO_MS', 100)
+        app.config.setdefault('SQL_ORCAMENTO_PADRAO', None)
+
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', self._antes_da_consulta)
+        event.listen(engine, 'after_cursor_execute', self._depois_da_consulta)
+
+        app.before_request(self._iniciar_contagem)
+        app.after_request(self._finalizar_contagem)
+
+    def _iniciar_contagem(self):
+        g.sql_consultas = 0
+        g.sql_tempo = 0.0
+
+    def _antes_da_consulta(self, conexao, cursor, comando, parametros, contexto, executemany):
+        conexao.info.setdefault('sql_inicio', []).append(time.perf_counter())
+
+    def _depois_da_consulta(self, conexao, cursor, comando, parametros, contexto, executemany):
+        duracao = time.perf_counter() - conexao.info['sql_inicio'].pop()
+        # Consultas feitas fora de uma requisição (ex.: db.create_all()) não são contadas
+        if not has_request_context() or 'sql_consultas' not in g:
+            return
+        g.sql_consultas += 1
+        g.sql_tempo += duracao
+
+        duracao_ms = duracao * 1000
+        if duracao_ms >= current_app.config['SQL_LIMITE_LENTO_MS']:
+            current_app.logger.warning(
+                'Consulta lenta (%.1f ms) na rota %s: %s', duracao_ms, request.endpoint, comando
+            )
+
+    def _finalizar_contagem(self, resposta):
+        consultas = g.pop('sql_consultas', 0)
+        tempo_ms = g.pop('sql_tempo', 0.0) * 1000
+        resposta.headers['X-DB-Queries'] = str(consultas)
+        resposta.headers['X-DB-Time'] = f'{tempo_ms:.2f}'
+
+        view = current_app.view_functions.get(request.endpoint)
+        maximo = getattr(view, 'orcamento_consultas', current_app.config['SQL_ORCAMENTO_PADRAO'])
+        if maximo is not None and consultas > maximo:
+            mensagem = f'A rota {request.endpoint} fez {consultas} consultas SQL (orçamento: {maximo})'
+            if current_app.testing:
+                raise OrcamentoDeConsultasExcedido(mensagem)
+            current_app.logger.warning(mensagem)
+        return resposta
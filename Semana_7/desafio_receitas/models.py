@@ -1,4 +1,6 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 db = SQLAlchemy()
 
@@ -31,7 +33,7 @@ class Receita(db.Model):
     titulo = db.Column(db.String(120), nullable=False)
     instrucoes = db.Column(db.Text, nullable=False)
 
-    chef_id = db.Column(db.Integer, db.ForeignKey('chef.id'), nullable=False)
+    chef_id = db.Column(db.Integer, db.ForeignKey('chef.id'), nullable=False, index=True)
     chef = db.relationship('Chef', back_populates='receitas')
 
     ingredientes = db.relationship('Ingrediente', secondary=receita_ingrediente, back_populates='receitas')
@@ -41,4 +43,90 @@ class Ingrediente(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     nome = db.Column(db.String(80), unique=True, nullable=False)
 
-    receitas = db.relationship('Receita', secondary=receita_ingrediente, back_populates='ingredientes')
\ No newline at end of file
+    receitas = db.relationship('Receita', secondary=receita_ingrediente, back_populates='ingredientes')
+
+# As receitas de um chef (página do chef e invalidação do cache de objetos).
+# 'index=True' só vale para bancos novos; nos que já existiam o índice é criado
+# aqui, no fim de db.create_all().
+@event.listens_for(db.metadata, 'after_create')
+def criar_indice_chef_id(metadata, conexao, **kwargs):
+    conexao.exec_driver_sql('CREATE INDEX IF NOT EXISTS ix_receita_chef_id ON receita (chef_id)')
+
+# --- Resolução de ingredientes em lote ---
+# "Sal", "sal " e "SAL" viram o mesmo ingrediente: espaços extras são removidos
+# e o nome é guardado em minúsculas.
+def normalizar_ingrediente(nome):
+    return ' '.join(nome.split()).lower()
+
+# Bancos criados antes da normalização podem ter "Sal" e "sal" gravados como
+# dois ingredientes. No fim de db.create_all(), uma única vez por banco (marcado
+# em PRAGMA user_version), os repetidos são juntados no de menor id, com as
+# suas receitas, e todos os nomes passam a ser gravados normalizados.
+VERSAO_INGREDIENTES_NORMALIZADOS = 1
+
+@event.listens_for(db.metadata, 'after_create')
+def normalizar_ingredientes_antigos(metadata, conexao, **kwargs):
+    if conexao.exec_driver_sql('PRAGMA user_version').scalar() >= VERSAO_INGREDIENTES_NORMALIZADOS:
+        return
+    tabela = Ingrediente.__table__
+    ids_por_nome, renomear = {}, []
+    for id, nome in conexao.execute(db.select(tabela.c.id, tabela.c.nome).order_by(tabela.c.id)).all():
+        normalizado = normalizar_ingrediente(nome)
+        if normalizado not in ids_por_nome:
+            ids_por_nome[normalizado] = id
+            if nome != normalizado:
+                renomear.append({'id_antigo': id, 'nome_novo': normalizado})
+            continue
+        # Repetido: as receitas passam para o ingrediente mantido e ele é apagado
+        conexao.execute(receita_ingrediente.insert().prefix_with('OR IGNORE').from_select(
+            ['receita_id', 'ingrediente_id'],
+            db.select(receita_ingrediente.c.receita_id, db.literal(ids_por_nome[normalizado]))
+            .where(receita_ingrediente.c.ingrediente_id == id)
+        ))
+        conexao.execute(receita_ingrediente.delete().where(receita_ingrediente.c.ingrediente_id == id))
+        conexao.execute(tabela.delete().where(tabela.c.id == id))
+    if renomear:
+        conexao.execute(
+            tabela.update().where(tabela.c.id == db.bindparam('id_antigo')).values(nome=db.bindparam('nome_novo')),
+            renomear
+        )
+    conexao.exec_driver_sql(f'PRAGMA user_version = {VERSAO_INGREDIENTES_NORMALIZADOS}')
+
+# Devolve os IDs dos ingredientes (na ordem recebida, sem repetições), criando
+# os que faltam. Uma consulta 'IN' busca os existentes e um único INSERT com
+# 'ON CONFLICT DO NOTHING ... RETURNING' cria os novos. Se outra requisição
+# criou o mesmo ingrediente ao mesmo tempo, ele é buscado de novo no final.
+def resolver_ingredientes(nomes):
+    nomes = list(dict.fromkeys(normalizar_ingrediente(n) for n in nomes if n.strip()))
+    if not nomes:
+        return []
+
+    # Os nomes já são gravados normalizados (veja normalizar_ingredientes_antigos),
+    # então a comparação direta usa o índice único de 'nome'
+    consulta = db.select(Ingrediente.nome, Ingrediente.id).where(Ingrediente.nome.in_(nomes))
+    ids_por_nome = dict(db.session.execute(consulta).all())
+
+    faltando = [nome for nome in nomes if nome not in ids_por_nome]
+    if faltando:
+        insercao = (
+            sqlite_insert(Ingrediente)
+            .values([{'nome': nome} for nome in faltando])
+            .on_conflict_do_nothing(index_elements=['nome'])
+            .returning(Ingrediente.nome, Ingrediente.id)
+        )
+        ids_por_nome.update(db.session.execute(insercao).all())
+
+    corrida = [nome for nome in nomes if nome not in ids_por_nome]
+    if corrida:
+        consulta = db.select(Ingrediente.nome, Ingrediente.id).where(Ingrediente.nome.in_(corrida))
+        ids_por_nome.update(db.session.execute(consulta).all())
+
+    return [ids_por_nome[nome] for nome in nomes]
+
+# Grava todas as linhas de 'receita_ingrediente' de uma receita em um único INSERT.
+def associar_ingredientes(receita_id, ingrediente_ids):
+    if ingrediente_ids:
+        db.session.execute(receita_ingrediente.insert().values([
+            {'receita_id': receita_id, 'ingrediente_id': ingrediente_id}
+            for ingrediente_id in ingrediente_ids
+        ]))
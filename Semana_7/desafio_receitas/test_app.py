@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+# Orçamento de consultas SQL das páginas de detalhes (veja instrumentacao_sql.py).
+# Rodar a partir desta pasta:  python -m pytest -q
+
+import pytest
+from app import create_app, db, Chef, PerfilChef, Receita, Ingrediente
+from instrumentacao_sql import OrcamentoDeConsultasExcedido
+
+
+def criar_app():
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'TESTING': True})
+    with app.app_context():
+        db.create_all()
+        chef = Chef(nome='Ana')
+        receita = Receita(titulo='Bolo', instrucoes='Misture e asse.', chef=chef)
+        receita.ingredientes = [Ingrediente(nome=f'ingrediente {n}') for n in range(1, 6)]
+        db.session.add_all([chef, PerfilChef(especialidade='Doces', anos_experiencia=3, chef=chef), receita])
+        db.session.commit()
+    return app
+
+
+def test_detalhes_da_receita_dentro_do_orcamento():
+    app = criar_app()
+    cliente = app.test_client()
+
+    # Sem o cache: 4 consultas (receita, ingredientes, chef e perfil)
+    primeira = cliente.get('/receita/1')
+    assert primeira.status_code == 200 and b'ingrediente 5' in primeira.data
+    assert primeira.headers['X-DB-Queries'] == '4'
+    assert 'X-DB-Time' in primeira.headers
+
+    # Com o cache: nenhuma
+    assert cliente.get('/receita/1').headers['X-DB-Queries'] == '0'
+
+
+def test_detalhes_da_receita_acima_do_orcamento():
+    app = criar_app()
+    app.view_functions['detalhes_receita'].orcamento_consultas = 3
+    with pytest.raises(OrcamentoDeConsultasExcedido, match='detalhes_receita fez 4 consultas'):
+        app.test_client().get('/receita/1')
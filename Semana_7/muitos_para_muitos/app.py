@@ -1,24 +1,49 @@
 # -*- coding: utf-8 -*-
 
+import csv
+import io
+import itertools
+import json
 import os
-from flask import Flask, request, redirect, url_for, render_template, flash
+import sys
+import click
+from flask import Flask, request, redirect, url_for, render_template, flash, jsonify, Response, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from cache_fragmentos import CacheFragmentos
+from compressao import instalar_compressao
+from estaticos import instalar_estaticos
+# Módulos compartilhados entre os apps (pasta compartilhado/ na raiz do repositório)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir))
+from compartilhado.cache_http import CacheHTTP
+from compartilhado.estilos import css_tailwind, css_icones
+from templates_compilados import configurar_templates, aquecer_se_pedido
 
 # -----------------------------------------------------------------------------
 # CONFIGURAÇÃO DA APLICAÇÃO FLASK E DO BANCO DE DADOS
 # -----------------------------------------------------------------------------
 
-# Cria uma instância da aplicação Flask
-app = Flask(__name__)
-
-# Configurações da aplicação
-app.config['SECRET_KEY'] = 'uma-chave-secreta-bem-segura'
 basedir = os.path.abspath(os.path.dirname(__file__))
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(basedir, 'database.db')
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
-# Inicializa a extensão SQLAlchemy
-db = SQLAlchemy(app)
+# Configurações padrão da aplicação. create_app(config) pode sobrescrever
+# qualquer uma delas (ex.: um banco em memória para testes e benchmarks).
+CONFIG_PADRAO = {
+    'SECRET_KEY': 'uma-chave-secreta-bem-segura',
+    'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(basedir, 'database.db'),
+    'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+}
+
+# As extensões são criadas SEM aplicação e ligadas a ela dentro de create_app()
+# com init_app(), o mesmo padrão de Semana_7/um_para_muitos/app.py
+db = SQLAlchemy()
+
+# Cache (LRU, em memória) dos fragmentos de HTML da página inicial
+cache = CacheFragmentos(tamanho_maximo=5000)
+
+# ETag e GET condicional da página inicial (veja compartilhado/cache_http.py)
+TABELAS_PAGINA_INICIAL = ('usuario', 'publicacao', 'etiqueta', 'publicacoes_etiquetas', 'etiqueta_contagem')
+http = CacheHTTP(TABELAS_PAGINA_INICIAL)
 
 
 # -----------------------------------------------------------------------------
@@ -31,7 +56,11 @@ db = SQLAlchemy(app)
 # Ela contém apenas as chaves estrangeiras para as tabelas que está conectando.
 publicacoes_etiquetas = db.Table('publicacoes_etiquetas',
     db.Column('publicacao_id', db.Integer, db.ForeignKey('publicacao.id'), primary_key=True),
-    db.Column('etiqueta_id', db.Integer, db.ForeignKey('etiqueta.id'), primary_key=True)
+    db.Column('etiqueta_id', db.Integer, db.ForeignKey('etiqueta.id'), primary_key=True),
+    # A chave primária (publicacao_id, etiqueta_id) acha rápido as etiquetas de uma
+    # publicação. Para o caminho inverso (as publicações de uma etiqueta, usado
+    # na busca por tags) precisamos de um índice com as colunas na ordem contrária.
+    db.Index('idx_publicacoes_etiquetas_etiqueta', 'etiqueta_id', 'publicacao_id')
 )
 
 # --- Modelo Usuario (Usuário) ---
@@ -41,6 +70,11 @@ class Usuario(db.Model):
     usuario_nome = db.Column(db.String(80), unique=True, nullable=False)
     publicacoes = db.relationship('Publicacao', back_populates='autor', cascade='all, delete-orphan')
 
+    # Quantas publicações o usuário tem, já contado. Mantido pelos gatilhos de
+    # GATILHOS_CONTADOR_PUBLICACOES (logo abaixo dos modelos); o template lê
+    # este número em vez de carregar a lista inteira só para contá-la.
+    publicacoes_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
     def __repr__(self):
         return f'<Usuário {self.usuario_nome}>'
 
@@ -50,7 +84,7 @@ class Publicacao(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     titulo = db.Column(db.String(120), nullable=False)
     conteudo = db.Column(db.Text, nullable=True)
-    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False, index=True)
     autor = db.relationship('Usuario', back_populates='publicacoes')
     
     # --- RELACIONAMENTO MUITOS-PARA-MUITOS com Etiqueta ---
@@ -60,6 +94,13 @@ class Publicacao(db.Model):
     # 3. back_populates='publicacoes': Cria a referência de volta no modelo 'Etiqueta'.
     etiquetas = db.relationship('Etiqueta', secondary=publicacoes_etiquetas, back_populates='publicacoes', lazy='dynamic')
 
+    # --- CAMINHO DE LEITURA (NÃO DINÂMICO) DAS ETIQUETAS ---
+    # Uma relação com lazy='dynamic' devolve uma query e NÃO pode ser carregada
+    # antecipadamente (eager loading). Por isso criamos uma segunda relação, apenas
+    # de leitura (viewonly=True), sobre a mesma tabela de associação. Ela é usada
+    # pela página inicial junto com 'selectinload' (veja 'carregar_usuarios').
+    etiquetas_lista = db.relationship('Etiqueta', secondary=publicacoes_etiquetas, viewonly=True)
+
     def __repr__(self):
         return f'<Publicação {self.titulo}>'
 
@@ -75,76 +116,450 @@ class Etiqueta(db.Model):
     def __repr__(self):
         return f'<Etiqueta {self.nome}>'
 
+# --- Contagem de uso de cada etiqueta (tabela "materializada") ---
+# Quantas publicações usam cada etiqueta, já contado. A nuvem de tags lê esta
+# tabela (pelo índice em 'total') em vez de contar a tabela de associação
+# inteira a cada requisição.
+class EtiquetaContagem(db.Model):
+    __tablename__ = 'etiqueta_contagem'
+    etiqueta_id = db.Column(db.Integer, db.ForeignKey('etiqueta.id', ondelete='CASCADE'), primary_key=True)
+    total = db.Column(db.Integer, nullable=False, index=True)
+    etiqueta = db.relationship('Etiqueta')
+
+    def __repr__(self):
+        return f'<EtiquetaContagem {self.etiqueta_id}: {self.total}>'
+
+# A contagem é mantida por gatilhos (triggers) do próprio SQLite, e não por
+# eventos do SQLAlchemy: as associações são gravadas com INSERTs do Core
+# (veja 'adicionar_perfil'), que não passam pelos eventos do ORM, e apagadas
+# pela cascata ao excluir um usuário. O gatilho vê as duas coisas.
+GATILHOS_CONTAGEM = [
+    # Bancos criados antes do índice de busca também o recebem
+    'CREATE INDEX IF NOT EXISTS idx_publicacoes_etiquetas_etiqueta'
+    ' ON publicacoes_etiquetas (etiqueta_id, publicacao_id)',
+    """CREATE TRIGGER IF NOT EXISTS trg_etiqueta_contagem_insert
+       AFTER INSERT ON publicacoes_etiquetas BEGIN
+           INSERT INTO etiqueta_contagem (etiqueta_id, total) VALUES (NEW.etiqueta_id, 1)
+           ON CONFLICT (etiqueta_id) DO UPDATE SET total = total + 1;
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_etiqueta_contagem_delete
+       AFTER DELETE ON publicacoes_etiquetas BEGIN
+           UPDATE etiqueta_contagem SET total = total - 1 WHERE etiqueta_id = OLD.etiqueta_id;
+           DELETE FROM etiqueta_contagem WHERE etiqueta_id = OLD.etiqueta_id AND total <= 0;
+       END""",
+]
+
+@event.listens_for(db.metadata, 'after_create')
+def criar_gatilhos_contagem(metadata, conexao, tables=(), **kwargs):
+    # Roda no fim de db.create_all(), quando todas as tabelas já existem
+    for comando in GATILHOS_CONTAGEM:
+        conexao.exec_driver_sql(comando)
+    # Tabela de contagem recém-criada em um banco que já tinha dados: conta uma vez
+    if EtiquetaContagem.__table__ in tables:
+        conexao.exec_driver_sql(
+            'INSERT INTO etiqueta_contagem (etiqueta_id, total)'
+            ' SELECT etiqueta_id, COUNT(*) FROM publicacoes_etiquetas GROUP BY etiqueta_id'
+        )
+
+# --- Contador de publicações por usuário (coluna desnormalizada) ---
+# 'usuario.publicacoes_count' é mantido por gatilhos (triggers) do SQLite, e não
+# por eventos do ORM: assim ele também acompanha INSERTs em lote do Core e
+# DELETEs feitos fora do app. A exclusão em cascata de 'excluir_usuario' apaga
+# as publicações uma a uma, e cada uma passa pelo gatilho de DELETE.
+# Se o contador sair do lugar, 'flask recontar-publicacoes' o corrige.
+GATILHOS_CONTADOR_PUBLICACOES = [
+    # Bancos criados antes do índice também o recebem
+    'CREATE INDEX IF NOT EXISTS ix_publicacao_usuario_id ON publicacao (usuario_id)',
+    """CREATE TRIGGER IF NOT EXISTS trg_publicacoes_count_insert
+       AFTER INSERT ON publicacao BEGIN
+           UPDATE usuario SET publicacoes_count = publicacoes_count + 1 WHERE id = NEW.usuario_id;
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_publicacoes_count_delete
+       AFTER DELETE ON publicacao BEGIN
+           UPDATE usuario SET publicacoes_count = publicacoes_count - 1 WHERE id = OLD.usuario_id;
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_publicacoes_count_update
+       AFTER UPDATE OF usuario_id ON publicacao BEGIN
+           UPDATE usuario SET publicacoes_count = publicacoes_count - 1 WHERE id = OLD.usuario_id;
+           UPDATE usuario SET publicacoes_count = publicacoes_count + 1 WHERE id = NEW.usuario_id;
+       END""",
+]
+
+# Recalcula o contador a partir da tabela 'publicacao' (pelo índice em
+# 'usuario_id') e devolve quantos usuários estavam errados.
+SQL_RECONTAR_PUBLICACOES = (
+    'UPDATE usuario SET publicacoes_count = ('
+    '    SELECT COUNT(*) FROM publicacao WHERE publicacao.usuario_id = usuario.id)'
+    ' WHERE publicacoes_count != ('
+    '    SELECT COUNT(*) FROM publicacao WHERE publicacao.usuario_id = usuario.id)'
+)
+
+def recontar_publicacoes(conexao):
+    return conexao.exec_driver_sql(SQL_RECONTAR_PUBLICACOES).rowcount
+
+@event.listens_for(db.metadata, 'after_create')
+def criar_contador_publicacoes(metadata, conexao, **kwargs):
+    # Roda no fim de db.create_all(). Um banco antigo ganha a coluna e é contado uma vez.
+    colunas = {linha[1] for linha in conexao.exec_driver_sql('PRAGMA table_info(usuario)')}
+    if 'publicacoes_count' not in colunas:
+        conexao.exec_driver_sql(
+            'ALTER TABLE usuario ADD COLUMN publicacoes_count INTEGER NOT NULL DEFAULT 0'
+        )
+    for comando in GATILHOS_CONTADOR_PUBLICACOES:
+        conexao.exec_driver_sql(comando)
+    if 'publicacoes_count' not in colunas:
+        recontar_publicacoes(conexao)
+
+# -----------------------------------------------------------------------------
+# CACHE DE FRAGMENTOS
+# -----------------------------------------------------------------------------
+# O cartão de cada usuário na página inicial é guardado já renderizado.
+# Qualquer gravação no usuário ou em uma de suas publicações invalida o cartão daquele usuário.
+cache.observar(db, Usuario, lambda usuario: [('usuario', usuario.id)])
+cache.observar(db, Publicacao, lambda objeto: [('usuario', objeto.usuario_id)])
+
+# -----------------------------------------------------------------------------
+# CONSULTAS USADAS PELAS ROTAS
+# -----------------------------------------------------------------------------
+
+# --- Carregamento antecipado (eager loading) para a página inicial ---
+# Sem isso, o template faz uma consulta para as publicações de CADA usuário e
+# outra para as etiquetas de CADA publicação (o famoso problema N+1).
+# Com 'selectinload' o SQLAlchemy busca tudo em um número fixo de consultas:
+# 1 para os usuários, 1 para as publicações e 1 para as etiquetas,
+# não importa quantas linhas existam.
+def carregar_usuarios():
+    return Usuario.query.options(
+        db.selectinload(Usuario.publicacoes).selectinload(Publicacao.etiquetas_lista)
+    ).order_by(Usuario.id).all()
+
+# --- Carimbo de cada cartão (veja cache_fragmentos.py) ---
+# O nome, o contador de publicações e o maior id entre elas, tirados do que a
+# rota já carregou: uma publicação criada ou apagada, por este ou por outro
+# worker, muda o carimbo e o cartão é renderizado de novo. O maior id pega o
+# caso em que outro worker apaga uma publicação e cria outra (o contador fica
+# igual). Continuam cobertos só pelo prazo de validade a edição de uma
+# publicação feita por outro worker e apagar justo a última e criar outra (o
+# SQLite reaproveita o id).
+def carimbos_usuarios(usuarios):
+    return {
+        usuario.id: (
+            usuario.usuario_nome,
+            usuario.publicacoes_count,
+            max((publicacao.id for publicacao in usuario.publicacoes), default=None),
+        )
+        for usuario in usuarios
+    }
+
+# --- Nuvem de tags ---
+# As etiquetas mais usadas, lidas da tabela de contagem pelo índice em 'total'
+# (sem contar nada na hora). O 'tamanho' vai de 1 a 5 e define a fonte no template.
+def nuvem_etiquetas(limite=50):
+    linhas = db.session.execute(
+        db.select(Etiqueta.nome, EtiquetaContagem.total)
+        .join(EtiquetaContagem, EtiquetaContagem.etiqueta_id == Etiqueta.id)
+        .order_by(EtiquetaContagem.total.desc())
+        .limit(limite)
+    ).all()
+    if not linhas:
+        return []
+    maior = linhas[0].total
+    return sorted(
+        ((nome, total, 1 + 4 * total // maior) if maior > 1 else (nome, total, 1) for nome, total in linhas),
+        key=lambda etiqueta: etiqueta[0]
+    )
+
+# --- Busca por etiquetas ---
+# /tags/python                 publicações com a etiqueta 'python'
+# /tags?any=python,flask       publicações com pelo menos uma das etiquetas
+# /tags?all=python,sql         publicações com todas as etiquetas
+# (any e all podem ser combinados)
+# Os ids das publicações saem só da tabela de associação, pelo índice
+# (etiqueta_id, publicacao_id), já em ordem decrescente; depois as publicações
+# encontradas são carregadas pela chave primária. Nenhuma tabela é lida inteira.
+LIMITE_BUSCA = 100
+
+def ids_etiquetas(nomes):
+    return dict(db.session.execute(
+        db.select(Etiqueta.nome, Etiqueta.id).where(Etiqueta.nome.in_(nomes))
+    ).all())
+
+def buscar_publicacoes(qualquer=(), todas=(), limite=LIMITE_BUSCA):
+    associacao = publicacoes_etiquetas.c
+    consultas = []
+    if todas:
+        ids = ids_etiquetas(todas)
+        # Uma etiqueta que não existe nunca é satisfeita
+        if len(ids) < len(set(todas)):
+            return []
+        consultas.append(
+            db.select(associacao.publicacao_id)
+            .where(associacao.etiqueta_id.in_(ids.values()))
+            .group_by(associacao.publicacao_id)
+            .having(db.func.count() == len(ids))
+        )
+    if qualquer:
+        ids = ids_etiquetas(qualquer)
+        if not ids:
+            return []
+        consultas.append(
+            db.select(associacao.publicacao_id).where(associacao.etiqueta_id.in_(ids.values()))
+        )
+    if not consultas:
+        return []
+
+    consulta = consultas[0] if len(consultas) == 1 else db.intersect(*consultas)
+    consulta = db.select(consulta.subquery().c.publicacao_id.label('id')).distinct()
+    publicacao_ids = db.session.scalars(consulta.order_by(db.desc('id')).limit(limite)).all()
+    if not publicacao_ids:
+        return []
+
+    publicacoes = Publicacao.query.options(
+        db.selectinload(Publicacao.autor), db.selectinload(Publicacao.etiquetas_lista)
+    ).filter(Publicacao.id.in_(publicacao_ids)).all()
+    por_id = {publicacao.id: publicacao for publicacao in publicacoes}
+    return [por_id[publicacao_id] for publicacao_id in publicacao_ids]
+
+def nomes_do_parametro(nome):
+    return list(dict.fromkeys(n.strip() for n in request.args.get(nome, '').split(',') if n.strip()))
+
+# --- Resolução das etiquetas em lote ---
+# Recebe a lista de nomes digitada no formulário e devolve os IDs das etiquetas,
+# criando as que ainda não existem. Em vez de uma consulta por etiqueta:
+# 1. remove nomes repetidos (mantendo a ordem);
+# 2. busca todas as existentes com UMA consulta usando 'IN';
+# 3. insere as que faltam em UM único INSERT. O 'ON CONFLICT DO NOTHING' cuida do
+#    caso em que outra requisição criou a mesma etiqueta ao mesmo tempo
+#    (restrição unique=True em 'Etiqueta.nome'), sem precisar de rollback;
+# 4. busca os IDs das recém-criadas com mais uma consulta 'IN'.
+def resolver_etiquetas(nomes):
+    nomes = list(dict.fromkeys(nomes))
+    if not nomes:
+        return []
+
+    consulta = db.select(Etiqueta.nome, Etiqueta.id).where(Etiqueta.nome.in_(nomes))
+    ids_por_nome = dict(db.session.execute(consulta).all())
+
+    faltando = [nome for nome in nomes if nome not in ids_por_nome]
+    if faltando:
+        insercao = sqlite_insert(Etiqueta).values([{'nome': nome} for nome in faltando])
+        db.session.execute(insercao.on_conflict_do_nothing(index_elements=['nome']))
+        consulta = db.select(Etiqueta.nome, Etiqueta.id).where(Etiqueta.nome.in_(faltando))
+        ids_por_nome.update(db.session.execute(consulta).all())
+
+    return [ids_por_nome[nome] for nome in nomes]
+
+# -----------------------------------------------------------------------------
+# EXPORTAÇÃO DAS PUBLICAÇÕES (EM STREAMING)
+# -----------------------------------------------------------------------------
+# As publicações saem direto do cursor do banco para a resposta, em vez de
+# montar uma lista com todas elas na memória:
+# - UMA consulta junta publicação, autor e etiquetas (LEFT JOIN na tabela de
+#   associação). Ela volta uma linha por par publicação/etiqueta, em ordem de
+#   publicação, e 'itertools.groupby' junta as linhas de cada publicação;
+# - 'yield_per' faz o SQLAlchemy buscar as linhas aos poucos, em blocos;
+# - a rota devolve um gerador, então o download começa na hora e a memória
+#   usada não depende do número de publicações.
+# Ordenamos só por Publicacao.id (a chave primária): assim o SQLite não precisa
+# ordenar o resultado inteiro antes de mandar a primeira linha.
+
+TAMANHO_BLOCO = 64 * 1024
+
+def publicacoes_para_exportar():
+    consulta = (
+        db.select(Publicacao.id, Publicacao.titulo, Publicacao.conteudo,
+                  Usuario.usuario_nome, Etiqueta.nome.label('etiqueta'))
+        .join(Usuario, Publicacao.usuario_id == Usuario.id)
+        .outerjoin(publicacoes_etiquetas, publicacoes_etiquetas.c.publicacao_id == Publicacao.id)
+        .outerjoin(Etiqueta, Etiqueta.id == publicacoes_etiquetas.c.etiqueta_id)
+        .order_by(Publicacao.id)
+        .execution_options(yield_per=1000)
+    )
+    linhas = db.session.execute(consulta)
+    for _, grupo in itertools.groupby(linhas, key=lambda linha: linha.id):
+        grupo = list(grupo)
+        primeira = grupo[0]
+        yield {
+            'id': primeira.id,
+            'titulo': primeira.titulo,
+            'conteudo': primeira.conteudo,
+            'autor': primeira.usuario_nome,
+            'etiquetas': [linha.etiqueta for linha in grupo if linha.etiqueta is not None],
+        }
+
+def em_blocos(textos):
+    # Junta as linhas em blocos de ~64 KB: menos escritas no socket do que uma por linha
+    bloco, tamanho = [], 0
+    for texto in textos:
+        bloco.append(texto)
+        tamanho += len(texto)
+        if tamanho >= TAMANHO_BLOCO:
+            yield ''.join(bloco)
+            bloco, tamanho = [], 0
+    if bloco:
+        yield ''.join(bloco)
+
+def resposta_em_streaming(textos, mimetype, nome_arquivo):
+    # stream_with_context mantém a sessão do banco aberta enquanto o gerador roda
+    return Response(
+        stream_with_context(em_blocos(textos)),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={nome_arquivo}'},
+    )
+
+
 # -----------------------------------------------------------------------------
-# DEFINIÇÃO DAS ROTAS E LÓGICA DA APLICAÇÃO
+# FÁBRICA DA APLICAÇÃO E ROTAS
 # -----------------------------------------------------------------------------
 
-@app.route('/')
-def index():
-    usuarios = Usuario.query.all()
-    etiquetas = Etiqueta.query.all()
-    return render_template('index.html', usuarios=usuarios, etiquetas=etiquetas)
-
-@app.route('/adicionar_usuario', methods=['POST'])
-def adicionar_usuario():
-    usuario_nome = request.form.get('usuario_nome')
-    if usuario_nome:
-        usuario_existente = Usuario.query.filter_by(usuario_nome=usuario_nome).first()
-        if not usuario_existente:
-            novo_usuario = Usuario(usuario_nome=usuario_nome)
-            db.session.add(novo_usuario)
-            db.session.commit()
-            flash(f'Usuário "{usuario_nome}" adicionado com sucesso!', 'success')
-        else:
-            flash(f'Usuário "{usuario_nome}" já existe.', 'danger')
-    return redirect(url_for('index'))
-
-@app.route('/adicionar_perfil', methods=['POST'])
-def adicionar_perfil():
-    usuario_id = request.form.get('usuario_id')
-    titulo = request.form.get('titulo')
-    conteudo = request.form.get('conteudo')
-    sequencia_etiquetas = request.form.get('etiquetas')
-
-    if usuario_id and titulo:
-        usuario = Usuario.query.get(usuario_id)
-        if usuario:
-            nova_publicacao = Publicacao(titulo=titulo, conteudo=conteudo, autor=usuario)
-            
-            # Lógica para processar as etiquetas
-            if sequencia_etiquetas:
-                nomes_etiquetas = [nome.strip() for nome in sequencia_etiquetas.split(',') if nome.strip()]
-                for etiqueta_nome in nomes_etiquetas:
-                    # Verifica se a etiqueta já existe
-                    etiqueta = Etiqueta.query.filter_by(nome=etiqueta_nome).first()
-                    if not etiqueta:
-                        # Se não existir, cria uma nova
-                        etiqueta = Etiqueta(nome=etiqueta_nome)
-                        db.session.add(etiqueta)
-                    # Associa a etiqueta à publicação
-                    nova_publicacao.etiquetas.append(etiqueta)
-
-            db.session.add(nova_publicacao)
-            db.session.commit()
-            flash(f'Publicação "{titulo}" adicionada para {usuario.usuario_nome}!', 'success')
-        else:
-            flash(f'Usuário não encontrado.', 'danger')
-    return redirect(url_for('index'))
-
-@app.route('/excluir_usuario/<int:usuario_id>', methods=['POST'])
-def excluir_usuario(usuario_id):
-    usuario_para_excluir = Usuario.query.get_or_44(usuario_id)
-    usuario_nome = usuario_para_excluir.usuario_nome
-    db.session.delete(usuario_para_excluir)
-    db.session.commit()
-    flash(f'Usuário "{usuario_nome}" e todas as suas publicações foram deletados.', 'info')
-    return redirect(url_for('index'))
+# --- Fábrica da aplicação ---
+# Cria e configura um novo app Flask. Nada é criado no momento do 'import',
+# e cada chamada pode receber uma configuração diferente.
+def create_app(config=None):
+    app = Flask(__name__)
+    app.config.update(CONFIG_PADRAO)
+    if config:
+        app.config.update(config)
+
+    # Minificação e gzip/brotli das respostas (veja compressao.py). Vem antes
+    # das outras extensões para o seu after_request ser o último a rodar.
+    instalar_compressao(app)
+
+    # CSS servido pelo próprio app, com só as classes do Tailwind e os ícones
+    # que os templates usam, e nomes com hash (veja estaticos.py e compartilhado/estilos.py)
+    instalar_estaticos(app, {'app.css': [css_tailwind, css_icones]})
+
+    # Templates compilados ficam em cache no disco (veja templates_compilados.py).
+    # Precisa vir antes de qualquer uso do Jinja, inclusive o cache de fragmentos abaixo.
+    configurar_templates(app)
+
+    # Liga as extensões a esta aplicação
+    db.init_app(app)
+    cache.init_app(app)
+    http.init_app(app, db)
+
+    @app.route('/')
+    @http.condicional(*TABELAS_PAGINA_INICIAL)
+    def index():
+        usuarios = carregar_usuarios()
+        return render_template('index.html', usuarios=usuarios, carimbos=carimbos_usuarios(usuarios),
+                               nuvem=nuvem_etiquetas())
+
+    @app.route('/tags')
+    def buscar_tags():
+        qualquer = nomes_do_parametro('any')
+        todas = nomes_do_parametro('all')
+        publicacoes = buscar_publicacoes(qualquer, todas) if qualquer or todas else None
+        return render_template('tags.html', publicacoes=publicacoes, qualquer=qualquer, todas=todas,
+                               nuvem=nuvem_etiquetas(limite=200), limite=LIMITE_BUSCA)
+
+    @app.route('/tags/<nome>')
+    def publicacoes_da_tag(nome):
+        Etiqueta.query.filter_by(nome=nome).first_or_404()
+        return render_template('tags.html', publicacoes=buscar_publicacoes(qualquer=[nome]), qualquer=[nome],
+                               todas=[], nuvem=nuvem_etiquetas(limite=200), limite=LIMITE_BUSCA)
+
+    # --- Estatísticas do cache de fragmentos (acertos, falhas, tamanho) ---
+    @app.route('/cache/estatisticas')
+    def estatisticas_cache():
+        return jsonify(cache.estatisticas())
+
+    @app.route('/adicionar_usuario', methods=['POST'])
+    def adicionar_usuario():
+        usuario_nome = request.form.get('usuario_nome')
+        if usuario_nome:
+            usuario_existente = Usuario.query.filter_by(usuario_nome=usuario_nome).first()
+            if not usuario_existente:
+                novo_usuario = Usuario(usuario_nome=usuario_nome)
+                db.session.add(novo_usuario)
+                db.session.commit()
+                flash(f'Usuário "{usuario_nome}" adicionado com sucesso!', 'success')
+            else:
+                flash(f'Usuário "{usuario_nome}" já existe.', 'danger')
+        return redirect(url_for('index'))
+
+    @app.route('/adicionar_perfil', methods=['POST'])
+    def adicionar_perfil():
+        usuario_id = request.form.get('usuario_id')
+        titulo = request.form.get('titulo')
+        conteudo = request.form.get('conteudo')
+        sequencia_etiquetas = request.form.get('etiquetas')
+
+        if usuario_id and titulo:
+            usuario = Usuario.query.get(usuario_id)
+            if usuario:
+                nova_publicacao = Publicacao(titulo=titulo, conteudo=conteudo, autor=usuario)
+                db.session.add(nova_publicacao)
+                # 'flush' envia o INSERT da publicação (sem confirmar) para gerar o seu id
+                db.session.flush()
+
+                # Lógica para processar as etiquetas
+                if sequencia_etiquetas:
+                    nomes_etiquetas = [nome.strip() for nome in sequencia_etiquetas.split(',') if nome.strip()]
+                    etiqueta_ids = resolver_etiquetas(nomes_etiquetas)
+                    # Associa todas as etiquetas à publicação com um único INSERT em lote
+                    if etiqueta_ids:
+                        db.session.execute(publicacoes_etiquetas.insert(), [
+                            {'publicacao_id': nova_publicacao.id, 'etiqueta_id': etiqueta_id}
+                            for etiqueta_id in etiqueta_ids
+                        ])
+
+                db.session.commit()
+                flash(f'Publicação "{titulo}" adicionada para {usuario.usuario_nome}!', 'success')
+            else:
+                flash(f'Usuário não encontrado.', 'danger')
+        return redirect(url_for('index'))
+
+    @app.route('/excluir_usuario/<int:usuario_id>', methods=['POST'])
+    def excluir_usuario(usuario_id):
+        usuario_para_excluir = Usuario.query.get_or_404(usuario_id)
+        usuario_nome = usuario_para_excluir.usuario_nome
+        db.session.delete(usuario_para_excluir)
+        db.session.commit()
+        flash(f'Usuário "{usuario_nome}" e todas as suas publicações foram deletados.', 'info')
+        return redirect(url_for('index'))
+
+    # --- Comando de manutenção: flask --app app recontar-publicacoes ---
+    @app.cli.command('recontar-publicacoes')
+    def recontar_publicacoes_comando():
+        """Confere usuario.publicacoes_count com a tabela publicacao e corrige as diferenças."""
+        with db.engine.begin() as conexao:
+            corrigidos = recontar_publicacoes(conexao)
+        click.echo(f'{corrigidos} usuário(s) corrigido(s)')
+
+    @app.route('/export/publicacoes.jsonl')
+    def exportar_publicacoes_jsonl():
+        textos = (json.dumps(publicacao, ensure_ascii=False) + '\n' for publicacao in publicacoes_para_exportar())
+        return resposta_em_streaming(textos, 'application/x-ndjson', 'publicacoes.jsonl')
+
+    @app.route('/export/publicacoes.csv')
+    def exportar_publicacoes_csv():
+        def textos():
+            saida = io.StringIO()
+            escritor = csv.writer(saida)
+            escritor.writerow(['id', 'titulo', 'conteudo', 'autor', 'etiquetas'])
+            for publicacao in publicacoes_para_exportar():
+                escritor.writerow([
+                    publicacao['id'], publicacao['titulo'], publicacao['conteudo'],
+                    publicacao['autor'], ','.join(publicacao['etiquetas']),
+                ])
+                yield saida.getvalue()
+                saida.seek(0)
+                saida.truncate()
+            yield saida.getvalue()
+        return resposta_em_streaming(textos(), 'text/csv', 'publicacoes.csv')
+
+    # Com AQUECER_TEMPLATES=1, renderiza cada template uma vez antes de atender requisições
+    aquecer_se_pedido(app)
+
+    return app
 
 
 # -----------------------------------------------------------------------------
 # INICIALIZAÇÃO DA APLICAÇÃO
 # -----------------------------------------------------------------------------
 if __name__ == '__main__':
+    app = create_app()
     with app.app_context():
         # Antes de rodar, para garantir que as tabelas antigas sejam removidas
         # e as novas sejam criadas, você pode deletar o arquivo 'database.db'
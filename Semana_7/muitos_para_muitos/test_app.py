@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+# Garante que a página inicial não volte a ter o problema N+1: o número de
+# consultas SQL de GET / não pode depender de quantas linhas existem.
+# Rodar a partir desta pasta:  python -m pytest -q
+
+from sqlalchemy import event
+from app import create_app, db, Usuario, Publicacao, Etiqueta, publicacoes_etiquetas
+
+
+def preencher(usuarios, publicacoes_por_usuario=3, etiquetas=5):
+    db.session.execute(Etiqueta.__table__.insert(), [
+        {'nome': f'etiqueta {n}'} for n in range(1, etiquetas + 1)
+    ])
+    db.session.execute(Usuario.__table__.insert(), [
+        {'id': n, 'usuario_nome': f'usuario {n}'} for n in range(1, usuarios + 1)
+    ])
+    db.session.execute(Publicacao.__table__.insert(), [
+        {'id': n, 'titulo': f'publicação {n}', 'conteudo': 'texto', 'usuario_id': 1 + (n - 1) // publicacoes_por_usuario}
+        for n in range(1, usuarios * publicacoes_por_usuario + 1)
+    ])
+    db.session.execute(publicacoes_etiquetas.insert(), [
+        {'publicacao_id': n, 'etiqueta_id': etiqueta_id}
+        for n in range(1, usuarios * publicacoes_por_usuario + 1)
+        for etiqueta_id in (1 + n % etiquetas, 1 + (n + 1) % etiquetas)
+    ])
+    db.session.commit()
+
+
+def consultas_da_pagina_inicial(usuarios):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'TESTING': True})
+    with app.app_context():
+        db.create_all()
+        preencher(usuarios)
+
+        consultas = []
+        def contar(conn, cursor, statement, parameters, context, executemany):
+            consultas.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', contar)
+        try:
+            resposta = app.test_client().get('/')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', contar)
+        db.drop_all()
+
+    assert resposta.status_code == 200
+    assert f'usuario {usuarios}'.encode() in resposta.data
+    return consultas
+
+
+def test_pagina_inicial_sem_n_mais_1():
+    poucos = consultas_da_pagina_inicial(10)
+    muitos = consultas_da_pagina_inicial(100)
+    # Hoje são 5: as versões das tabelas (compartilhado/cache_http.py), usuários, publicações,
+    # etiquetas (selectinload) e a nuvem de tags
+    assert len(muitos) == len(poucos), '\n'.join(muitos)
+
+
+def test_contador_de_publicacoes():
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'TESTING': True})
+    with app.app_context():
+        db.create_all()
+        # INSERTs do Core não passam pelo ORM: quem conta são os gatilhos
+        preencher(5, publicacoes_por_usuario=3)
+        assert [usuario.publicacoes_count for usuario in Usuario.query.order_by(Usuario.id)] == [3] * 5
+
+        app.test_client().post('/excluir_usuario/1')
+        assert db.session.scalar(db.select(db.func.count()).select_from(Publicacao)) == 12
+
+        resultado = app.test_cli_runner().invoke(args=['recontar-publicacoes'])
+        assert resultado.output.startswith('0 ')
+        db.drop_all()
+
+
+def test_get_condicional_da_pagina_inicial():
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'TESTING': True})
+    with app.app_context():
+        db.create_all()
+        preencher(3)
+        cliente = app.test_client()
+
+        primeira = cliente.get('/')
+        assert primeira.status_code == 200 and primeira.headers['ETag'].startswith('W/')
+        assert cliente.get('/', headers={'If-None-Match': primeira.headers['ETag']}).status_code == 304
+
+        # Uma etiqueta nova (INSERT do Core, fora do ORM) muda a ETag
+        db.session.execute(Etiqueta.__table__.insert(), [{'nome': 'nova'}])
+        db.session.commit()
+        segunda = cliente.get('/', headers={'If-None-Match': primeira.headers['ETag']})
+        assert segunda.status_code == 200 and segunda.headers['ETag'] != primeira.headers['ETag']
+        db.drop_all()
+
+
+def test_pagina_inicial_sem_tabela_de_versoes():
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'TESTING': True})
+    with app.app_context():
+        db.create_all()
+        preencher(3)
+        # Banco anterior ao compartilhado/cache_http.py: a página sai, só que sem ETag
+        db.session.execute(db.text('DROP TABLE versao_tabela'))
+        db.session.commit()
+
+        resposta = app.test_client().get('/')
+        assert resposta.status_code == 200 and b'usuario 3' in resposta.data
+        assert 'ETag' not in resposta.headers and 'Last-Modified' not in resposta.headers
+        db.drop_all()
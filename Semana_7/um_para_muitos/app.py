@@ -1,30 +1,51 @@
 # -*- coding: utf-8 -*-
 
 import os
-from flask import Flask, request, redirect, url_for, render_template, flash
+import sys
+import click
+from flask import Flask, request, redirect, url_for, render_template, flash, jsonify
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from cache_fragmentos import CacheFragmentos
+from compressao import instalar_compressao
+from estaticos import instalar_estaticos
+# Módulos compartilhados entre os apps (pasta compartilhado/ na raiz do repositório)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir))
+from compartilhado.cache_http import CacheHTTP
+from compartilhado.estilos import css_tailwind, css_icones
+from perfis_banco import configurar_perfil, ativar_pragmas
+from instrumentacao_sql import InstrumentacaoSQL, orcamento_consultas
 
 # -----------------------------------------------------------------------------
 # CONFIGURAÇÃO DA APLICAÇÃO FLASK E DO BANCO DE DADOS
 # -----------------------------------------------------------------------------
 
-# Cria uma instância da aplicação Flask
-app = Flask(__name__)
-
-# Configurações da aplicação
-# Chave secreta para proteger a sessão e outras funcionalidades de segurança
-app.config['SECRET_KEY'] = 'uma-chave-secreta-bem-segura'
-
 # Define o caminho para o arquivo de banco de dados SQLite
 # Ele será criado no mesmo diretório deste script
 basedir = os.path.abspath(os.path.dirname(__file__))
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(basedir, 'database.db')
 
-# Desativa o rastreamento de modificações do SQLAlchemy para economizar recursos
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Configurações padrão da aplicação. create_app(config) pode sobrescrever
+# qualquer uma delas (ex.: um banco em memória para testes e benchmarks).
+CONFIG_PADRAO = {
+    # Chave secreta para proteger a sessão e outras funcionalidades de segurança
+    'SECRET_KEY': 'uma-chave-secreta-bem-segura',
+    'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(basedir, 'database.db'),
+    # Desativa o rastreamento de modificações do SQLAlchemy para economizar recursos
+    'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+}
+
+# As extensões são criadas SEM aplicação e ligadas a ela dentro de create_app()
+# com init_app(), o mesmo padrão usado em Semana_7/desafio_receitas/models.py
+db = SQLAlchemy()
+
+# Cache (LRU, em memória) dos fragmentos de HTML da página inicial
+cache = CacheFragmentos(tamanho_maximo=5000)
 
-# Inicializa a extensão SQLAlchemy para interagir com o banco de dados
-db = SQLAlchemy(app)
+# ETag e GET condicional da página inicial (veja compartilhado/cache_http.py)
+http = CacheHTTP(('usuario', 'publicacao'))
+
+# Contagem de consultas SQL e log de consultas lentas por requisição
+sql = InstrumentacaoSQL()
 
 
 # -----------------------------------------------------------------------------
@@ -49,6 +70,11 @@ class Usuario(db.Model):
     # é uma lista (um-para-muitos).
     publicacoes = db.relationship('Publicacao', back_populates='autor', cascade='all, delete-orphan')
 
+    # Quantas publicações o usuário tem, já contado. Mantido pelos gatilhos de
+    # GATILHOS_CONTADOR_PUBLICACOES (logo abaixo dos modelos); o template lê
+    # este número em vez de carregar a lista inteira só para contá-la.
+    publicacoes_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
     def __repr__(self):
         return f'<Usuário {self.usuario_nome}>'
 
@@ -68,7 +94,7 @@ class Publicacao(db.Model):
     # 2. OBS: A restrição 'unique=True' FOI REMOVIDA. Isso é CRÍTICO.
     #    Agora, um mesmo 'usuario_id' pode aparecer várias vezes na tabela 'publicacao',
     #    permitindo que um usuário tenha múltiplos publicações.
-    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False, index=True)
 
     # Relação de volta para o modelo Usuario, conforme definido em `back_populates` acima.
     autor = db.relationship('Usuario', back_populates='publicacoes')
@@ -77,71 +103,193 @@ class Publicacao(db.Model):
         return f'<Publicação {self.titulo}>'
 
 
+# --- Contador de publicações por usuário (coluna desnormalizada) ---
+# 'usuario.publicacoes_count' é mantido por gatilhos (triggers) do SQLite, e não
+# por eventos do ORM: assim ele também acompanha INSERTs em lote do Core e
+# DELETEs feitos fora do app. A exclusão em cascata de 'excluir_usuario' apaga
+# as publicações uma a uma, e cada uma passa pelo gatilho de DELETE.
+# Se o contador sair do lugar, 'flask recontar-publicacoes' o corrige.
+GATILHOS_CONTADOR_PUBLICACOES = [
+    # Bancos criados antes do índice também o recebem
+    'CREATE INDEX IF NOT EXISTS ix_publicacao_usuario_id ON publicacao (usuario_id)',
+    """CREATE TRIGGER IF NOT EXISTS trg_publicacoes_count_insert
+       AFTER INSERT ON publicacao BEGIN
+           UPDATE usuario SET publicacoes_count = publicacoes_count + 1 WHERE id = NEW.usuario_id;
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_publicacoes_count_delete
+       AFTER DELETE ON publicacao BEGIN
+           UPDATE usuario SET publicacoes_count = publicacoes_count - 1 WHERE id = OLD.usuario_id;
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_publicacoes_count_update
+       AFTER UPDATE OF usuario_id ON publicacao BEGIN
+           UPDATE usuario SET publicacoes_count = publicacoes_count - 1 WHERE id = OLD.usuario_id;
+           UPDATE usuario SET publicacoes_count = publicacoes_count + 1 WHERE id = NEW.usuario_id;
+       END""",
+]
+
+# Recalcula o contador a partir da tabela 'publicacao' (pelo índice em
+# 'usuario_id') e devolve quantos usuários estavam errados.
+SQL_RECONTAR_PUBLICACOES = (
+    'UPDATE usuario SET publicacoes_count = ('
+    '    SELECT COUNT(*) FROM publicacao WHERE publicacao.usuario_id = usuario.id)'
+    ' WHERE publicacoes_count != ('
+    '    SELECT COUNT(*) FROM publicacao WHERE publicacao.usuario_id = usuario.id)'
+)
+
+def recontar_publicacoes(conexao):
+    return conexao.exec_driver_sql(SQL_RECONTAR_PUBLICACOES).rowcount
+
+@event.listens_for(db.metadata, 'after_create')
+def criar_contador_publicacoes(metadata, conexao, **kwargs):
+    # Roda no fim de db.create_all(). Um banco antigo ganha a coluna e é contado uma vez.
+    colunas = {linha[1] for linha in conexao.exec_driver_sql('PRAGMA table_info(usuario)')}
+    if 'publicacoes_count' not in colunas:
+        conexao.exec_driver_sql(
+            'ALTER TABLE usuario ADD COLUMN publicacoes_count INTEGER NOT NULL DEFAULT 0'
+        )
+    for comando in GATILHOS_CONTADOR_PUBLICACOES:
+        conexao.exec_driver_sql(comando)
+    if 'publicacoes_count' not in colunas:
+        recontar_publicacoes(conexao)
+
+
+# -----------------------------------------------------------------------------
+# CACHE DE FRAGMENTOS
+# -----------------------------------------------------------------------------
+# O cartão de cada usuário na página inicial é guardado já renderizado.
+# Qualquer gravação no usuário ou em uma de suas publicações invalida o cartão daquele usuário.
+cache.observar(db, Usuario, lambda usuario: [('usuario', usuario.id)])
+cache.observar(db, Publicacao, lambda objeto: [('usuario', objeto.usuario_id)])
+
+# --- Carimbo de cada cartão (veja cache_fragmentos.py) ---
+# O nome, o contador de publicações e o maior id entre elas, tirados do que a
+# rota já carregou: uma publicação criada ou apagada, por este ou por outro
+# worker, muda o carimbo e o cartão é renderizado de novo. O maior id pega o
+# caso em que outro worker apaga uma publicação e cria outra (o contador fica
+# igual). Continuam cobertos só pelo prazo de validade a edição de uma
+# publicação feita por outro worker e apagar justo a última e criar outra (o
+# SQLite reaproveita o id).
+def carimbos_usuarios(usuarios):
+    return {
+        usuario.id: (
+            usuario.usuario_nome,
+            usuario.publicacoes_count,
+            max((publicacao.id for publicacao in usuario.publicacoes), default=None),
+        )
+        for usuario in usuarios
+    }
+
 # -----------------------------------------------------------------------------
 # DEFINIÇÃO DAS ROTAS E LÓGICA DA APLICAÇÃO
 # -----------------------------------------------------------------------------
 
-# --- Rota Principal (/) ---
-# Exibe os usuários, suas publicações e os formulários para adicionar novos dados.
-@app.route('/')
-def index():
-    # Busca todos os usuários e suas publicações associadas (graças ao 'relationship')
-    usuarios = Usuario.query.all()
-    
-    # O HTML é renderizado a partir de uma string para manter tudo em um único arquivo
-    return render_template('index.html', usuarios=usuarios)
-
-
-# --- Rota para Adicionar Usuário ---
-@app.route('/adicionar_usuario', methods=['POST'])
-def adicionar_usuario():
-    usuario_nome = request.form.get('usuario_nome')
-    if usuario_nome:
-        # Verifica se o usuário já existe
-        usuario_existente = Usuario.query.filter_by(usuario_nome=usuario_nome).first()
-        if not usuario_existente:
-            novo_usuario = Usuario(usuario_nome=usuario_nome)
-            db.session.add(novo_usuario)
-            db.session.commit()
-            flash(f'Usuário "{usuario_nome}" adicionado com sucesso!', 'success')
-        else:
-            flash(f'Usuário "{usuario_nome}" já existe.', 'danger')
-    return redirect(url_for('index'))
-
-
-# --- Rota para Adicionar Publicação ---
-@app.route('/adicionar_perfil', methods=['POST'])
-def adicionar_perfil():
-    usuario_id = request.form.get('usuario_id')
-    titulo = request.form.get('titulo')
-    conteudo = request.form.get('conteudo')
-
-    if usuario_id and titulo:
-        usuario = Usuario.query.get(usuario_id)
-        if usuario:
-            novo_perfil = Publicacao(titulo=titulo, conteudo=conteudo, autor=usuario)
-            db.session.add(novo_perfil)
-            db.session.commit()
-            flash(f'Publicação "{titulo}" adicionada para {usuario.usuario_nome}!', 'success')
-        else:
-            flash(f'Usuário não encontrado.', 'danger')
-
-    return redirect(url_for('index'))
-
-# --- Rota para Deletar Usuário (e suas publicações, via cascade) ---
-@app.route('/excluir_usuario/<int:usuario_id>', methods=['POST'])
-def excluir_usuario(usuario_id):
-    usuario_para_excluir = Usuario.query.get_or_404(usuario_id)
-    usuario_nome = usuario_para_excluir.usuario_nome
-    db.session.delete(usuario_para_excluir)
-    db.session.commit()
-    flash(f'Usuário "{usuario_nome}" e todas as suas publicações foram deletados.', 'info')
-    return redirect(url_for('index'))
+# --- Fábrica da aplicação ---
+# Cria e configura um novo app Flask. Nada é criado no momento do 'import',
+# e cada chamada pode receber uma configuração diferente.
+def create_app(config=None):
+    app = Flask(__name__)
+    app.config.update(CONFIG_PADRAO)
+    if config:
+        app.config.update(config)
+
+    # Minificação e gzip/brotli das respostas (veja compressao.py). Vem antes
+    # das outras extensões para o seu after_request ser o último a rodar.
+    instalar_compressao(app)
+
+    # CSS servido pelo próprio app, com só as classes do Tailwind e os ícones
+    # que os templates usam, e nomes com hash (veja estaticos.py e compartilhado/estilos.py)
+    instalar_estaticos(app, {'app.css': [css_tailwind, css_icones]})
+
+    # Escolhe o perfil do banco: 'desenvolvimento' ou 'producao' (veja perfis_banco.py)
+    configurar_perfil(app)
+
+    # Liga as extensões a esta aplicação
+    db.init_app(app)
+    ativar_pragmas(app, db)
+    cache.init_app(app)
+    http.init_app(app, db)
+    sql.init_app(app, db)
+
+    # --- Rota Principal (/) ---
+    # Exibe os usuários, suas publicações e os formulários para adicionar novos dados.
+    # Consultas: as versões das tabelas (compartilhado/cache_http.py), os usuários e as publicações
+    @app.route('/')
+    @orcamento_consultas(3)
+    @http.condicional('usuario', 'publicacao')
+    def index():
+        # Busca todos os usuários e, em uma segunda consulta (selectinload), as
+        # publicações de todos eles: nada de uma consulta por usuário
+        usuarios = Usuario.query.options(db.selectinload(Usuario.publicacoes)).order_by(Usuario.id).all()
+
+        # O HTML é renderizado a partir de uma string para manter tudo em um único arquivo
+        return render_template('index.html', usuarios=usuarios, carimbos=carimbos_usuarios(usuarios))
+
+    # --- Estatísticas do cache de fragmentos (acertos, falhas, tamanho) ---
+    @app.route('/cache/estatisticas')
+    def estatisticas_cache():
+        return jsonify(cache.estatisticas())
+
+    # --- Rota para Adicionar Usuário ---
+    @app.route('/adicionar_usuario', methods=['POST'])
+    def adicionar_usuario():
+        usuario_nome = request.form.get('usuario_nome')
+        if usuario_nome:
+            # Verifica se o usuário já existe
+            usuario_existente = Usuario.query.filter_by(usuario_nome=usuario_nome).first()
+            if not usuario_existente:
+                novo_usuario = Usuario(usuario_nome=usuario_nome)
+                db.session.add(novo_usuario)
+                db.session.commit()
+                flash(f'Usuário "{usuario_nome}" adicionado com sucesso!', 'success')
+            else:
+                flash(f'Usuário "{usuario_nome}" já existe.', 'danger')
+        return redirect(url_for('index'))
+
+    # --- Rota para Adicionar Publicação ---
+    @app.route('/adicionar_perfil', methods=['POST'])
+    def adicionar_perfil():
+        usuario_id = request.form.get('usuario_id')
+        titulo = request.form.get('titulo')
+        conteudo = request.form.get('conteudo')
+
+        if usuario_id and titulo:
+            usuario = Usuario.query.get(usuario_id)
+            if usuario:
+                novo_perfil = Publicacao(titulo=titulo, conteudo=conteudo, autor=usuario)
+                db.session.add(novo_perfil)
+                db.session.commit()
+                flash(f'Publicação "{titulo}" adicionada para {usuario.usuario_nome}!', 'success')
+            else:
+                flash(f'Usuário não encontrado.', 'danger')
+
+        return redirect(url_for('index'))
+
+    # --- Rota para Deletar Usuário (e suas publicações, via cascade) ---
+    @app.route('/excluir_usuario/<int:usuario_id>', methods=['POST'])
+    def excluir_usuario(usuario_id):
+        usuario_para_excluir = Usuario.query.get_or_404(usuario_id)
+        usuario_nome = usuario_para_excluir.usuario_nome
+        db.session.delete(usuario_para_excluir)
+        db.session.commit()
+        flash(f'Usuário "{usuario_nome}" e todas as suas publicações foram deletados.', 'info')
+        return redirect(url_for('index'))
+
+    # --- Comando de manutenção: flask --app app recontar-publicacoes ---
+    @app.cli.command('recontar-publicacoes')
+    def recontar_publicacoes_comando():
+        """Confere usuario.publicacoes_count com a tabela publicacao e corrige as diferenças."""
+        with db.engine.begin() as conexao:
+            corrigidos = recontar_publicacoes(conexao)
+        click.echo(f'{corrigidos} usuário(s) corrigido(s)')
+
+    return app
+
 
 # -----------------------------------------------------------------------------
 # INICIALIZAÇÃO DA APLICAÇÃO
 # -----------------------------------------------------------------------------
 if __name__ == '__main__':
+    app = create_app()
     # Cria as tabelas no banco de dados, se não existirem
     with app.app_context():
         # Antes de rodar, para garantir que as tabelas antigas sejam removidas
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+# Orçamento de consultas SQL da página inicial (veja instrumentacao_sql.py):
+# o número de consultas de GET / não pode depender de quantas linhas existem.
+# Rodar a partir desta pasta:  python -m pytest -q
+
+import pytest
+from app import create_app, db, Usuario, Publicacao
+from instrumentacao_sql import OrcamentoDeConsultasExcedido
+
+
+def criar_app(usuarios, publicacoes_por_usuario=3):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'TESTING': True})
+    with app.app_context():
+        db.create_all()
+        db.session.execute(Usuario.__table__.insert(), [
+            {'id': n, 'usuario_nome': f'usuario {n}'} for n in range(1, usuarios + 1)
+        ])
+        db.session.execute(Publicacao.__table__.insert(), [
+            {'titulo': f'publicação {n}', 'conteudo': 'texto', 'usuario_id': 1 + (n - 1) // publicacoes_por_usuario}
+            for n in range(1, usuarios * publicacoes_por_usuario + 1)
+        ])
+        db.session.commit()
+    return app
+
+
+@pytest.mark.parametrize('usuarios', [10, 100])
+def test_pagina_inicial_dentro_do_orcamento(usuarios):
+    resposta = criar_app(usuarios).test_client().get('/')
+    assert resposta.status_code == 200
+    assert f'usuario {usuarios}'.encode() in resposta.data
+    # As versões das tabelas (compartilhado/cache_http.py), os usuários e as publicações (selectinload)
+    assert resposta.headers['X-DB-Queries'] == '3'
+    assert 'X-DB-Time' in resposta.headers
+
+
+def test_pagina_inicial_acima_do_orcamento():
+    app = criar_app(3)
+    app.view_functions['index'].orcamento_consultas = 2
+    with pytest.raises(OrcamentoDeConsultasExcedido, match='index fez 3 consultas'):
+        app.test_client().get('/')
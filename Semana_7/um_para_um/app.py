@@ -1,30 +1,44 @@
 # -*- coding: utf-8 -*-
 
 import os
-from flask import Flask, request, redirect, url_for, render_template, flash
+import sys
+from flask import Flask, request, redirect, url_for, render_template, flash, jsonify
 from flask_sqlalchemy import SQLAlchemy
+from cache_fragmentos import CacheFragmentos
+from compressao import instalar_compressao
+from estaticos import instalar_estaticos
+# Módulos compartilhados entre os apps (pasta compartilhado/ na raiz do repositório)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir))
+from compartilhado.cache_http import CacheHTTP
+from compartilhado.estilos import css_tailwind, css_icones
 
 # -----------------------------------------------------------------------------
 # CONFIGURAÇÃO DA APLICAÇÃO FLASK E DO BANCO DE DADOS
 # -----------------------------------------------------------------------------
 
-# Cria uma instância da aplicação Flask
-app = Flask(__name__)
-
-# Configurações da aplicação
-# Chave secreta para proteger a sessão e outras funcionalidades de segurança
-app.config['SECRET_KEY'] = 'uma-chave-secreta-bem-segura'
-
 # Define o caminho para o arquivo de banco de dados SQLite
 # Ele será criado no mesmo diretório deste script
 basedir = os.path.abspath(os.path.dirname(__file__))
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(basedir, 'database.db')
 
-# Desativa o rastreamento de modificações do SQLAlchemy para economizar recursos
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Configurações padrão da aplicação. create_app(config) pode sobrescrever
+# qualquer uma delas (ex.: um banco em memória para testes e benchmarks).
+CONFIG_PADRAO = {
+    # Chave secreta para proteger a sessão e outras funcionalidades de segurança
+    'SECRET_KEY': 'uma-chave-secreta-bem-segura',
+    'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(basedir, 'database.db'),
+    # Desativa o rastreamento de modificações do SQLAlchemy para economizar recursos
+    'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+}
+
+# As extensões são criadas SEM aplicação e ligadas a ela dentro de create_app()
+# com init_app(), o mesmo padrão de Semana_7/um_para_muitos/app.py
+db = SQLAlchemy()
+
+# Cache (LRU, em memória) dos fragmentos de HTML da página inicial
+cache = CacheFragmentos(tamanho_maximo=5000)
 
-# Inicializa a extensão SQLAlchemy para interagir com o banco de dados
-db = SQLAlchemy(app)
+# ETag e GET condicional da página inicial (veja compartilhado/cache_http.py)
+http = CacheHTTP(('usuario', 'perfil'))
 
 
 # -----------------------------------------------------------------------------
@@ -78,75 +92,122 @@ class Perfil(db.Model):
         return f'<Perfil for {self.usuario.usuario_nome}>'
 
 
+# -----------------------------------------------------------------------------
+# CACHE DE FRAGMENTOS
+# -----------------------------------------------------------------------------
+# O cartão de cada usuário na página inicial é guardado já renderizado.
+# Qualquer gravação no usuário ou em seu Perfil invalida o cartão daquele usuário.
+cache.observar(db, Usuario, lambda usuario: [('usuario', usuario.id)])
+cache.observar(db, Perfil, lambda objeto: [('usuario', objeto.usuario_id)])
+
+# --- Carimbo de cada cartão (veja cache_fragmentos.py) ---
+# O id do perfil de cada usuário, lido em uma única consulta (pelo índice único
+# de 'perfil.usuario_id'): criar ou apagar um perfil, neste ou em outro worker,
+# muda o carimbo e o cartão é renderizado de novo.
+def carimbos_usuarios(usuarios):
+    perfis = dict(db.session.execute(db.select(Perfil.usuario_id, Perfil.id)).all())
+    return {usuario.id: (usuario.usuario_nome, perfis.get(usuario.id)) for usuario in usuarios}
+
 # -----------------------------------------------------------------------------
 # DEFINIÇÃO DAS ROTAS E LÓGICA DA APLICAÇÃO
 # -----------------------------------------------------------------------------
 
-# --- Rota Principal (/) ---
-# Exibe os usuários, seus perfis e os formulários para adicionar novos dados.
-@app.route('/')
-def index():
-    # Busca todos os usuários e os perfis associados (graças ao 'relationship')
-    usuarios = Usuario.query.all()
-    # Busca usuários que ainda não têm um perfil para popular o formulário de criação de perfil
-    usuarios_sem_perfil = Usuario.query.filter(Usuario.perfil == None).all()
-    
-    # O HTML é renderizado a partir de uma string para manter tudo em um único arquivo
-    return render_template('index.html', usuarios=usuarios, usuarios_sem_perfil=usuarios_sem_perfil)
-
-
-# --- Rota para Adicionar Usuário ---
-@app.route('/adicionar_usuario', methods=['POST'])
-def adicionar_usuario():
-    usuario_nome = request.form.get('usuario_nome')
-    if usuario_nome:
-        # Verifica se o usuário já existe
-        usuario_existente = Usuario.query.filter_by(usuario_nome=usuario_nome).first()
-        if not usuario_existente:
-            novo_usuario = Usuario(usuario_nome=usuario_nome)
-            db.session.add(novo_usuario)
-            db.session.commit()
-            flash(f'Usuário "{usuario_nome}" adicionado com sucesso!', 'success')
-        else:
-            flash(f'Usuário "{usuario_nome}" já existe.', 'danger')
-    return redirect(url_for('index'))
-
-
-# --- Rota para Adicionar Perfil ---
-@app.route('/adicionar_perfil', methods=['POST'])
-def adicionar_perfil():
-    usuario_id = request.form.get('usuario_id')
-    nome_completo = request.form.get('nome_completo')
-    bio = request.form.get('bio')
-
-    if usuario_id and nome_completo:
-        # A lógica do banco de dados (unique=True na coluna usuario_id) já impede
-        # a criação de um segundo perfil, mas é uma boa prática verificar aqui também.
-        usuario = Usuario.query.get(usuario_id)
-        if usuario and not usuario.perfil:
-            novo_perfil = Perfil(nome_completo=nome_completo, bio=bio, usuario_id=usuario.id)
-            db.session.add(novo_perfil)
-            db.session.commit()
-            flash(f'Perfil para "{usuario.usuario_nome}" adicionado com sucesso!', 'success')
-        else:
-            flash(f'Este usuário já possui um perfil ou não existe.', 'danger')
-
-    return redirect(url_for('index'))
-
-# --- Rota para Deletar Usuário (e seu perfil, via cascade) ---
-@app.route('/excluir_usuario/<int:usuario_id>', methods=['POST'])
-def excluir_usuario(usuario_id):
-    usuario_para_excluir = Usuario.query.get_or_404(usuario_id)
-    usuario_nome = usuario_para_excluir.usuario_nome
-    db.session.delete(usuario_para_excluir)
-    db.session.commit()
-    flash(f'Usuário "{usuario_nome}" e seu perfil foram deletados.', 'info')
-    return redirect(url_for('index'))
+# --- Fábrica da aplicação ---
+# Cria e configura um novo app Flask. Nada é criado no momento do 'import',
+# e cada chamada pode receber uma configuração diferente.
+def create_app(config=None):
+    app = Flask(__name__)
+    app.config.update(CONFIG_PADRAO)
+    if config:
+        app.config.update(config)
+
+    # Minificação e gzip/brotli das respostas (veja compressao.py). Vem antes
+    # das outras extensões para o seu after_request ser o último a rodar.
+    instalar_compressao(app)
+
+    # CSS servido pelo próprio app, com só as classes do Tailwind e os ícones
+    # que os templates usam, e nomes com hash (veja estaticos.py e compartilhado/estilos.py)
+    instalar_estaticos(app, {'app.css': [css_tailwind, css_icones]})
+
+    # Liga as extensões a esta aplicação
+    db.init_app(app)
+    cache.init_app(app)
+    http.init_app(app, db)
+
+    # --- Rota Principal (/) ---
+    # Exibe os usuários, seus perfis e os formulários para adicionar novos dados.
+    @app.route('/')
+    @http.condicional('usuario', 'perfil')
+    def index():
+        # Busca todos os usuários e os perfis associados (graças ao 'relationship')
+        usuarios = Usuario.query.all()
+        # Busca usuários que ainda não têm um perfil para popular o formulário de criação de perfil
+        usuarios_sem_perfil = Usuario.query.filter(Usuario.perfil == None).all()
+
+        # O HTML é renderizado a partir de uma string para manter tudo em um único arquivo
+        return render_template('index.html', usuarios=usuarios, usuarios_sem_perfil=usuarios_sem_perfil,
+                               carimbos=carimbos_usuarios(usuarios))
+
+    # --- Estatísticas do cache de fragmentos (acertos, falhas, tamanho) ---
+    @app.route('/cache/estatisticas')
+    def estatisticas_cache():
+        return jsonify(cache.estatisticas())
+
+    # --- Rota para Adicionar Usuário ---
+    @app.route('/adicionar_usuario', methods=['POST'])
+    def adicionar_usuario():
+        usuario_nome = request.form.get('usuario_nome')
+        if usuario_nome:
+            # Verifica se o usuário já existe
+            usuario_existente = Usuario.query.filter_by(usuario_nome=usuario_nome).first()
+            if not usuario_existente:
+                novo_usuario = Usuario(usuario_nome=usuario_nome)
+                db.session.add(novo_usuario)
+                db.session.commit()
+                flash(f'Usuário "{usuario_nome}" adicionado com sucesso!', 'success')
+            else:
+                flash(f'Usuário "{usuario_nome}" já existe.', 'danger')
+        return redirect(url_for('index'))
+
+    # --- Rota para Adicionar Perfil ---
+    @app.route('/adicionar_perfil', methods=['POST'])
+    def adicionar_perfil():
+        usuario_id = request.form.get('usuario_id')
+        nome_completo = request.form.get('nome_completo')
+        bio = request.form.get('bio')
+
+        if usuario_id and nome_completo:
+            # A lógica do banco de dados (unique=True na coluna usuario_id) já impede
+            # a criação de um segundo perfil, mas é uma boa prática verificar aqui também.
+            usuario = Usuario.query.get(usuario_id)
+            if usuario and not usuario.perfil:
+                novo_perfil = Perfil(nome_completo=nome_completo, bio=bio, usuario_id=usuario.id)
+                db.session.add(novo_perfil)
+                db.session.commit()
+                flash(f'Perfil para "{usuario.usuario_nome}" adicionado com sucesso!', 'success')
+            else:
+                flash(f'Este usuário já possui um perfil ou não existe.', 'danger')
+
+        return redirect(url_for('index'))
+
+    # --- Rota para Deletar Usuário (e seu perfil, via cascade) ---
+    @app.route('/excluir_usuario/<int:usuario_id>', methods=['POST'])
+    def excluir_usuario(usuario_id):
+        usuario_para_excluir = Usuario.query.get_or_404(usuario_id)
+        usuario_nome = usuario_para_excluir.usuario_nome
+        db.session.delete(usuario_para_excluir)
+        db.session.commit()
+        flash(f'Usuário "{usuario_nome}" e seu perfil foram deletados.', 'info')
+        return redirect(url_for('index'))
+
+    return app
+
 
 # -----------------------------------------------------------------------------
 # INICIALIZAÇÃO DA APLICAÇÃO
 # -----------------------------------------------------------------------------
 if __name__ == '__main__':
+    app = create_app()
     # Cria as tabelas no banco de dados, se não existirem
     with app.app_context():
         db.create_all()
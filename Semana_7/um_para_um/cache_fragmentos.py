@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event
+
+# -----------------------------------------------------------------------------
+# CACHE DE FRAGMENTOS DE TEMPLATE
+# -----------------------------------------------------------------------------
+# Guarda o HTML já renderizado de pedaços de uma página (por exemplo, o cartão
+# de cada usuário) para não renderizá-lo de novo a cada requisição.
+#
+# Uso no template:
+#     {% call cache_fragmento('usuario', usuario.id, carimbos[usuario.id]) %} ... {% endcall %}
+#
+# Cada fragmento é guardado em (nome, id) junto com um "carimbo" tirado dos
+# dados que a rota já carregou (ex.: nome do usuário, quantas publicações ele
+# tem e o maior id entre elas). Se o carimbo da requisição for diferente do
+# guardado, o HTML é renderizado de novo. Como o carimbo vem do banco, um
+# worker percebe alterações feitas por outro worker, sem depender de memória
+# compartilhada.
+#
+# Alterações que não mudam o carimbo (ex.: um UPDATE feito por outro worker ou
+# fora do app) podem ficar até CACHE_FRAGMENTOS_TTL segundos (padrão 300) sem
+# aparecer: esse é o prazo máximo de um cartão desatualizado. No processo que
+# fez a gravação, 'observar' apaga o fragmento na hora. O que entra no carimbo
+# de cada página está na função que o monta (ex.: carimbos_usuarios em app.py).
+
+
+class CacheLRU:
+    """Dicionário com tamanho máximo: ao encher, descarta o item menos usado."""
+
+    def __init__(self, tamanho_maximo=1000):
+        self.tamanho_maximo = tamanho_maximo
+        self.acertos = 0
+        self.falhas = 0
+        self._itens = OrderedDict()
+        self._trava = threading.Lock()
+
+    def get(self, chave, valido=None):
+        """'valido(valor)' pode recusar um item guardado, que então conta como falha."""
+        with self._trava:
+            if chave in self._itens and (valido is None or valido(self._itens[chave])):
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return self._itens[chave]
+            self.falhas += 1
+            return None
+
+    def set(self, chave, valor):
+        with self._trava:
+            self._itens[chave] = valor
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.tamanho_maximo:
+                self._itens.popitem(last=False)
+
+    def remover(self, chave):
+        with self._trava:
+            self._itens.pop(chave, None)
+
+    def estatisticas(self):
+        with self._trava:
+            return {
+                'itens': len(self._itens),
+                'tamanho_maximo': self.tamanho_maximo,
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+            }
+
+
+class CacheFragmentos:
+    def __init__(self, app=None, tamanho_maximo=1000):
+        self.lru = CacheLRU(tamanho_maximo)
+        self.validade = 300
+        self._sessao_observada = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.validade = app.config.setdefault('CACHE_FRAGMENTOS_TTL', 300)
+        app.jinja_env.globals['cache_fragmento'] = self.fragmento
+
+    def invalidar(self, nome, id):
+        self.lru.remover((nome, id))
+
+    def fragmento(self, nome, id, carimbo=None, caller=None):
+        agora = time.monotonic()
+        guardado = self.lru.get((nome, id), lambda item: item[0] == carimbo and agora < item[1])
+        if guardado is not None:
+            return guardado[2]
+        html = caller()
+        self.lru.set((nome, id), (carimbo, agora + self.validade, html))
+        return html
+
+    def estatisticas(self):
+        return self.lru.estatisticas()
+
+    def observar(self, db, modelo, chaves):
+        """
+        Invalida fragmentos automaticamente quando 'modelo' é inserido,
+        alterado ou apagado. 'chaves(objeto)' devolve a lista de (nome, id)
+        afetados. A invalidação só acontece depois do commit, para que outra
+        requisição não guarde no cache dados que ainda não foram gravados.
+        """
+        def marcar(mapper, connection, objeto):
+            db.session.info.setdefault('fragmentos_alterados', set()).update(chaves(objeto))
+
+        for nome_evento in ('after_insert', 'after_update', 'after_delete'):
+            event.listen(modelo, nome_evento, marcar)
+
+        if not self._sessao_observada:
+            self._sessao_observada = True
+            event.listen(db.session, 'after_commit', self._aplicar)
+            event.listen(db.session, 'after_rollback', self._descartar)
+
+    def _aplicar(self, session):
+        for nome, id in session.info.pop('fragmentos_alterados', ()):
+            self.invalidar(nome, id)
+
+    def _descartar(self, session):
+        session.info.pop('fragmentos_alterados', None)
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+import gzip
+import re
+import threading
+from collections import OrderedDict
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # opcional: sem o pacote 'brotli', só gzip
+    brotli = None
+
+# -----------------------------------------------------------------------------
+# COMPRESSÃO E MINIFICAÇÃO DAS RESPOSTAS
+# -----------------------------------------------------------------------------
+# Chamar 'instalar_compressao(app)' logo no início de create_app(), antes de
+# qualquer uso do Jinja e antes das outras extensões (o after_request
+# registrado primeiro é o último a rodar, então ele vê a resposta pronta).
+#
+# 1. Jinja com trim_blocks e lstrip_blocks: as linhas de {% if %}, {% for %}
+#    etc. não deixam mais linhas em branco e indentação no HTML.
+# 2. Minificação do HTML: tira comentários e troca o espaço entre uma tag e a
+#    seguinte por um único espaço ou quebra de linha. O conteúdo de <pre>,
+#    <textarea>, <script> e <style> não é tocado, e o texto dentro das tags
+#    também não (ex.: as instruções de uma receita, com 'whitespace-pre-line').
+# 3. Compressão negociada pelo Accept-Encoding: brotli (se o pacote estiver
+#    instalado) ou gzip, só para respostas de texto com pelo menos
+#    COMPRESSAO_MINIMO bytes (abaixo disso o cabeçalho gzip quase não compensa).
+# 4. Respostas com ETag (veja compartilhado/cache_http.py) têm os bytes já comprimidos
+#    guardados em um LRU, pela URL + ETag + codificação: a mesma página não é
+#    minificada nem comprimida duas vezes enquanto os dados não mudarem.
+#
+# Respostas em streaming, arquivos (send_file) e respostas que já têm
+# Content-Encoding passam direto.
+
+TIPOS_COMPRIMIVEIS = {
+    'text/html', 'text/css', 'text/plain', 'text/csv',
+    'application/json', 'application/javascript', 'text/javascript', 'image/svg+xml',
+}
+
+_PROTEGIDOS = re.compile(r'(<(pre|textarea|script|style)\b.*?</\2\s*>)', re.DOTALL | re.IGNORECASE)
+_COMENTARIO = re.compile(r'<!--(?!\[if).*?-->', re.DOTALL)
+_ENTRE_TAGS = re.compile(r'>\s+<')
+
+
+def _espaco_entre_tags(encontrado):
+    # Uma quebra de linha continua sendo quebra (importa em 'white-space: pre-line')
+    return '>\n<' if '\n' in encontrado.group() else '> <'
+
+
+def minificar_html(html):
+    # split() com dois grupos devolve [texto, bloco protegido, nome da tag, texto, ...]
+    partes = _PROTEGIDOS.split(html)
+    ultimo = len(partes) - 1
+    for n in range(0, len(partes), 3):
+        # Um bloco protegido começa com '<' e termina com '>': os marcadores
+        # deixam o espaço entre ele e a tag vizinha ser tratado também
+        texto = ('>' if n else '') + _COMENTARIO.sub('', partes[n]) + ('<' if n < ultimo else '')
+        texto = _ENTRE_TAGS.sub(_espaco_entre_tags, texto)
+        partes[n] = texto[1 if n else 0:len(texto) - (1 if n < ultimo else 0)]
+    return ''.join(parte for n, parte in enumerate(partes) if n % 3 != 2)
+
+
+def escolher_codificacao(aceitas):
+    if brotli is not None and aceitas['br']:
+        return 'br'
+    if aceitas['gzip']:
+        return 'gzip'
+    return None
+
+
+def comprimir(dados, codificacao, config):
+    if codificacao == 'br':
+        return brotli.compress(dados, quality=config['COMPRESSAO_NIVEL_BROTLI'])
+    return gzip.compress(dados, compresslevel=config['COMPRESSAO_NIVEL_GZIP'], mtime=0)
+
+
+class CacheComprimidos:
+    """LRU dos corpos já comprimidos, com limite de itens."""
+
+    def __init__(self, tamanho_maximo):
+        self.tamanho_maximo = tamanho_maximo
+        self.acertos = 0
+        self.falhas = 0
+        self._itens = OrderedDict()
+        self._trava = threading.Lock()
+
+    def get(self, chave):
+        with self._trava:
+            dados = self._itens.get(chave)
+            if dados is None:
+                self.falhas += 1
+                return None
+            self.acertos += 1
+            self._itens.move_to_end(chave)
+            return dados
+
+    def set(self, chave, dados):
+        if self.tamanho_maximo <= 0:
+            return
+        with self._trava:
+            self._itens[chave] = dados
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.tamanho_maximo:
+                self._itens.popitem(last=False)
+
+
+def instalar_compressao(app):
+    app.config.setdefault('COMPRESSAO', True)
+    app.config.setdefault('COMPRESSAO_MINIFICAR', True)
+    app.config.setdefault('COMPRESSAO_MINIMO', 500)
+    app.config.setdefault('COMPRESSAO_NIVEL_GZIP', 6)
+    app.config.setdefault('COMPRESSAO_NIVEL_BROTLI', 5)
+    app.config.setdefault('COMPRESSAO_CACHE_TAMANHO', 256)
+
+    app.jinja_options = {**app.jinja_options, 'trim_blocks': True, 'lstrip_blocks': True}
+    cache = app.extensions['compressao'] = CacheComprimidos(app.config['COMPRESSAO_CACHE_TAMANHO'])
+
+    @app.after_request
+    def comprimir_resposta(resposta):
+        config = app.config
+        if (not config['COMPRESSAO'] or resposta.direct_passthrough or resposta.is_streamed
+                or resposta.status_code != 200 or 'Content-Encoding' in resposta.headers
+                or resposta.mimetype not in TIPOS_COMPRIMIVEIS):
+            return resposta
+
+        resposta.vary.add('Accept-Encoding')
+        codificacao = escolher_codificacao(request.accept_encodings)
+        etag, _ = resposta.get_etag()
+        chave = (request.full_path, etag, codificacao) if etag else None
+        guardado = cache.get(chave) if chave else None
+        if guardado is not None:
+            corpo, codificacao = guardado
+        else:
+            corpo = resposta.get_data()
+            if config['COMPRESSAO_MINIFICAR'] and resposta.mimetype == 'text/html':
+                charset = resposta.mimetype_params.get('charset', 'utf-8')
+                corpo = minificar_html(corpo.decode(charset)).encode(charset)
+            if codificacao is None or len(corpo) < config['COMPRESSAO_MINIMO']:
+                codificacao = None
+            else:
+                corpo = comprimir(corpo, codificacao, config)
+            if chave:
+                cache.set(chave, (corpo, codificacao))
+
+        resposta.set_data(corpo)
+        if codificacao:
+            resposta.headers['Content-Encoding'] = codificacao
+        return resposta
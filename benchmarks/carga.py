@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+
+# Teste de carga de todas as rotas dos apps do curso (Semana_2 a Semana_7).
+#
+# Para cada app:
+#   1. copia a pasta do app para um diretório temporário (os bancos .db do
+#      repositório nunca são tocados) e importa o app lá, em um subprocesso;
+#   2. cria as tabelas e preenche cada uma com --linhas linhas sintéticas;
+#   3. descobre as rotas no url_map e os formulários (POST) nas páginas HTML;
+#   4. dispara --requisicoes requisições por rota com o test client do Flask
+#      e mede p50/p95/p99 e requisições por segundo.
+#
+# O resultado é um JSON que pode ser guardado e comparado entre commits:
+#     python benchmarks/carga.py --saida base.json
+#     python benchmarks/carga.py --comparar base.json
+
+import argparse
+import glob
+import itertools
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from html.parser import HTMLParser
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SEMANAS = ['Semana_2', 'Semana_3', 'Semana_4', 'Semana_5', 'Semana_6', 'Semana_7']
+
+
+# -----------------------------------------------------------------------------
+# DESCOBERTA DOS APPS
+# -----------------------------------------------------------------------------
+
+def descobrir_apps():
+    pastas = []
+    for semana in SEMANAS:
+        for caminho in glob.glob(os.path.join(RAIZ, semana, '**', 'app.py'), recursive=True):
+            with open(caminho, encoding='utf-8') as arquivo:
+                if 'route(' in arquivo.read():
+                    pastas.append(os.path.relpath(os.path.dirname(caminho), RAIZ))
+    return sorted(pastas)
+
+
+def carregar_app(pasta):
+    """Importa o app de 'pasta' (já copiada para um diretório temporário)."""
+    os.chdir(pasta)
+    sys.path.insert(0, pasta)
+    import app as modulo
+    if hasattr(modulo, 'create_app'):
+        aplicacao = modulo.create_app()
+    else:
+        aplicacao = modulo.app
+    aplicacao.config['WTF_CSRF_ENABLED'] = False
+    return aplicacao, getattr(modulo, 'db', None)
+
+
+# -----------------------------------------------------------------------------
+# DADOS SINTÉTICOS
+# -----------------------------------------------------------------------------
+
+def valor_sintetico(coluna, n):
+    tipo = coluna.type.python_type
+    if tipo is int:
+        return n
+    if tipo is float:
+        return float(n)
+    if tipo is bool:
+        return n % 2 == 0
+    if tipo is datetime:
+        return datetime(2024, 1, 1) + timedelta(minutes=n)
+    if tipo is date:
+        return date(2024, 1, 1) + timedelta(days=n)
+    texto = f'{coluna.name} {n}'
+    tamanho = getattr(coluna.type, 'length', None)
+    return texto[-tamanho:] if tamanho else texto
+
+
+def semear(db, linhas):
+    """Preenche todas as tabelas do app, em ordem de dependência (pais antes dos filhos)."""
+    for tabela in db.metadata.sorted_tables:
+        chaves_estrangeiras = [c for c in tabela.columns if c.foreign_keys]
+        associacao = len(chaves_estrangeiras) >= 2 and all(c.primary_key for c in chaves_estrangeiras)
+        registros = []
+        for n in range(linhas):
+            registro = {}
+            for coluna in tabela.columns:
+                if coluna.primary_key and not coluna.foreign_keys:
+                    continue
+                if coluna.foreign_keys:
+                    if associacao:
+                        # Pares distintos (1,1), (2,1), ... para não repetir a chave primária
+                        posicao = chaves_estrangeiras.index(coluna)
+                        registro[coluna.name] = (n // linhas ** posicao) % linhas + 1
+                    elif coluna.unique:
+                        registro[coluna.name] = n + 1
+                    else:
+                        registro[coluna.name] = n % linhas + 1
+                elif coluna.unique or coluna.default is None and coluna.server_default is None:
+                    registro[coluna.name] = valor_sintetico(coluna, n)
+            registros.append(registro)
+        for inicio in range(0, len(registros), 1000):
+            db.session.execute(tabela.insert(), registros[inicio:inicio + 1000])
+    db.session.commit()
+
+
+# -----------------------------------------------------------------------------
+# FORMULÁRIOS
+# -----------------------------------------------------------------------------
+
+class LeitorFormularios(HTMLParser):
+    """Coleta os <form method="post"> de uma página: ação e campos."""
+
+    def __init__(self):
+        super().__init__()
+        self.formularios = []
+        self._atual = None
+        self._select = None
+
+    def handle_starttag(self, tag, atributos):
+        atributos = dict(atributos)
+        if tag == 'form' and atributos.get('method', 'get').lower() == 'post':
+            self._atual = {'acao': atributos.get('action') or '', 'campos': {}}
+        elif self._atual is None:
+            return
+        elif tag in ('input', 'textarea') and atributos.get('name'):
+            self._atual['campos'][atributos['name']] = (atributos.get('type', tag), atributos.get('value'))
+        elif tag == 'select' and atributos.get('name'):
+            self._select = atributos['name']
+            self._atual['campos'][self._select] = ('select', None)
+        elif tag == 'option' and self._select and atributos.get('value'):
+            tipo, valor = self._atual['campos'][self._select]
+            if valor is None:
+                self._atual['campos'][self._select] = (tipo, atributos['value'])
+
+    def handle_endtag(self, tag):
+        if tag == 'select':
+            self._select = None
+        elif tag == 'form' and self._atual is not None:
+            self.formularios.append(self._atual)
+            self._atual = None
+
+
+def preencher(campos, n):
+    dados = {}
+    for nome, (tipo, valor) in campos.items():
+        if tipo in ('submit', 'hidden') or nome == 'csrf_token':
+            continue
+        if tipo in ('select', 'radio', 'checkbox'):
+            dados[nome] = valor or '1'
+        elif tipo == 'email':
+            dados[nome] = f'carga{n}@exemplo.com'
+        elif tipo == 'date':
+            dados[nome] = (date(2030, 1, 1) + timedelta(days=n % 365)).isoformat()
+        elif tipo == 'number':
+            dados[nome] = str(n % 100 + 1)
+        elif tipo == 'password':
+            dados[nome] = 'senha-de-carga-123'
+        else:
+            dados[nome] = f'{nome} carga {n}'
+    return dados
+
+
+# -----------------------------------------------------------------------------
+# MEDIÇÃO
+# -----------------------------------------------------------------------------
+
+def montar_url(regra):
+    valores = {}
+    for nome in regra.arguments:
+        conversor = regra._converters[nome].__class__.__name__
+        valores[nome] = 1 if conversor in ('IntegerConverter', 'NumberConverter') else 'semana1'
+    return regra.rule if not valores else regra.build(valores)[1]
+
+
+def percentil(ordenados, p):
+    return ordenados[min(len(ordenados) - 1, int(round(p * (len(ordenados) - 1))))]
+
+
+def medir_rota(cliente, metodo, url, requisicoes, gerar_dados):
+    tempos = []
+    status = {}
+    inicio_total = time.perf_counter()
+    for n in range(requisicoes):
+        dados = gerar_dados(n) if gerar_dados else None
+        inicio = time.perf_counter()
+        resposta = cliente.open(url, method=metodo, data=dados)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+        status[str(resposta.status_code)] = status.get(str(resposta.status_code), 0) + 1
+    duracao = time.perf_counter() - inicio_total
+    tempos.sort()
+    return {
+        'p50_ms': round(percentil(tempos, 0.50), 3),
+        'p95_ms': round(percentil(tempos, 0.95), 3),
+        'p99_ms': round(percentil(tempos, 0.99), 3),
+        'rps': round(requisicoes / duracao, 1),
+        'status': status,
+    }
+
+
+def medir_app(pasta, linhas, requisicoes):
+    aplicacao, db = carregar_app(pasta)
+    with aplicacao.app_context():
+        if db is not None:
+            db.create_all()
+            semear(db, linhas)
+
+    cliente = aplicacao.test_client()
+    adaptador = aplicacao.url_map.bind('localhost')
+    regras = [r for r in aplicacao.url_map.iter_rules() if r.endpoint != 'static']
+
+    # Primeiro passo: visita as páginas GET para descobrir os formulários de cada rota POST
+    formularios = {}
+    for regra in regras:
+        if 'GET' not in regra.methods:
+            continue
+        url = montar_url(regra)
+        leitor = LeitorFormularios()
+        leitor.feed(cliente.get(url).get_data(as_text=True))
+        for formulario in leitor.formularios:
+            acao = formulario['acao'] or url
+            try:
+                endpoint, _ = adaptador.match(acao.split('?')[0], method='POST')
+            except Exception:
+                continue
+            formularios.setdefault(endpoint, (acao, formulario['campos']))
+
+    resultados = {}
+    contador = itertools.count()
+    for regra in regras:
+        for metodo in sorted(regra.methods & {'GET', 'POST'}):
+            url = montar_url(regra)
+            gerar_dados = None
+            if metodo == 'POST':
+                url, campos = formularios.get(regra.endpoint, (url, {}))
+                gerar_dados = lambda n, campos=campos: preencher(campos, next(contador))
+            resultados[f'{metodo} {regra.rule}'] = medir_rota(cliente, metodo, url, requisicoes, gerar_dados)
+    return resultados
+
+
+def rodar_subprocesso(pasta, linhas, requisicoes):
+    # Cada app roda em um processo próprio: todos se chamam 'app' e alguns
+    # importam 'models', 'forms' etc., que colidiriam no mesmo interpretador
+    temporario = tempfile.mkdtemp()
+    destino = os.path.join(temporario, os.path.basename(pasta))
+    shutil.copytree(os.path.join(RAIZ, pasta), destino,
+                    ignore=shutil.ignore_patterns('*.db', 'instance', '__pycache__'))
+    try:
+        resultado = subprocess.run(
+            [sys.executable, __file__, '--interno', destino,
+             '--linhas', str(linhas), '--requisicoes', str(requisicoes)],
+            capture_output=True, text=True,
+        )
+    finally:
+        shutil.rmtree(temporario, ignore_errors=True)
+    if resultado.returncode != 0:
+        return {'erro': resultado.stderr.strip().splitlines()[-1]}
+    return json.loads(resultado.stdout.strip().splitlines()[-1])
+
+
+def comparar(antigo, novo):
+    print(f'{"rota":60} {"p50 antes":>10} {"p50 agora":>10} {"variação":>9}')
+    for pasta, rotas in novo['apps'].items():
+        for rota, medida in rotas.items():
+            anterior = antigo['apps'].get(pasta, {}).get(rota)
+            if not anterior or 'p50_ms' not in medida or 'p50_ms' not in anterior:
+                continue
+            variacao = (medida['p50_ms'] / anterior['p50_ms'] - 1) * 100 if anterior['p50_ms'] else 0
+            print(f'{pasta + " " + rota:60} {anterior["p50_ms"]:10.2f} {medida["p50_ms"]:10.2f} {variacao:+8.1f}%')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('apps', nargs='*', help='pastas dos apps (padrão: todas de Semana_2 a Semana_7)')
+    parser.add_argument('--linhas', type=int, default=200, help='linhas sintéticas por tabela')
+    parser.add_argument('--requisicoes', type=int, default=200, help='requisições por rota')
+    parser.add_argument('--saida', help='grava o JSON neste arquivo')
+    parser.add_argument('--comparar', help='JSON de uma execução anterior para comparar')
+    parser.add_argument('--interno', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.interno:
+        print(json.dumps(medir_app(args.interno, args.linhas, args.requisicoes)))
+        sys.exit(0)
+
+    relatorio = {
+        'meta': {
+            'linhas': args.linhas,
+            'requisicoes': args.requisicoes,
+            'python': sys.version.split()[0],
+            'data': datetime.now().isoformat(timespec='seconds'),
+        },
+        'apps': {},
+    }
+    for pasta in args.apps or descobrir_apps():
+        print(f'medindo {pasta}...', file=sys.stderr)
+        relatorio['apps'][pasta] = rodar_subprocesso(pasta, args.linhas, args.requisicoes)
+
+    texto = json.dumps(relatorio, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(texto + '\n')
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as arquivo:
+            comparar(json.load(arquivo), relatorio)
+    elif not args.saida:
+        print(texto)
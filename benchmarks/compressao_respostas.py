@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+# Bytes na rede e CPU por requisição das páginas dos apps da Semana_7, com e
+# sem a minificação e a compressão de compressao.py.
+#
+# Para cada app (em um subprocesso, como em carga.py), a página é pedida
+# --requisicoes vezes em cada modo:
+#   sem compressão   COMPRESSAO = False (só o trim_blocks/lstrip_blocks do Jinja)
+#   minificado       Accept-Encoding: identity
+#   gzip sem cache   o LRU de corpos comprimidos desligado: comprime sempre
+#   gzip com cache   o caso normal de uma página com ETag
+#   br ...           os mesmos dois modos com brotli, se o pacote estiver instalado
+#
+# A CPU é medida com time.process_time() em volta das requisições, então inclui
+# a rota inteira (consultas, template), e não só a compressão.
+#
+# Uso (a partir da raiz do repositório):
+#     python benchmarks/compressao_respostas.py
+#     python benchmarks/compressao_respostas.py --linhas 500 Semana_7/um_para_muitos
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from carga import RAIZ, carregar_app, semear
+
+APPS_PADRAO = [
+    'Semana_7/um_para_um',
+    'Semana_7/um_para_muitos',
+    'Semana_7/muitos_para_muitos',
+    'Semana_7/desafio_receitas',
+]
+
+
+def modos(com_brotli):
+    yield 'sem compressão', {'COMPRESSAO': False}, 'identity', True
+    yield 'minificado', {}, 'identity', True
+    codificacoes = ['gzip'] + (['br'] if com_brotli else [])
+    for codificacao in codificacoes:
+        yield f'{codificacao} sem cache', {}, codificacao, False
+        yield f'{codificacao} com cache', {}, codificacao, True
+
+
+def medir_app(pasta, linhas, requisicoes, url):
+    aplicacao, db = carregar_app(pasta)
+    import compressao  # o do app (carregar_app pôs a pasta dele no sys.path)
+    with aplicacao.app_context():
+        db.create_all()
+        semear(db, linhas)
+
+    cliente = aplicacao.test_client()
+    cache = aplicacao.extensions['compressao']
+    config_original = dict(aplicacao.config)
+    resultados = {}
+    for nome, config, codificacao, usar_cache in modos(compressao.brotli is not None):
+        aplicacao.config.update(config_original)
+        aplicacao.config.update(config)
+        cache.tamanho_maximo = config_original['COMPRESSAO_CACHE_TAMANHO'] if usar_cache else 0
+        cache._itens.clear()
+
+        cabecalhos = {'Accept-Encoding': codificacao}
+        resposta = cliente.get(url, headers=cabecalhos)  # aquece (e preenche o cache)
+        inicio = time.process_time()
+        for _ in range(requisicoes):
+            resposta = cliente.get(url, headers=cabecalhos)
+        cpu = (time.process_time() - inicio) / requisicoes
+        resultados[nome] = {
+            'bytes': len(resposta.get_data()),
+            'content_encoding': resposta.headers.get('Content-Encoding'),
+            'cpu_ms': round(cpu * 1000, 3),
+        }
+    return resultados
+
+
+def rodar_subprocesso(pasta, linhas, requisicoes, url):
+    temporario = tempfile.mkdtemp()
+    destino = os.path.join(temporario, os.path.basename(pasta))
+    shutil.copytree(os.path.join(RAIZ, pasta), destino,
+                    ignore=shutil.ignore_patterns('*.db', 'instance', '__pycache__'))
+    try:
+        resultado = subprocess.run(
+            [sys.executable, __file__, '--interno', destino, '--url', url,
+             '--linhas', str(linhas), '--requisicoes', str(requisicoes)],
+            capture_output=True, text=True,
+        )
+    finally:
+        shutil.rmtree(temporario, ignore_errors=True)
+    if resultado.returncode != 0:
+        return {'erro': resultado.stderr.strip().splitlines()[-1]}
+    return json.loads(resultado.stdout.strip().splitlines()[-1])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('apps', nargs='*', default=APPS_PADRAO)
+    parser.add_argument('--url', default='/')
+    parser.add_argument('--linhas', type=int, default=200, help='linhas sintéticas por tabela')
+    parser.add_argument('--requisicoes', type=int, default=200, help='requisições por modo')
+    parser.add_argument('--saida', help='grava o JSON neste arquivo')
+    parser.add_argument('--interno', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.interno:
+        print(json.dumps(medir_app(args.interno, args.linhas, args.requisicoes, args.url)))
+        sys.exit(0)
+
+    relatorio = {'linhas': args.linhas, 'requisicoes': args.requisicoes, 'url': args.url, 'apps': {}}
+    for pasta in args.apps:
+        resultados = relatorio['apps'][pasta] = rodar_subprocesso(pasta, args.linhas, args.requisicoes, args.url)
+        print(f'\n{pasta} {args.url}')
+        if 'erro' in resultados:
+            print(f'  erro: {resultados["erro"]}')
+            continue
+        base = resultados['sem compressão']['bytes']
+        print(f'  {"modo":16} {"bytes":>9} {"% do original":>14} {"CPU/req (ms)":>13}')
+        for nome, medida in resultados.items():
+            print(f'  {nome:16} {medida["bytes"]:9} {100 * medida["bytes"] / base:13.1f}% {medida["cpu_ms"]:13.3f}')
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
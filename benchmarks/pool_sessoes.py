@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+# Compara configurações do pool de conexões de Semana_6/meu_app_2 (veja
+# sessoes_banco.py) sob carga concorrente: várias threads lendo as páginas
+# com lista (/, /postagens, /livros) enquanto outras gravam, como em um worker
+# gthread do gunicorn com mais threads do que conexões.
+#
+# Para cada cenário mostra a vazão, a latência (p50/p95), os erros (ex.: tempo
+# esgotado esperando uma conexão) e o resumo do pool: pico de conexões em uso
+# e tempo médio com a conexão retirada, que cai quando a conexão é devolvida
+# antes de renderizar o template.
+#
+# Uso (a partir da raiz do repositório):
+#     python benchmarks/pool_sessoes.py --segundos 5 --threads 16 --escritores 2
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(RAIZ, 'Semana_6', 'meu_app_2'))
+
+from app import create_app  # noqa: E402
+from models import db, Usuario, Postagem, Autor, Livro  # noqa: E402
+
+ROTAS_LEITURA = ['/?limit=50', '/postagens?limit=50', '/livros?limit=50']
+
+CENARIOS = {
+    # Pool em fila pequeno (menos conexões que threads), com e sem a liberação antecipada
+    'fila_4_sem_liberar': {'BANCO_POOL': 'fila', 'BANCO_POOL_TAMANHO': 4, 'BANCO_POOL_EXTRA': 0,
+                           'BANCO_LIBERAR_ANTES_DO_TEMPLATE': False},
+    'fila_4_liberando': {'BANCO_POOL': 'fila', 'BANCO_POOL_TAMANHO': 4, 'BANCO_POOL_EXTRA': 0},
+    # O perfil de produção (8 + 4 de folga)
+    'fila_8_mais_4': {'BANCO_POOL': 'fila', 'BANCO_POOL_TAMANHO': 8, 'BANCO_POOL_EXTRA': 4},
+    # Uma conexão fixa por thread
+    'por_thread': {'BANCO_POOL': 'por_thread'},
+    # Sem pool: abre e fecha uma conexão por requisição (e o sqlite3 confere a thread)
+    'sem_pool': {'BANCO_POOL': 'sem_pool', 'BANCO_MESMA_THREAD': True},
+}
+
+
+def semear(linhas):
+    db.session.add_all(Usuario(nome=f'semente{i}', email=f'semente{i}@x.com') for i in range(linhas))
+    db.session.flush()
+    db.session.add_all(Postagem(titulo=f'titulo{i}', descricao=f'descricao{i}', usuario_id=1 + i % linhas)
+                       for i in range(linhas))
+    db.session.add_all(Autor(nome=f'autor{i}') for i in range(linhas // 10 or 1))
+    db.session.flush()
+    db.session.add_all(Livro(titulo=f'livro{i}', ano_publicacao=1900 + i % 100, autor_id=1 + i % (linhas // 10 or 1))
+                       for i in range(linhas))
+    db.session.commit()
+
+
+def percentil(valores, p):
+    if not valores:
+        return None
+    valores = sorted(valores)
+    return round(1000 * valores[min(len(valores) - 1, int(len(valores) * p))], 2)
+
+
+def rodar(nome, segundos, threads, escritores, linhas):
+    pasta = tempfile.mkdtemp()
+    config = {
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(pasta, 'bench.db'),
+        'PERFIL_BANCO': 'producao',
+        'WTF_CSRF_ENABLED': False,
+        # Espera curta por uma conexão livre: a falta de conexões aparece como erro
+        'BANCO_POOL_TIMEOUT': 2,
+    }
+    config.update(CENARIOS[nome])
+    if config['BANCO_POOL'] != 'fila':
+        del config['BANCO_POOL_TIMEOUT']
+    app = create_app(config)
+    with app.app_context():
+        db.create_all()
+        semear(linhas)
+
+    contador = itertools.count()
+    tempos, erros = [], []
+    trava = threading.Lock()
+    fim = time.perf_counter() + segundos
+
+    def registrar(inicio, ok):
+        duracao = time.perf_counter() - inicio
+        with trava:
+            (tempos if ok else erros).append(duracao)
+
+    def leitor(n):
+        cliente = app.test_client()
+        rotas = itertools.cycle(ROTAS_LEITURA[n % len(ROTAS_LEITURA):] + ROTAS_LEITURA[:n % len(ROTAS_LEITURA)])
+        while time.perf_counter() < fim:
+            inicio = time.perf_counter()
+            try:
+                ok = cliente.get(next(rotas)).status_code == 200
+            except Exception:
+                ok = False
+            registrar(inicio, ok)
+
+    def escritor():
+        cliente = app.test_client()
+        while time.perf_counter() < fim:
+            n = next(contador)
+            inicio = time.perf_counter()
+            try:
+                ok = cliente.post('/adicionar', data={'nome': f'u{n}', 'email': f'u{n}@x.com'}).status_code == 302
+            except Exception:
+                ok = False
+            registrar(inicio, ok)
+
+    trabalhadores = [threading.Thread(target=leitor, args=(n,)) for n in range(threads)]
+    trabalhadores += [threading.Thread(target=escritor) for _ in range(escritores)]
+    for thread in trabalhadores:
+        thread.start()
+    for thread in trabalhadores:
+        thread.join()
+
+    pool = app.extensions['pool_banco'].resumo()
+    return {
+        'requisicoes_por_segundo': round(len(tempos) / segundos, 1),
+        'p50_ms': percentil(tempos, 0.50),
+        'p95_ms': percentil(tempos, 0.95),
+        'erros': len(erros),
+        'pico_em_uso': pool['pico_em_uso'],
+        'tempo_medio_em_uso_ms': pool['tempo_medio_em_uso_ms'],
+        'maior_tempo_em_uso_ms': pool['maior_tempo_em_uso_ms'],
+        'liberacoes_antecipadas': pool['liberacoes_antecipadas'],
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--segundos', type=float, default=5)
+    parser.add_argument('--threads', type=int, default=16, help='threads lendo páginas')
+    parser.add_argument('--escritores', type=int, default=2)
+    parser.add_argument('--linhas', type=int, default=1000, help='linhas criadas em cada tabela antes do teste')
+    parser.add_argument('--cenarios', nargs='*', choices=list(CENARIOS), default=list(CENARIOS))
+    args = parser.parse_args()
+
+    relatorio = {
+        nome: rodar(nome, args.segundos, args.threads, args.escritores, args.linhas)
+        for nome in args.cenarios
+    }
+    print(json.dumps(relatorio, indent=2, ensure_ascii=False))
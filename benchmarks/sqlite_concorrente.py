@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+# Compara os perfis de banco ('desenvolvimento' x 'producao', veja
+# Semana_6/meu_app_2/perfis_banco.py) medindo a vazão de leituras enquanto
+# outras threads gravam ao mesmo tempo.
+#
+# Uso (a partir da raiz do repositório):
+#     python benchmarks/sqlite_concorrente.py --segundos 5 --leitores 8 --escritores 2
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(RAIZ, 'Semana_6', 'meu_app_2'))
+
+from app import create_app  # noqa: E402
+from models import db, Usuario  # noqa: E402
+
+
+def rodar(perfil, segundos, leitores, escritores, linhas):
+    pasta = tempfile.mkdtemp()
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(pasta, 'bench.db'),
+        'PERFIL_BANCO': perfil,
+    })
+    with app.app_context():
+        db.create_all()
+        db.session.add_all(Usuario(nome=f'semente{i}', email=f'semente{i}@x.com') for i in range(linhas))
+        db.session.commit()
+
+    contador = itertools.count()
+    resultados = {'leituras': 0, 'escritas': 0, 'erros': 0}
+    trava = threading.Lock()
+    fim = time.perf_counter() + segundos
+
+    def contar(chave):
+        with trava:
+            resultados[chave] += 1
+
+    def leitor():
+        cliente = app.test_client()
+        while time.perf_counter() < fim:
+            resposta = cliente.get('/?limit=20')
+            contar('leituras' if resposta.status_code == 200 else 'erros')
+
+    def escritor():
+        cliente = app.test_client()
+        while time.perf_counter() < fim:
+            n = next(contador)
+            resposta = cliente.post('/adicionar', data={'nome': f'u{n}', 'email': f'u{n}@x.com'})
+            contar('escritas' if resposta.status_code == 302 else 'erros')
+
+    threads = [threading.Thread(target=leitor) for _ in range(leitores)]
+    threads += [threading.Thread(target=escritor) for _ in range(escritores)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return {
+        'leituras_por_segundo': round(resultados['leituras'] / segundos, 1),
+        'escritas_por_segundo': round(resultados['escritas'] / segundos, 1),
+        'erros': resultados['erros'],
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--segundos', type=float, default=5)
+    parser.add_argument('--leitores', type=int, default=8)
+    parser.add_argument('--escritores', type=int, default=2)
+    parser.add_argument('--linhas', type=int, default=1000, help='usuários criados antes do teste')
+    args = parser.parse_args()
+
+    relatorio = {
+        perfil: rodar(perfil, args.segundos, args.leitores, args.escritores, args.linhas)
+        for perfil in ('desenvolvimento', 'producao')
+    }
+    print(json.dumps(relatorio, indent=2, ensure_ascii=False))
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+# Mede o tempo de inicialização ("cold start") de cada app com
+# 'python -X importtime' e grava o total em JSON, para comparar entre commits.
+#
+# Uso (a partir da raiz do repositório):
+#     python benchmarks/tempo_importacao.py
+#     python benchmarks/tempo_importacao.py --saida importtime.json Semana_6/meu_app_2
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+APPS_PADRAO = [
+    'Semana_6/meu_app',
+    'Semana_6/meu_app_2',
+    'Semana_7/um_para_um',
+    'Semana_7/um_para_muitos',
+    'Semana_7/muitos_para_muitos',
+    'Semana_7/desafio_receitas',
+]
+
+# Importa o módulo e, se ele tiver uma fábrica, cria a aplicação
+CODIGO = "import app\nif hasattr(app, 'create_app'): app.create_app()"
+
+
+def medir(pasta, repeticoes):
+    totais = []
+    for _ in range(repeticoes):
+        resultado = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', CODIGO],
+            cwd=os.path.join(RAIZ, pasta), capture_output=True, text=True,
+        )
+        if resultado.returncode != 0:
+            raise RuntimeError(f'{pasta}: {resultado.stderr.strip().splitlines()[-1]}')
+
+        # Linhas no formato "import time: self | cumulative | pacote".
+        # Somamos o tempo acumulado só das importações de primeiro nível
+        # (as que não têm recuo no nome do pacote).
+        total = 0
+        for linha in resultado.stderr.splitlines():
+            if not linha.startswith('import time:') or 'cumulative' in linha:
+                continue
+            _, acumulado, nome = linha[len('import time:'):].split('|')
+            if not nome.startswith('  '):
+                total += int(acumulado)
+        totais.append(total)
+
+    totais.sort()
+    return {
+        'mediana_ms': totais[len(totais) // 2] / 1000,
+        'minimo_ms': totais[0] / 1000,
+        'repeticoes': repeticoes,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('apps', nargs='*', default=APPS_PADRAO)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--saida', help='arquivo JSON (padrão: imprime na tela)')
+    args = parser.parse_args()
+
+    relatorio = {pasta: medir(pasta, args.repeticoes) for pasta in args.apps}
+    texto = json.dumps(relatorio, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(texto + '\n')
+    else:
+        print(texto)
@@ -0,0 +1,2 @@
+# Módulos usados por mais de um app do curso. Cada app acrescenta a raiz do
+# repositório ao sys.path e importa daqui, ex.: from compartilhado.estilos import css_tailwind
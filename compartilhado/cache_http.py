@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+
+import functools
+import hashlib
+import os
+import time
+from datetime import datetime, timezone
+from flask import current_app, request, session, make_response
+from sqlalchemy import bindparam, event, text
+from sqlalchemy.exc import OperationalError
+
+# -----------------------------------------------------------------------------
+# CACHE HTTP: ETag, Last-Modified e GET condicional
+# -----------------------------------------------------------------------------
+# Uso:
+#     http = CacheHTTP(('usuario', 'publicacao'))   # tabelas acompanhadas
+#     http.init_app(app, db)                        # dentro de create_app()
+#
+#     @app.route('/')
+#     @http.condicional('usuario', 'publicacao')    # tabelas que a página lê
+#     def index(): ...
+#
+# A tabela 'versao_tabela' guarda, para cada tabela acompanhada, um contador e
+# a hora da última alteração. Gatilhos (triggers) do SQLite atualizam os dois a
+# cada INSERT, UPDATE ou DELETE, venha ele do ORM, de um INSERT do Core, de
+# outro worker ou de fora do app (eventos do SQLAlchemy não veriam os dois
+# últimos casos).
+#
+# A ETag (fraca) é o hash desses contadores, e não do HTML: antes de rodar a
+# rota, uma única consulta pela chave primária de 'versao_tabela' basta para
+# responder 304 Not Modified a um 'If-None-Match' (ou 'If-Modified-Since')
+# que ainda vale, sem nenhuma consulta da página e sem renderizar o template.
+#
+# Cuidados:
+# - páginas que mostram mensagens do flash() não recebem ETag: a mensagem só
+#   aparece uma vez e não pode voltar do cache do navegador;
+# - com por_sessao=True (páginas com formulário e token CSRF) a ETag também
+#   depende do token da sessão e muda a cada CACHE_HTTP_JANELA_SESSAO
+#   segundos, para o token da página guardada nunca estar vencido; a resposta
+#   é 'private' (o proxy reverso não guarda a página de um usuário para outro);
+# - uma tabela sem linha em 'versao_tabela' (banco anterior a este módulo, em
+#   que o db.create_all() ainda não rodou), ou um banco ainda sem a própria
+#   'versao_tabela', desliga o cache da página: a rota roda normalmente, sem
+#   ETag nem Last-Modified (e um aviso vai para o log).
+#
+# CACHE_HTTP_MAX_AGE (padrão 0): segundos em que o navegador pode reusar a
+# página sem perguntar; com 0 ele sempre revalida (Cache-Control: no-cache).
+# CACHE_HTTP_VERSAO: entra na ETag, para um deploy com templates novos não
+# receber 304. O padrão é a data de modificação mais recente dos templates.
+
+
+MARGEM_LAST_MODIFIED = 2
+
+
+def _comandos_versao(tabela):
+    yield f"INSERT OR IGNORE INTO versao_tabela (tabela, versao) VALUES ('{tabela}', 0)"
+    for operacao in ('INSERT', 'UPDATE', 'DELETE'):
+        nome = f'trg_versao_{tabela}_{operacao.lower()}'
+        # DROP + CREATE: bancos antigos recebem a versão atual do gatilho
+        yield f'DROP TRIGGER IF EXISTS {nome}'
+        yield (
+            f'CREATE TRIGGER {nome} AFTER {operacao} ON {tabela} BEGIN'
+            ' UPDATE versao_tabela SET versao = versao + 1,'
+            " alterado_em = (julianday('now') - 2440587.5) * 86400.0"
+            f" WHERE tabela = '{tabela}';"
+            ' END'
+        )
+
+
+def _versao_dos_templates(app):
+    pasta = os.path.join(app.root_path, app.template_folder or 'templates')
+    maior = 0
+    for raiz, _, arquivos in os.walk(pasta):
+        for arquivo in arquivos:
+            maior = max(maior, os.path.getmtime(os.path.join(raiz, arquivo)))
+    return str(maior)
+
+
+class CacheHTTP:
+    def __init__(self, tabelas, app=None, db=None):
+        self.tabelas = tuple(tabelas)
+        self.db = None
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        app.config.setdefault('CACHE_HTTP_MAX_AGE', 0)
+        app.config.setdefault('CACHE_HTTP_JANELA_SESSAO', 1800)
+        app.config.setdefault('CACHE_HTTP_VERSAO', _versao_dos_templates(app))
+        if self.db is None:
+            event.listen(db.metadata, 'after_create', self.criar_estrutura)
+        self.db = db
+
+    def criar_estrutura(self, metadata, conexao, **kwargs):
+        # Roda no fim de db.create_all(); pode rodar de novo sem erro
+        conexao.exec_driver_sql(
+            'CREATE TABLE IF NOT EXISTS versao_tabela ('
+            ' tabela VARCHAR(50) PRIMARY KEY,'
+            ' versao INTEGER NOT NULL DEFAULT 0,'
+            ' alterado_em FLOAT)'
+        )
+        colunas = [linha[1] for linha in conexao.exec_driver_sql('PRAGMA table_info(versao_tabela)')]
+        if 'alterado_em' not in colunas:
+            conexao.exec_driver_sql('ALTER TABLE versao_tabela ADD COLUMN alterado_em FLOAT')
+        for tabela in self.tabelas:
+            for comando in _comandos_versao(tabela):
+                conexao.exec_driver_sql(comando)
+
+    def carimbos(self, tabelas):
+        """{tabela: (versao, alterado_em)} das tabelas pedidas, em uma consulta."""
+        try:
+            linhas = self.db.session.execute(
+                text('SELECT tabela, versao, alterado_em FROM versao_tabela WHERE tabela IN :tabelas')
+                .bindparams(bindparam('tabelas', expanding=True)),
+                {'tabelas': list(tabelas)}
+            ).all()
+        except OperationalError:
+            # Sem 'versao_tabela' (o db.create_all() ainda não rodou neste banco)
+            current_app.logger.warning('CacheHTTP desligado: a tabela versao_tabela não existe '
+                                       '(rode db.create_all())', exc_info=True)
+            return {}
+        return {tabela: (versao, alterado_em) for tabela, versao, alterado_em in linhas}
+
+    def versao(self, tabela):
+        return self.carimbos((tabela,)).get(tabela, (0, None))[0]
+
+    def condicional(self, *tabelas, por_sessao=False):
+        desconhecidas = set(tabelas) - set(self.tabelas)
+        if desconhecidas:
+            raise ValueError(f'Tabelas não acompanhadas pelo CacheHTTP: {sorted(desconhecidas)}')
+
+        def decorador(rota):
+            @functools.wraps(rota)
+            def envolvida(*args, **kwargs):
+                if request.method not in ('GET', 'HEAD') or '_flashes' in session:
+                    return rota(*args, **kwargs)
+                carimbos = self.carimbos(tabelas)
+                if len(carimbos) < len(tabelas):
+                    return rota(*args, **kwargs)
+
+                # Last-Modified tem precisão de segundos: se a última alteração
+                # é recente demais, outra pode cair no mesmo segundo e o
+                # If-Modified-Since não a perceberia (a ETag percebe)
+                alterado_em = max((alterado for _, alterado in carimbos.values() if alterado), default=None)
+                ultima_alteracao = None
+                if alterado_em and time.time() - alterado_em >= MARGEM_LAST_MODIFIED:
+                    ultima_alteracao = datetime.fromtimestamp(int(alterado_em), timezone.utc)
+                etag = self._etag(carimbos, por_sessao)
+                if request.if_none_match:
+                    nao_mudou = request.if_none_match.contains_weak(etag)
+                else:
+                    nao_mudou = bool(
+                        ultima_alteracao and request.if_modified_since
+                        and ultima_alteracao <= request.if_modified_since
+                    )
+                if nao_mudou:
+                    resposta = make_response('', 304)
+                else:
+                    resposta = make_response(rota(*args, **kwargs))
+                    if resposta.status_code != 200 or '_flashes' in session:
+                        return resposta
+                    # A rota pode ter criado o token CSRF agora
+                    etag = self._etag(carimbos, por_sessao)
+
+                resposta.set_etag(etag, weak=True)
+                if ultima_alteracao:
+                    resposta.last_modified = ultima_alteracao
+                self._cabecalhos_cache(resposta, por_sessao)
+                return resposta
+            return envolvida
+        return decorador
+
+    def _etag(self, carimbos, por_sessao):
+        partes = [current_app.config['CACHE_HTTP_VERSAO'], request.path]
+        partes += [f'{tabela}:{carimbos[tabela][0]}' for tabela in sorted(carimbos)]
+        if por_sessao:
+            janela = current_app.config['CACHE_HTTP_JANELA_SESSAO']
+            partes += [str(session.get('csrf_token')), str(int(time.time() // janela))]
+        return hashlib.sha1('|'.join(partes).encode()).hexdigest()[:20]
+
+    def _cabecalhos_cache(self, resposta, por_sessao):
+        max_age = current_app.config['CACHE_HTTP_MAX_AGE']
+        if por_sessao:
+            resposta.cache_control.private = True
+            resposta.vary.add('Cookie')
+        else:
+            resposta.cache_control.public = True
+        if max_age:
+            resposta.cache_control.max_age = max_age
+        else:
+            resposta.cache_control.no_cache = True
@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+
+import os
+import re
+from urllib.parse import quote
+
+# -----------------------------------------------------------------------------
+# CSS DOS APPS, GERADO OFFLINE (no lugar de cdn.tailwindcss.com e do Font Awesome)
+# -----------------------------------------------------------------------------
+# O script do CDN do Tailwind compila as classes no navegador, a cada página,
+# e o Font Awesome baixa uma folha de estilos e uma fonte inteiras de outro
+# servidor. Aqui o CSS é gerado uma vez, no build (veja o estaticos.py de cada
+# app), por este único módulo:
+#
+# - css_tailwind(app) procura nos templates as classes do Tailwind que são
+#   usadas (qualquer palavra, inclusive dentro de strings do Jinja, como faz o
+#   próprio Tailwind) e gera só as regras delas, mais o "preflight" (reset).
+#   Os valores são os do Tailwind v3. Só as famílias de utilitários que os
+#   apps do curso usam são conhecidas: uma classe de um atributo class="..."
+#   que não gera nada faz o build FALHAR (EstiloDesconhecido), com a lista das
+#   classes e dos templates. Basta acrescentar a família abaixo.
+# - css_icones(app) gera as classes 'fa-*' usadas nos templates a partir dos
+#   SVGs da pasta icones/ (Font Awesome Free 6, estilo solid, licença CC BY 4.0),
+#   como máscaras com a cor do texto: <i class="fas fa-plus"></i> continua igual.
+#   Um ícone sem SVG também faz o build falhar.
+#
+# A fonte Inter não é baixada: o CSS usa a Inter se ela estiver instalada e,
+# senão, a fonte do sistema.
+
+PASTA_ICONES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'icones')
+
+# Nomes do Font Awesome 5 usados nos templates, que o 6 mantém como apelidos
+APELIDOS = {
+    'exclamation-circle': 'circle-exclamation',
+    'project-diagram': 'diagram-project',
+    'search': 'magnifying-glass',
+    'trash-alt': 'trash-can',
+}
+
+
+class EstiloDesconhecido(ValueError):
+    """Classe usada nos templates para a qual não há CSS (nem regra, nem ícone)."""
+
+
+# --- Escalas e cores (Tailwind v3) ---
+CORES = {
+    'slate': {50: '#f8fafc', 100: '#f1f5f9', 200: '#e2e8f0', 300: '#cbd5e1', 400: '#94a3b8',
+              500: '#64748b', 600: '#475569', 700: '#334155', 800: '#1e293b', 900: '#0f172a'},
+    'gray': {50: '#f9fafb', 100: '#f3f4f6', 200: '#e5e7eb', 300: '#d1d5db', 400: '#9ca3af',
+             500: '#6b7280', 600: '#4b5563', 700: '#374151', 800: '#1f2937', 900: '#111827'},
+    'red': {50: '#fef2f2', 100: '#fee2e2', 200: '#fecaca', 300: '#fca5a5', 400: '#f87171',
+            500: '#ef4444', 600: '#dc2626', 700: '#b91c1c', 800: '#991b1b', 900: '#7f1d1d'},
+    'green': {50: '#f0fdf4', 100: '#dcfce7', 200: '#bbf7d0', 300: '#86efac', 400: '#4ade80',
+              500: '#22c55e', 600: '#16a34a', 700: '#15803d', 800: '#166534', 900: '#14532d'},
+    'emerald': {50: '#ecfdf5', 100: '#d1fae5', 200: '#a7f3d0', 300: '#6ee7b7', 400: '#34d399',
+                500: '#10b981', 600: '#059669', 700: '#047857', 800: '#065f46', 900: '#064e3b'},
+    'sky': {50: '#f0f9ff', 100: '#e0f2fe', 200: '#bae6fd', 300: '#7dd3fc', 400: '#38bdf8',
+            500: '#0ea5e9', 600: '#0284c7', 700: '#0369a1', 800: '#075985', 900: '#0c4a6e'},
+    'blue': {50: '#eff6ff', 100: '#dbeafe', 200: '#bfdbfe', 300: '#93c5fd', 400: '#60a5fa',
+             500: '#3b82f6', 600: '#2563eb', 700: '#1d4ed8', 800: '#1e40af', 900: '#1e3a8a'},
+    'purple': {50: '#faf5ff', 100: '#f3e8ff', 200: '#e9d5ff', 300: '#d8b4fe', 400: '#c084fc',
+               500: '#a855f7', 600: '#9333ea', 700: '#7e22ce', 800: '#6b21a8', 900: '#581c87'},
+}
+CORES_FIXAS = {'white': '#fff', 'black': '#000', 'transparent': 'transparent'}
+
+TAMANHOS_TEXTO = {
+    'xs': ('0.75rem', '1rem'), 'sm': ('0.875rem', '1.25rem'), 'base': ('1rem', '1.5rem'),
+    'lg': ('1.125rem', '1.75rem'), 'xl': ('1.25rem', '1.75rem'), '2xl': ('1.5rem', '2rem'),
+    '3xl': ('1.875rem', '2.25rem'), '4xl': ('2.25rem', '2.5rem'), '5xl': ('3rem', '1'),
+}
+PESOS = {'light': 300, 'normal': 400, 'medium': 500, 'semibold': 600, 'bold': 700, 'extrabold': 800}
+ARREDONDADOS = {'': '0.25rem', 'sm': '0.125rem', 'md': '0.375rem', 'lg': '0.5rem', 'xl': '0.75rem',
+                '2xl': '1rem', 'full': '9999px', 'none': '0px'}
+SOMBRAS = {
+    'sm': '0 1px 2px 0 rgb(0 0 0 / 0.05)',
+    '': '0 1px 3px 0 rgb(0 0 0 / 0.1), 0 1px 2px -1px rgb(0 0 0 / 0.1)',
+    'md': '0 4px 6px -1px rgb(0 0 0 / 0.1), 0 2px 4px -2px rgb(0 0 0 / 0.1)',
+    'lg': '0 10px 15px -3px rgb(0 0 0 / 0.1), 0 4px 6px -4px rgb(0 0 0 / 0.1)',
+    'xl': '0 20px 25px -5px rgb(0 0 0 / 0.1), 0 8px 10px -6px rgb(0 0 0 / 0.1)',
+    'none': '0 0 #0000',
+}
+TELAS = {'sm': '640px', 'md': '768px', 'lg': '1024px', 'xl': '1280px', '2xl': '1536px'}
+ESTADOS = {'hover': ':hover', 'focus': ':focus'}
+CURVA = 'cubic-bezier(0.4, 0, 0.2, 1)'
+TRANSICOES = {
+    '': 'color, background-color, border-color, text-decoration-color, fill, stroke, opacity, '
+        'box-shadow, transform, filter, backdrop-filter',
+    'colors': 'color, background-color, border-color, text-decoration-color, fill, stroke',
+    'shadow': 'box-shadow',
+    'all': 'all',
+}
+LADOS = {
+    '': ('',), 'x': ('-left', '-right'), 'y': ('-top', '-bottom'),
+    't': ('-top',), 'r': ('-right',), 'b': ('-bottom',), 'l': ('-left',),
+}
+
+PREFLIGHT = """\
+*,::before,::after{box-sizing:border-box;border-width:0;border-style:solid;border-color:#e5e7eb}
+html{line-height:1.5;-webkit-text-size-adjust:100%;tab-size:4;font-family:Inter,ui-sans-serif,system-ui,sans-serif,"Apple Color Emoji","Segoe UI Emoji","Segoe UI Symbol","Noto Color Emoji"}
+body{margin:0;line-height:inherit}
+hr{height:0;color:inherit;border-top-width:1px}
+h1,h2,h3,h4,h5,h6{font-size:inherit;font-weight:inherit}
+a{color:inherit;text-decoration:inherit}
+b,strong{font-weight:bolder}
+small{font-size:80%}
+table{text-indent:0;border-color:inherit;border-collapse:collapse}
+button,input,optgroup,select,textarea{font-family:inherit;font-size:100%;font-weight:inherit;line-height:inherit;color:inherit;margin:0;padding:0}
+button,select{text-transform:none}
+button,[type=button],[type=reset],[type=submit]{-webkit-appearance:button;background-color:transparent;background-image:none}
+blockquote,dl,dd,h1,h2,h3,h4,h5,h6,hr,figure,p,pre{margin:0}
+fieldset{margin:0;padding:0}
+legend{padding:0}
+ol,ul,menu{list-style:none;margin:0;padding:0}
+textarea{resize:vertical}
+input::placeholder,textarea::placeholder{opacity:1;color:#9ca3af}
+button,[role=button]{cursor:pointer}
+:disabled{cursor:default}
+img,svg,video,canvas,audio,iframe,embed,object{display:block;vertical-align:middle}
+img,video{max-width:100%;height:auto}
+[hidden]{display:none}
+"""
+
+
+def espaco(valor):
+    if valor == 'auto':
+        return 'auto'
+    if valor == 'px':
+        return '1px'
+    numero = float(valor)
+    return '0px' if numero == 0 else f'{numero * 0.25:g}rem'
+
+
+def cor(nome, tom=None):
+    if tom is None:
+        return CORES_FIXAS.get(nome)
+    return CORES.get(nome, {}).get(int(tom))
+
+
+# --- Famílias de utilitários ---
+# Cada uma é (expressão regular, função que devolve (sufixo do seletor, {propriedade: valor}));
+# a posição na lista define a ordem das regras no CSS, como no Tailwind: o
+# geral antes do específico (p-4, depois px-2, depois pl-6).
+ESCALA = r'(\d+(?:\.\d+)?|px|auto)'
+COR = r'([a-z]+)(?:-(\d{2,3}))?'
+
+
+def _margem_padding(m):
+    propriedade = {'m': 'margin', 'p': 'padding'}[m[1]]
+    return '', {f'{propriedade}{lado}': espaco(m[3]) for lado in LADOS[m[2]]}
+
+
+def _espaco_entre(m):
+    lado = '-left' if m[1] == 'x' else '-top'
+    return ' > :not([hidden]) ~ :not([hidden])', {f'margin{lado}': espaco(m[2])}
+
+
+def _cor_de(propriedade):
+    def gerar(m):
+        valor = cor(m[1], m[2])
+        return valor and ('', {propriedade: valor})
+    return gerar
+
+
+def _texto(m):
+    if m[1] in TAMANHOS_TEXTO:
+        tamanho, altura = TAMANHOS_TEXTO[m[1]]
+        return '', {'font-size': tamanho, 'line-height': altura}
+    if m[1] in ('left', 'center', 'right', 'justify'):
+        return '', {'text-align': m[1]}
+    valor = cor(*m[1].rsplit('-', 1)) if '-' in m[1] else cor(m[1])
+    return valor and ('', {'color': valor})
+
+
+def _borda(m):
+    lados, largura = m[1] or '', m[2] or '1'
+    if lados not in LADOS:
+        valor = cor(*lados.rsplit('-', 1)) if '-' in lados else cor(lados)
+        return valor and m[2] is None and ('', {'border-color': valor})
+    return '', {f'border{lado}-width': f'{largura}px' for lado in LADOS[lados]}
+
+
+def _anel(m):
+    if m[1].isdigit():
+        return '', {
+            '--tw-ring-shadow': f'0 0 0 {m[1]}px var(--tw-ring-color, rgb(59 130 246 / 0.5))',
+            'box-shadow': 'var(--tw-ring-shadow)',
+        }
+    valor = cor(*m[1].rsplit('-', 1)) if '-' in m[1] else cor(m[1])
+    return valor and ('', {'--tw-ring-color': valor})
+
+
+FAMILIAS = [
+    (r'(block|inline-block|inline|flex|inline-flex|grid|hidden)', lambda m: ('', {'display': 'none' if m[1] == 'hidden' else m[1]})),
+    (r'w-full', lambda m: ('', {'width': '100%'})),
+    (r'(m|p)()-' + ESCALA, _margem_padding),
+    (r'(m|p)(x|y)-' + ESCALA, _margem_padding),
+    (r'(m|p)(t|r|b|l)-' + ESCALA, _margem_padding),
+    (r'space-(x|y)-' + ESCALA, _espaco_entre),
+    (r'flex-wrap', lambda m: ('', {'flex-wrap': 'wrap'})),
+    (r'items-(start|end|center|baseline|stretch)',
+     lambda m: ('', {'align-items': {'start': 'flex-start', 'end': 'flex-end'}.get(m[1], m[1])})),
+    (r'justify-(start|end|center|between|around)',
+     lambda m: ('', {'justify-content': {'start': 'flex-start', 'end': 'flex-end', 'between': 'space-between',
+                                         'around': 'space-around'}.get(m[1], m[1])})),
+    (r'gap-' + ESCALA, lambda m: ('', {'gap': espaco(m[1])})),
+    (r'grid-cols-(\d+)', lambda m: ('', {'grid-template-columns': f'repeat({m[1]}, minmax(0, 1fr))'})),
+    (r'col-span-(\d+)', lambda m: ('', {'grid-column': f'span {m[1]} / span {m[1]}'})),
+    (r'list-(disc|decimal|none)', lambda m: ('', {'list-style-type': m[1]})),
+    (r'list-(inside|outside)', lambda m: ('', {'list-style-position': m[1]})),
+    (r'rounded(?:-(sm|md|lg|xl|2xl|full|none))?', lambda m: ('', {'border-radius': ARREDONDADOS[m[1] or '']})),
+    (r'border(?:-(x|y|t|r|b|l|[a-z]+(?:-\d{2,3})?))?(?:-(\d))?', _borda),
+    (r'bg-' + COR, _cor_de('background-color')),
+    (r'text-([a-z0-9]+(?:-\d{2,3})?)', _texto),
+    (r'font-(light|normal|medium|semibold|bold|extrabold)', lambda m: ('', {'font-weight': str(PESOS[m[1]])})),
+    (r'italic', lambda m: ('', {'font-style': 'italic'})),
+    (r'underline', lambda m: ('', {'text-decoration-line': 'underline'})),
+    (r'whitespace-(normal|nowrap|pre|pre-line|pre-wrap)', lambda m: ('', {'white-space': m[1]})),
+    (r'shadow(?:-(sm|md|lg|xl|none))?', lambda m: ('', {'box-shadow': SOMBRAS[m[1] or '']})),
+    (r'outline-none', lambda m: ('', {'outline': '2px solid transparent', 'outline-offset': '2px'})),
+    (r'ring-([a-z0-9]+(?:-\d{2,3})?)', _anel),
+    (r'transition(?:-(colors|shadow|all))?', lambda m: ('', {
+        'transition-property': TRANSICOES[m[1] or ''],
+        'transition-timing-function': CURVA, 'transition-duration': '150ms'})),
+    (r'duration-(\d+)', lambda m: ('', {'transition-duration': f'{m[1]}ms'})),
+]
+FAMILIAS = [(re.compile(expressao + '$'), gerar) for expressao, gerar in FAMILIAS]
+
+_PALAVRA = re.compile(r'[A-Za-z0-9_:./-]+')
+_CLASSE = re.compile(r'class="([^"]*)"')
+_JINJA = re.compile(r'\{\{.*?\}\}|\{%.*?%\}')
+
+
+def escapar(classe):
+    return re.sub(r'([:./\[\]])', r'\\\1', classe)
+
+
+def regra(classe):
+    """(ordem, tela, estados, sufixo, declarações) de uma classe, ou None se não for do Tailwind."""
+    *variantes, utilitario = classe.split(':')
+    tela, estados = None, []
+    for variante in variantes:
+        if variante in TELAS and tela is None and not estados:
+            tela = variante
+        elif variante in ESTADOS:
+            estados.append(ESTADOS[variante])
+        else:
+            return None
+    for posicao, (expressao, gerar) in enumerate(FAMILIAS):
+        encontrado = expressao.match(utilitario)
+        if not encontrado:
+            continue
+        resultado = gerar(encontrado)
+        if not resultado:
+            return None
+        sufixo, declaracoes = resultado
+        return posicao, tela, ''.join(estados), sufixo, declaracoes
+    return None
+
+
+def ler_templates(app):
+    """{caminho relativo: texto} de cada template .html do app."""
+    pasta = os.path.join(app.root_path, app.template_folder or 'templates')
+    textos = {}
+    for raiz, _, arquivos in os.walk(pasta):
+        for arquivo in sorted(arquivos):
+            if arquivo.endswith('.html'):
+                caminho = os.path.join(raiz, arquivo)
+                with open(caminho, encoding='utf-8') as entrada:
+                    textos[os.path.relpath(caminho, pasta)] = entrada.read()
+    return textos
+
+
+def classes_usadas(texto):
+    """As classes escritas nos atributos class="...", fora das expressões do Jinja.
+
+    As que o Jinja monta (ex.: {{ fontes[i] }}) não dá para saber antes de
+    renderizar: elas só recebem CSS se aparecerem como palavra no template.
+    """
+    return {classe for valor in _CLASSE.findall(texto) for classe in _JINJA.sub(' ', valor).split()}
+
+
+def _falhar_se_desconhecidas(desconhecidas, tipo):
+    if desconhecidas:
+        linhas = [f'  {classe} ({", ".join(sorted(templates))})' for classe, templates in sorted(desconhecidas.items())]
+        raise EstiloDesconhecido(f'{tipo} sem CSS em compartilhado/estilos.py:\n' + '\n'.join(linhas))
+
+
+def css_tailwind(app):
+    textos = ler_templates(app)
+    candidatas = {palavra for texto in textos.values() for palavra in _PALAVRA.findall(texto)}
+    regras = [(classe, gerada) for classe in candidatas for gerada in [regra(classe)] if gerada]
+
+    # Toda classe de um atributo class="..." precisa ter CSS: do Tailwind, o
+    # .container ou os ícones (que css_icones confere)
+    geradas = {classe for classe, _ in regras} | {'container', 'fas'}
+    desconhecidas = {}
+    for nome, texto in textos.items():
+        for classe in classes_usadas(texto) - geradas:
+            if not classe.startswith('fa-'):
+                desconhecidas.setdefault(classe, set()).add(nome)
+    _falhar_se_desconhecidas(desconhecidas, 'Classes')
+
+    saida = [PREFLIGHT]
+    if 'container' in candidatas:
+        saida.append('.container{width:100%}')
+        saida += [f'@media (min-width:{largura}){{.container{{max-width:{largura}}}}}' for largura in TELAS.values()]
+
+    # Ordem do Tailwind: utilitários sem variante, depois hover/focus, depois cada tela (sm, md, lg...)
+    telas = [None] + list(TELAS)
+    regras.sort(key=lambda item: (telas.index(item[1][1]), bool(item[1][2]), item[1][0], item[0]))
+    tela_atual = None
+    for classe, (_, tela, estados, sufixo, declaracoes) in regras:
+        if tela != tela_atual:
+            if tela_atual is not None:
+                saida.append('}')
+            saida.append(f'@media (min-width:{TELAS[tela]}){{')
+            tela_atual = tela
+        corpo = ';'.join(f'{propriedade}:{valor}' for propriedade, valor in declaracoes.items())
+        saida.append(f'.{escapar(classe)}{estados}{sufixo}{{{corpo}}}')
+    if tela_atual is not None:
+        saida.append('}')
+    return '\n'.join(saida) + '\n'
+
+
+def css_icones(app):
+    usados = {}
+    for nome, texto in ler_templates(app).items():
+        for palavra in _PALAVRA.findall(texto):
+            if palavra.startswith('fa-'):
+                usados.setdefault(palavra[3:], set()).add(nome)
+    if not usados:
+        return ''
+
+    svgs, desconhecidas = {}, {}
+    for icone, templates in usados.items():
+        caminho = os.path.join(PASTA_ICONES, APELIDOS.get(icone, icone) + '.svg')
+        if not os.path.exists(caminho):
+            desconhecidas[f'fa-{icone}'] = templates
+            continue
+        with open(caminho, encoding='utf-8') as arquivo:
+            # O comentário de licença fica no arquivo e no cabeçalho do CSS
+            svgs[icone] = re.sub(r'<!--.*?-->', '', arquivo.read().strip())
+    _falhar_se_desconhecidas(desconhecidas, 'Ícones')
+
+    saida = [
+        '/* Ícones: Font Awesome Free 6 by @fontawesome - https://fontawesome.com License - '
+        'https://fontawesome.com/license/free (CC BY 4.0) */',
+        '.fas{display:inline-block;height:1em;width:1em;vertical-align:-0.125em;background-color:currentColor;'
+        '-webkit-mask:var(--icone) center/contain no-repeat;mask:var(--icone) center/contain no-repeat}',
+    ]
+    for icone, svg in sorted(svgs.items()):
+        # A largura segue a do ícone (viewBox "0 0 LARGURA 512")
+        largura = int(re.search(r'viewBox="0 0 (\d+) 512"', svg).group(1)) / 512
+        saida.append(f'.fa-{icone}{{width:{largura:.3g}em;--icone:url("data:image/svg+xml,{quote(svg, safe=" =/:,.-")}")}}')
+    return '\n'.join(saida) + '\n'